@@ -0,0 +1,670 @@
+from MIP1.solver_backend import createBackend, BINARY, INTEGER
+from MIP1.package_to_carton import relative_start
+from MIP1.solver_profile import solver_profile
+
+# Builder of the 3D container loading MIP shared by the MIP1 and MIP2 solvers.
+# Variables are created in blocks with addVars and constraints are added in blocks with addConstrs, so building the
+# model does not go through one Python call per variable and per constraint. The model is built and solved through a
+# solver backend (MIP1/solver_backend.py), Gurobi or HiGHS.
+
+ORIENTATIONS = ("lx", "ly", "lz", "wx", "wy", "wz", "hx", "hy", "hz")
+RELATIVE_POSITIONS = ("aik", "bik", "cik", "dik", "eik", "fik")
+AXES = ("x", "y", "z")
+CONTAINER_DIMENSIONS = {"x": "length", "y": "width", "z": "height"}
+SEPARATIONS = {"x": ("aik", "bik"), "y": ("cik", "dik"), "z": ("eik", "fik")}
+SOLUTION_DIMENSIONS = {"x": "DimX", "y": "DimY", "z": "DimZ"}
+
+
+class ContainerLoadingModel:
+    """
+    3D container loading model with relative positioning constraints (aik, bik, cik, dik, eik, fik).
+
+    Variables:
+        sij[carton, container]: 1 if the carton is assigned to the container
+        xi, yi, zi[carton]: coordinates of the front-left-bottom corner of the carton
+        orientation[carton, "lx" .. "hz"]: 1 if the length/width/height of the carton lies along the x/y/z axis
+        relative_position[carton_i, carton_k, "aik" .. "fik"]: 1 if carton i is left of/right of/behind/in front of/
+            below/above carton k, for every pair with i added before k
+        pj[container]: 1 if the container holds a priority carton (only with priorityCost)
+        ground, support, together: stability variables (only with stability)
+
+    Cartons can be added to a built model with addCarton, and the last carton added taken out again with
+    removeCarton, so a model can be kept alive while cartons are tried one by one.
+
+    With prune, the model is made smaller and its LP relaxation tighter before solving:
+        - a pair of cartons can only be side by side along an axis if their smallest dimensions fit in the size of a
+          container along it, and the relative position variables and no overlap constraints of the other axes are
+          left out (the relative_sum row of a container only counts the axes of that container)
+        - cartons that don't fit in a container on their own, in any orientation or by weight, have their assignment
+          to it fixed to 0, without fit and relative_sum rows
+        - the big-M of the fit and no overlap rows of a carton along an axis is the longest container along the axis,
+          or the carton itself if longer, instead of M: assigned cartons are within their container and cartons left
+          out can be put at the origin
+
+    With symmetry, the solutions that only differ by swapping identical cartons (same dimensions in any order, weight,
+    cost and priority) or identical containers (same dimensions and weight) are cut down to one:
+        - cartons of a class are placed before the later ones of the class are (without assignAll), and two cartons
+          of a class added one after the other, in the same container, are ordered along the first axis they can be
+          side by side along
+        - a container of a class only holds a carton if the container before it in the class holds an earlier one,
+          so the containers of a class are filled in order of their first carton
+    Warm starts are relabelled to match, swapping the placements of identical cartons and containers.
+
+    Args:
+        cartons (list): cartons as dictionaries with id, length, width, height, weight, cost and priority.
+        containers (list): containers as dictionaries with id, length, width, height and weight.
+        name (str): name of the model.
+        M (int): constant of the big-M constraints (only the stability ones with prune).
+        coordinateType (str): variable type of the coordinates, solver_backend.INTEGER or CONTINUOUS.
+        assignAll (bool): every carton must be assigned to a container, instead of at most one.
+        weightLimit (bool): add the weight limit of every container.
+        priorityCost (int): if given, cost of every container holding a priority carton, added to the objective.
+        stability (bool): every assigned carton must be on the ground or on top of another carton of its container.
+        stabilityFactor (float): fraction of the extent of a carton allowed to overhang the carton supporting it.
+        prune (bool): leave out the variables and constraints of impossible placements and use big-M values from the
+            container sizes.
+        symmetry (bool): add the symmetry breaking constraints of identical cartons and containers.
+        solver (str): solver backend, "gurobi" or "highs".
+        params (dict): solver parameters by their Gurobi names, such as LogToConsole or Threads, set before the model
+            is built.
+        profile (SolverProfile or str): threads, memory and tuning parameters of the model (see solver_profile), or the
+            name of a profile. Set before params, which take precedence.
+        env (gurobipy.Env): environment to create the Gurobi model in.
+    """
+
+    def __init__(self, cartons, containers, name = "3D_Container_Loading_with_Relative_Positioning", M = 100000,
+                 coordinateType = INTEGER, assignAll = False, weightLimit = True, priorityCost = None,
+                 stability = False, stabilityFactor = 1, prune = True, symmetry = True, solver = "gurobi", params = None,
+                 env = None, profile = None):
+        self.containers = containers
+        self.containerIds = [container['id'] for container in containers]
+        self.M = M
+        self.coordinateType = coordinateType
+        self.assignAll = assignAll
+        self.weightLimit = weightLimit
+        self.priorityCost = priorityCost
+        self.stability = stability
+        self.stabilityFactor = stabilityFactor
+        self.prune = prune
+        self.symmetry = symmetry
+        self.limits = {(container['id'], a): container[dimension] for container in containers for a, dimension in CONTAINER_DIMENSIONS.items()}
+        self.longest = {a: max((container[dimension] for container in containers), default=0) for a, dimension in CONTAINER_DIMENSIONS.items()}
+        self.backend = createBackend(solver, name, env)
+        profile = solver_profile(profile)
+        for param, value in (profile.params() if profile is not None else {}).items():
+            self.backend.setParam(param, value)
+        for param, value in (params or {}).items():
+            self.backend.setParam(param, value)
+
+        self.cartons = []
+        self.ids = []
+        self.order = {}             #carton id -> position in ids
+        self.pairs = []             #(carton_i, carton_k) with i added before k, grouped by k
+        self.owned = {}             #carton id -> variables and constraints to remove with the carton
+        self.sij, self.xi, self.yi, self.zi = {}, {}, {}, {}
+        self.position = {"x": self.xi, "y": self.yi, "z": self.zi}
+        self.orientation = {}
+        self.relative_position = {}
+        self.extent = {}            #(carton, axis) -> length of the carton along the axis, given its orientation
+        self.sizes = {}             #carton id -> dimensions of the carton, smallest first
+        self.separable = {}         #(carton_i, carton_k) -> axes along which the pair can be side by side
+        self.excluded = set()       #(carton, container) with the carton not fitting in the container
+        self.weightRows = None
+        self.classOf = {}           #carton id -> class of identical cartons
+        self.classes = {}           #class -> carton ids of the class, in the order added
+        self.containerClasses = self.identicalContainers() if symmetry else []
+        if priorityCost is not None:
+            self.pj = self.backend.addVars(self.containerIds, BINARY, name="contains_priority")
+        if stability:
+            self.ground, self.support, self.together = {}, {}, {}
+            self.platformRows = {}
+        self.addCartons(cartons)
+
+    # Add cartons to the model, with their variables and all the constraints involving them
+    def addCartons(self, cartons):
+        new = [carton['id'] for carton in cartons]
+        pairs = []
+        for id in new:
+            pairs += [(i, id) for i in self.ids]
+            self.order[id] = len(self.ids)
+            self.ids.append(id)
+            self.owned[id] = []
+        for carton in cartons:
+            self.sizes[carton['id']] = sorted((carton['length'], carton['width'], carton['height']))
+            if not self.prune: continue
+            for container in self.containers:
+                if not self.fits(carton, container): self.excluded.add((carton['id'], container['id']))
+        for i, k in pairs:
+            self.separable[(i, k)] = self.separableAxes(i, k)
+        self.cartons += cartons
+        self.pairs += pairs
+        self.addVariables(cartons, pairs)
+        self.addConstraints(new, pairs)
+        if self.priorityCost is not None: self.addPriorityConstraints(new)
+        if self.stability: self.addStabilityConstraints(new, pairs)
+        if self.symmetry: self.addSymmetryConstraints(cartons)
+
+    def addCarton(self, carton):
+        self.addCartons([carton])
+
+    # Take the last carton added out of the model. Earlier cartons can't be removed, as the rows of their pairs
+    # with later cartons are owned by the later cartons
+    def removeCarton(self, id):
+        if not self.ids or self.ids[-1] != id:
+            raise ValueError("Only the last carton added can be removed!")
+        self.backend.remove(self.owned.pop(id))
+        pairs = self.pairs[len(self.pairs) - (len(self.ids) - 1):]
+        del self.pairs[len(self.pairs) - len(pairs):]
+        self.ids.pop()
+        self.cartons.pop()
+        del self.order[id]
+        for container in self.containerIds:
+            del self.sij[id, container]
+        for variables in self.position.values():
+            del variables[id]
+        for orient in ORIENTATIONS:
+            del self.orientation[id, orient]
+        for axis in AXES:
+            del self.extent[(id, axis)]
+        for i, k in pairs:
+            for rel in RELATIVE_POSITIONS:
+                self.relative_position.pop((i, k, rel), None)
+            del self.separable[(i, k)]
+        del self.sizes[id]
+        for container in self.containerIds:
+            self.excluded.discard((id, container))
+        if self.symmetry:
+            self.classes[self.classOf.pop(id)].pop()
+        if self.stability:
+            del self.ground[id]
+            del self.platformRows[id]
+            for i, k in pairs:
+                for key in ((i, k), (k, i)):
+                    del self.support[key]
+                    for container in self.containerIds:
+                        del self.together[key + (container,)]
+
+    # Record the variables or constraints of a block under the carton owning them
+    def own(self, block, owner):
+        for key, item in block.items():
+            self.owned[owner(key)].append(item)
+
+    # The carton added last out of two
+    def newest(self, i, k):
+        return i if self.order[i] > self.order[k] else k
+
+    # Check if a carton fits in a container on its own, in some orientation and within the weight limit
+    def fits(self, carton, container):
+        size = sorted((container['length'], container['width'], container['height']))
+        if any(dimension > limit for dimension, limit in zip(self.sizes[carton['id']], size)): return False
+        return not self.weightLimit or carton['weight'] <= container['weight']
+
+    # Axes along which two cartons can be side by side in a container: their smallest dimensions fit in its size
+    def sideBySide(self, i, k, container):
+        if (i, container) in self.excluded or (k, container) in self.excluded: return ()
+        if not self.prune: return AXES
+        return tuple(a for a in AXES if self.sizes[i][0] + self.sizes[k][0] <= self.limits[(container, a)])
+
+    # Axes along which two cartons can be side by side in some container
+    def separableAxes(self, i, k):
+        axes = set()
+        for container in self.containerIds:
+            axes.update(self.sideBySide(i, k, container))
+        return tuple(a for a in AXES if a in axes)
+
+    # Big-M of the fit and no overlap rows of a carton along an axis: the carton ends before it whether it is
+    # assigned to a container or left out and put at the origin
+    def reach(self, id, a):
+        return max(self.longest[a], self.sizes[id][2]) if self.prune else self.M
+
+    # Big-M of the fit row of a carton along an axis of a container
+    def fitM(self, id, container, a):
+        return self.reach(id, a) - self.limits[(container, a)] if self.prune else self.M
+
+    def addVariables(self, cartons, pairs):
+        backend = self.backend
+        ids = [carton['id'] for carton in cartons]
+        blocks = (
+            (self.sij, backend.addVars([(id, container) for id in ids for container in self.containerIds], BINARY, name="s"),
+             lambda key: key[0]),
+            (self.xi, backend.addVars(ids, self.coordinateType, name="x"), lambda key: key),
+            (self.yi, backend.addVars(ids, self.coordinateType, name="y"), lambda key: key),
+            (self.zi, backend.addVars(ids, self.coordinateType, name="z"), lambda key: key),
+            (self.orientation, backend.addVars([(id, orient) for id in ids for orient in ORIENTATIONS], BINARY, name="o"),
+             lambda key: key[0]),
+            (self.relative_position, backend.addVars([(i, k, rel) for i, k in pairs for a in self.separable[(i, k)] for rel in SEPARATIONS[a]],
+                                                     BINARY, name="r"), lambda key: key[1]),
+        )
+        for variables, block, owner in blocks:
+            variables.update(block)
+            self.own(block, owner)
+        backend.fix([self.sij[id, container] for id in ids for container in self.containerIds if (id, container) in self.excluded], 0)
+        for carton in cartons:
+            id = carton['id']
+            for axis in AXES:
+                self.extent[(id, axis)] = backend.linExpr(
+                    [carton['length'], carton['width'], carton['height']],
+                    [self.orientation[id, "l" + axis], self.orientation[id, "w" + axis], self.orientation[id, "h" + axis]])
+
+    def addConstraints(self, ids, pairs):
+        backend = self.backend
+        reach = self.reach
+        fitM = self.fitM
+        sij = self.sij
+        orientation = self.orientation
+        rel = self.relative_position
+        extent = self.extent
+        position = self.position
+        containerIds = self.containerIds
+
+        # 1. Assign each carton to at most one container (exactly one with assignAll)
+        if self.assignAll:
+            block = backend.addConstrs(ids, lambda id: backend.quicksum(sij[id, container] for container in containerIds) == 1, name="assign")
+        else:
+            block = backend.addConstrs(ids, lambda id: backend.quicksum(sij[id, container] for container in containerIds) <= 1, name="assign")
+        self.own(block, lambda key: key)
+
+        # 2. Orientation consistency: each dimension aligns with exactly one axis and each axis has one dimension
+        block = backend.addConstrs([(id, d) for id in ids for d in "lwh"],
+                                   lambda id, d: orientation[id, d + "x"] + orientation[id, d + "y"] + orientation[id, d + "z"] == 1,
+                                   name="orient")
+        self.own(block, lambda key: key[0])
+        block = backend.addConstrs([(id, a) for id in ids for a in AXES],
+                                   lambda id, a: orientation[id, "l" + a] + orientation[id, "w" + a] + orientation[id, "h" + a] == 1,
+                                   name="axis")
+        self.own(block, lambda key: key[0])
+
+        # 3. Fit cartons within container dimensions
+        limits = self.limits
+        block = backend.addConstrs([(id, container, a) for id in ids for container in containerIds if (id, container) not in self.excluded for a in AXES],
+                                   lambda id, container, a: position[a][id] + extent[(id, a)] <= limits[(container, a)]
+                                   + fitM(id, container, a) * (1 - sij[id, container]), name="fit")
+        self.own(block, lambda key: key[0])
+
+        # weight constraints, shared by all the cartons: later cartons are added to the rows
+        if self.weightLimit:
+            weights = {carton['id']: carton['weight'] for carton in self.cartons}
+            if self.weightRows is None:
+                limits = {container['id']: container['weight'] for container in self.containers}
+                self.weightRows = backend.addConstrs(containerIds, lambda container: backend.linExpr(
+                    [weights[id] for id in ids], [sij[id, container] for id in ids]) <= limits[container], name="weight_limit")
+            else:
+                for id in ids:
+                    for container in containerIds:
+                        backend.chgCoeff(self.weightRows[container], sij[id, container], weights[id])
+
+        # 4. Cartons sharing a container must be separated along some axis
+        sides = {(container, i, k): self.sideBySide(i, k, container) for container in containerIds for i, k in pairs
+                 if (i, container) not in self.excluded and (k, container) not in self.excluded}
+        block = backend.addConstrs(list(sides), lambda container, i, k: backend.linExpr(
+            [1] * (2 * len(sides[container, i, k])), [rel[i, k, r] for a in sides[container, i, k] for r in SEPARATIONS[a]])
+            >= sij[i, container] + sij[k, container] - 1, name="relative_sum")
+        self.own(block, lambda key: key[2])
+        for a, (before, after) in SEPARATIONS.items():
+            separable = [(i, k) for i, k in pairs if a in self.separable[(i, k)]]
+            block = backend.addConstrs(separable, lambda i, k: position[a][i] + extent[(i, a)] <= position[a][k] + reach(i, a) * (1 - rel[i, k, before]),
+                                       name="no_overlap_" + before)
+            self.own(block, lambda key: key[1])
+            block = backend.addConstrs(separable, lambda i, k: position[a][k] + extent[(k, a)] <= position[a][i] + reach(k, a) * (1 - rel[i, k, after]),
+                                       name="no_overlap_" + after)
+            self.own(block, lambda key: key[1])
+
+    # pj[container] is 1 if a priority carton is assigned to the container
+    def addPriorityConstraints(self, ids):
+        priorities = {carton['id']: carton['priority'] for carton in self.cartons if carton['priority']}
+        block = self.backend.addConstrs([(container, id) for container in self.containerIds for id in ids if id in priorities],
+                                        lambda container, id: self.pj[container] >= priorities[id] * self.sij[id, container],
+                                        name="priority")
+        self.own(block, lambda key: key[1])
+
+    # Every assigned carton is on the ground or supported by a carton of the same container, with its top face at
+    # the bottom of the carton and overhanging it by at most stabilityFactor times its own extent
+    def addStabilityConstraints(self, ids, pairs):
+        backend = self.backend
+        M = self.M
+        sij = self.sij
+        extent = self.extent
+        xi, yi, zi = self.xi, self.yi, self.zi
+        containerIds = self.containerIds
+        stabilityFactor = self.stabilityFactor
+        newest = lambda key: self.newest(key[0], key[1])
+        ordered = [(i, k) for i, k in pairs] + [(k, i) for i, k in pairs]
+
+        block = backend.addVars(ids, BINARY, name="ground")
+        self.ground.update(block)
+        self.own(block, lambda key: key)
+        block = backend.addVars(ordered, BINARY, name="support")
+        self.support.update(block)
+        self.own(block, newest)
+        block = backend.addVars([(i, j, container) for i, j in ordered for container in containerIds], BINARY, name="together")
+        self.together.update(block)
+        self.own(block, newest)
+        support = self.support
+        together = self.together
+
+        block = backend.addConstrs(ids, lambda i: zi[i] <= (1 - self.ground[i]) * M, name="ground")
+        self.own(block, lambda key: key)
+        # platform rows of the cartons already in the model get the supports by the new cartons
+        new = set(ids)
+        for i, k in pairs:
+            if i not in new: backend.chgCoeff(self.platformRows[i], support[i, k], 1)
+        block = backend.addConstrs(ids, lambda i: self.ground[i] + backend.quicksum(support[i, j] for j in self.ids if j != i)
+                                   >= backend.quicksum(sij[i, container] for container in containerIds), name="platform")
+        self.platformRows.update(block)
+        self.own(block, lambda key: key)
+
+        together_keys = [(i, j, container) for i, j in ordered for container in containerIds]
+        blocks = [
+            backend.addConstrs(ordered, lambda i, j: zi[i] <= zi[j] + extent[(j, "z")] + (1 - support[i, j]) * M, name="stability_z_1"),
+            backend.addConstrs(ordered, lambda i, j: zi[i] + (1 - support[i, j]) * M >= zi[j] + extent[(j, "z")], name="stability_z_2"),
+        ]
+        for a, position in (("x", xi), ("y", yi)):
+            blocks.append(backend.addConstrs(ordered, lambda i, j: position[i] + extent[(i, a)] <= position[j] + extent[(j, a)]
+                                             + stabilityFactor * extent[(i, a)] + M * (1 - support[i, j]), name="stability_" + a + "_1"))
+            blocks.append(backend.addConstrs(ordered, lambda i, j: position[i] <= position[j] + stabilityFactor * extent[(i, a)]
+                                             + M * (1 - support[i, j]), name="stability_" + a + "_2"))
+        blocks.append(backend.addConstrs(ordered, lambda i, j: backend.quicksum(together[i, j, container] for container in containerIds)
+                                         >= support[i, j], name="stability_sum"))
+        blocks.append(backend.addConstrs(together_keys, lambda i, j, container: together[i, j, container] <= sij[i, container],
+                                         name="together_i"))
+        blocks.append(backend.addConstrs(together_keys, lambda i, j, container: together[i, j, container] <= sij[j, container],
+                                         name="together_j"))
+        for block in blocks:
+            self.own(block, newest)
+
+    # Classes of identical containers, with more than one container, in the order of the model
+    def identicalContainers(self):
+        classes = {}
+        for container in self.containers:
+            key = (container['length'], container['width'], container['height'], container['weight'])
+            classes.setdefault(key, []).append(container['id'])
+        return [members for members in classes.values() if len(members) > 1]
+
+    # Symmetry breaking constraints of the new cartons with the cartons identical to them and the identical containers
+    def addSymmetryConstraints(self, cartons):
+        backend = self.backend
+        sij = self.sij
+        position = self.position
+        excluded = self.excluded
+        containerIds = self.containerIds
+        pairs = []                  #(previous carton of the class, new carton)
+        for carton in cartons:
+            id = carton['id']
+            key = (tuple(self.sizes[id]), carton['weight'], carton['cost'], carton.get('priority'))
+            members = self.classes.setdefault(key, [])
+            if members: pairs.append((members[-1], id))
+            members.append(id)
+            self.classOf[id] = key
+
+        # a carton of a class is only placed if the one before it is
+        if not self.assignAll:
+            block = backend.addConstrs(pairs, lambda i, k: backend.quicksum(sij[i, container] for container in containerIds)
+                                       >= backend.quicksum(sij[k, container] for container in containerIds), name="symmetry_placed")
+            self.own(block, lambda key: key[1])
+        # in the same container, a carton of a class doesn't start after the next one along their first axis, nor
+        # lie entirely after it
+        ordered = [(i, k) for i, k in pairs if self.separable[(i, k)]]
+        axis = {(i, k): self.separable[(i, k)][0] for i, k in ordered}
+        backend.fix([self.relative_position[i, k, SEPARATIONS[axis[(i, k)]][1]] for i, k in ordered], 0)
+        block = backend.addConstrs([(i, k, container) for i, k in ordered for container in containerIds if (k, container) not in excluded],
+                                   lambda i, k, container: position[axis[(i, k)]][i] <= position[axis[(i, k)]][k]
+                                   + self.reach(i, axis[(i, k)]) * (2 - sij[i, container] - sij[k, container]), name="symmetry_order")
+        self.own(block, lambda key: key[1])
+
+        # a container of a class only holds a carton if the container before it holds an earlier carton
+        new = [carton['id'] for carton in cartons]
+        keys = [(id, members[t]) for id in new for members in self.containerClasses for t in range(1, len(members))
+                if (id, members[t]) not in excluded]
+        previous = {members[t]: members[t - 1] for members in self.containerClasses for t in range(1, len(members))}
+        def rule(id, container):
+            earlier = [sij[j, previous[container]] for j in self.ids[:self.order[id]] if (j, previous[container]) not in excluded]
+            return backend.linExpr([1] * len(earlier) + [-1], earlier + [sij[id, container]]) >= 0
+        block = backend.addConstrs(keys, rule, name="symmetry_containers")
+        self.own(block, lambda key: key[0])
+
+    # Relabelling of a solution, given as carton id -> placement in the format returned by solution, that meets the
+    # symmetry breaking constraints: identical cartons are sorted by placed first, container and position along
+    # their first axis, then identical containers by their first carton. Returns the carton and the container
+    # relabellings, old -> new, of the labels that change
+    def canonicalLabels(self, placements):
+        cartonLabels, containerLabels = {}, {}
+        if not self.symmetry: return cartonLabels, containerLabels
+        index = {container: n for n, container in enumerate(self.containerIds)}
+        for members in self.classes.values():
+            if len(members) < 2: continue
+            axes = self.separable[(members[0], members[1])]
+            def rank(id):
+                entry = placements.get(id)
+                if entry is None: return (1, 0, 0)
+                return (0, index[entry['container_id']], entry[axes[0]] if axes else 0)
+            for old, new in zip(sorted(members, key=rank), members):
+                if old != new: cartonLabels[old] = new
+        first = {}
+        for id, entry in placements.items():
+            order = self.order[cartonLabels.get(id, id)]
+            first[entry['container_id']] = min(order, first.get(entry['container_id'], order))
+        for members in self.containerClasses:
+            for old, new in zip(sorted(members, key=lambda container: first.get(container, len(self.ids))), members):
+                if old != new: containerLabels[old] = new
+        return cartonLabels, containerLabels
+
+    # Start values of the orientation of a carton with the sizes along the axes of a placement: the dimension of the
+    # carton matching its size along every axis. Empty if the sizes are not the dimensions of the carton
+    def orientationStart(self, carton, entry):
+        sizes = {"l": carton['length'], "w": carton['width'], "h": carton['height']}
+        along = {}
+        for axis in AXES:
+            d = next((d for d in "lwh" if d not in along.values() and sizes[d] == entry[SOLUTION_DIMENSIONS[axis]]), None)
+            if d is None: return {}
+            along[axis] = d
+        return {d + axis: 1 if along[axis] == d else 0 for axis in AXES for d in "lwh"}
+
+    # Start values of the relative positions of two cartons placed in the same container
+    def relativeStart(self, i, k, a, b):
+        values = {}
+        for axis in self.separable[(i, k)]:
+            before, after = SEPARATIONS[axis]
+            size = SOLUTION_DIMENSIONS[axis]
+            values[before] = 1 if a[axis] + a[size] <= b[axis] else 0
+            values[after] = 1 if b[axis] + b[size] <= a[axis] else 0
+        return values
+
+    # Sizes along the axes of the cartons of a warm start, from their orientations, in the format returned by solution
+    def startSizes(self, init):
+        entries = {}
+        for id, orientations in init['orientation'].items():
+            if id not in self.order: continue
+            carton = self.cartons[self.order[id]]
+            sizes = {"l": carton['length'], "w": carton['width'], "h": carton['height']}
+            entries[id] = {SOLUTION_DIMENSIONS[axis]: sum(sizes[d] * orientations.get(d + axis, 0) for d in "lwh") for axis in AXES}
+        return entries
+
+    # Placements of the cartons of a warm start in a container of the model, in the format returned by solution
+    def startPlacements(self, init, entries = None):
+        if entries is None: entries = self.startSizes(init)
+        placements = {}
+        for (id, container), value in init['sij'].items():
+            if value < 0.5 or id not in entries or container not in self.containerIds: continue
+            placements[id] = dict(entries[id], container_id=container, x=init['xi'].get(id, 0), y=init['yi'].get(id, 0),
+                                  z=init['zi'].get(id, 0))
+        return placements
+
+    # Start values of the stability variables of a warm start: a carton is on the ground at height 0, and supported
+    # by a carton of its container whose top face is at its bottom, within the overhang of addStabilityConstraints
+    def stabilityStart(self, init, start):
+        placements = self.startPlacements(init)
+        for id in self.ids:
+            entry = placements.get(id)
+            start(self.ground[id], 1 if entry is not None and entry['z'] == 0 else 0)
+        for (i, j), variable in self.support.items():
+            a, b = placements.get(i), placements.get(j)
+            same = a is not None and b is not None and a['container_id'] == b['container_id']
+            for container in self.containerIds:
+                start(self.together[i, j, container], 1 if same and a['container_id'] == container else 0)
+            overhang = lambda axis: self.stabilityFactor * a[SOLUTION_DIMENSIONS[axis]]
+            supported = same and a['z'] == b['z'] + b['DimZ'] and all(
+                a[axis] + a[SOLUTION_DIMENSIONS[axis]] <= b[axis] + b[SOLUTION_DIMENSIONS[axis]] + overhang(axis)
+                and a[axis] <= b[axis] + overhang(axis) for axis in ("x", "y"))
+            start(variable, 1 if supported else 0)
+
+    # Warm start of setStart relabelled with canonicalLabels
+    # Identical cartons may have their dimensions in another order, so the orientations of the cartons relabelled are
+    # found again from their sizes along the axes
+    def canonicalStart(self, init):
+        entries = self.startSizes(init)
+        placements = self.startPlacements(init, entries)
+        cartonLabels, containerLabels = self.canonicalLabels(placements)
+        if not cartonLabels and not containerLabels: return init
+        carton = lambda id: cartonLabels.get(id, id)
+        container = lambda id: containerLabels.get(id, id)
+        canonical = {"sij": {(carton(id), container(c)): value for (id, c), value in init['sij'].items()},
+                     "orientation": {carton(id): value for id, value in init['orientation'].items()},
+                     "relative_position": {key: value for key, value in init['relative_position'].items()
+                                           if key[0] not in cartonLabels and key[1] not in cartonLabels}}
+        for name in ("xi", "yi", "zi"):
+            canonical[name] = {carton(id): value for id, value in init[name].items()}
+        for old, new in cartonLabels.items():
+            if old in entries: canonical['orientation'][new] = self.orientationStart(self.cartons[self.order[new]], entries[old])
+        placements = {carton(id): dict(entry, container_id=container(entry['container_id'])) for id, entry in placements.items()}
+        for i, k in self.pairs:
+            if i not in cartonLabels and k not in cartonLabels: continue
+            a, b = placements.get(i), placements.get(k)
+            if a is None or b is None or a['container_id'] != b['container_id']:
+                canonical['relative_position'][(i, k)] = {rel: 0 for axis in self.separable[(i, k)] for rel in SEPARATIONS[axis]}
+            else:
+                canonical['relative_position'][(i, k)] = self.relativeStart(i, k, a, b)
+        return canonical
+
+    # Minimize the cost of the cartons left out (plus additionalCost), and of the priority containers with priorityCost
+    def setObjective(self, additionalCost = 0):
+        keys = [(carton['id'], container) for carton in self.cartons for container in self.containerIds]
+        costs = {carton['id']: carton['cost'] for carton in self.cartons}
+        placed = self.backend.linExpr([costs[id] for id, container in keys], [self.sij[key] for key in keys])
+        penalty = sum(carton['cost'] for carton in self.cartons) + additionalCost - placed
+        if self.priorityCost is not None:
+            penalty = penalty + self.priorityCost * self.backend.quicksum(self.pj.values())
+        self.backend.setObjective(penalty)
+
+    # Warm start from a solution given as the dictionaries built by get_from_greedy. Entries of cartons or containers
+    # not in the model are skipped, and pairs of cartons missing from the sparse relative positions start at 0
+    def setStart(self, init):
+        init = self.canonicalStart(init)
+        variables, values = [], []
+        def start(variable, value):
+            variables.append(variable)
+            values.append(value)
+        for key, value in init['sij'].items():
+            if key in self.sij: start(self.sij[key], value)
+        for name, position in (("xi", self.xi), ("yi", self.yi), ("zi", self.zi)):
+            for id, value in init[name].items():
+                if id in position: start(position[id], value)
+        for id, orientations in init['orientation'].items():
+            for orient, value in orientations.items():
+                if (id, orient) in self.orientation: start(self.orientation[id, orient], value)
+        for i, k in self.pairs:
+            for orient, value in relative_start(init, i, k).items():
+                if (i, k, orient) in self.relative_position: start(self.relative_position[i, k, orient], value)
+        if self.priorityCost is not None:
+            for carton in self.cartons:
+                if carton['priority'] != 1: continue
+                for container in self.containerIds:
+                    if init['sij'].get((carton['id'], container)) == 1: start(self.pj[container], 1)
+        if self.stability: self.stabilityStart(init, start)
+        self.backend.setStart(variables, values)
+
+    # Warm start from placements in the format returned by solution. Cartons of the model without a placement are
+    # left without a start, for the solver to complete
+    def setStartFromSolution(self, solution):
+        variables, values = [], []
+        def start(variable, value):
+            variables.append(variable)
+            values.append(value)
+        placements = {entry['carton_id']: entry for entry in solution
+                      if entry['carton_id'] in self.order and entry['container_id'] in self.containerIds}
+        cartonLabels, containerLabels = self.canonicalLabels(placements)
+        placements = {cartonLabels.get(id, id): dict(entry, carton_id=cartonLabels.get(id, id),
+                                                     container_id=containerLabels.get(entry['container_id'], entry['container_id']))
+                      for id, entry in placements.items()}
+        for carton in self.cartons:
+            id = carton['id']
+            entry = placements.get(id)
+            if entry is None: continue
+            for container in self.containerIds:
+                start(self.sij[id, container], 1 if container == entry['container_id'] else 0)
+            for axis, position in self.position.items():
+                start(position[id], entry[axis])
+            for orient, value in self.orientationStart(carton, entry).items():
+                start(self.orientation[id, orient], value)
+            if self.priorityCost is not None and carton['priority'] == 1:
+                start(self.pj[entry['container_id']], 1)
+        for i, k in self.pairs:
+            if i not in placements or k not in placements: continue
+            a, b = placements[i], placements[k]
+            if a['container_id'] != b['container_id']: continue
+            for rel, value in self.relativeStart(i, k, a, b).items():
+                start(self.relative_position[i, k, rel], value)
+        self.backend.setStart(variables, values)
+
+    # Fix a carton to a placement in the format returned by solution, for the other cartons to be packed around it.
+    # Only for models without symmetry breaking, which could order the fixed carton after an identical free one
+    def fixPlacement(self, entry):
+        id = entry['carton_id']
+        backend = self.backend
+        for container in self.containerIds:
+            backend.fix([self.sij[id, container]], 1 if container == entry['container_id'] else 0)
+        for axis, position in self.position.items():
+            backend.fix([position[id]], entry[axis])
+        for orient, value in self.orientationStart(self.cartons[self.order[id]], entry).items():
+            backend.fix([self.orientation[id, orient]], value)
+
+    # Use the solution found as the warm start of the next optimize
+    def keepSolutionAsStart(self):
+        self.backend.keepSolutionAsStart()
+
+    # Solve, within timeout seconds if given. The solve stops as soon as interrupt, if given, returns True, or as
+    # control (a SolveControl) tells. Returns the status of the solve, one of the statuses of solver_backend
+    def optimize(self, timeout = None, interrupt = None, control = None):
+        return self.backend.optimize(timeout, interrupt, control)
+
+    # Dimensions of a carton along the axes in the solution found, or in the solution given by value
+    def dimensions(self, id, value = None):
+        value = value or self.backend.value
+        return [value(self.extent[(id, axis)]) for axis in AXES]
+
+    # Placements of the assigned cartons in the solution found, container by container, with the listed carton
+    # fields copied into every entry. value gives the values of another solution, such as an incumbent streamed by
+    # a SolveControl
+    def solution(self, fields = (), value = None):
+        value = value or self.backend.value
+        solution = []
+        for container in self.containerIds:
+            for carton in self.cartons:
+                id = carton['id']
+                if value(self.sij[id, container]) > 0.5:
+                    dimX, dimY, dimZ = self.dimensions(id, value)
+                    entry = {
+                        "carton_id": id,
+                        "container_id": container,
+                        "x": value(self.xi[id]),
+                        "y": value(self.yi[id]),
+                        "z": value(self.zi[id]),
+                        "DimX": dimX,
+                        "DimY": dimY,
+                        "DimZ": dimZ,
+                    }
+                    for field in fields: entry[field] = carton[field]
+                    solution.append(entry)
+        return solution
+
+    # Cartons left out of every container in the solution found, with the listed carton fields
+    def unassigned(self, fields = (), value = None):
+        value = value or self.backend.value
+        solution = []
+        for carton in self.cartons:
+            id = carton['id']
+            if sum(value(self.sij[id, container]) for container in self.containerIds) < 0.5:
+                dimX, dimY, dimZ = self.dimensions(id, value)
+                entry = {"carton_id": id, "container_id": -1, "x": -1, "y": -1, "z": -1, "DimX": dimX, "DimY": dimY, "DimZ": dimZ}
+                for field in fields: entry[field] = carton[field]
+                solution.append(entry)
+        return solution
@@ -0,0 +1,193 @@
+import time
+import random
+from MIP1.container_loading_model import ContainerLoadingModel
+from MIP1.carton_to_package import sol_to_package
+from MIP1.package_to_carton import make_carton
+from MIP1 import solver_backend
+from utils.updatePackages import updatePackages
+
+# Large neighbourhood search around the packing of the ULDs.
+# Every step frees the packages of one part of a ULD (a box around a package, or a slab along x), keeps the rest of
+# the ULD as it is, and packs the part again with the best unassigned packages that fit in it, solving a small
+# ContainerLoadingModel with a short time limit. Packages cut by the edge of the part are fixed obstacles in it.
+
+NEIGHBOURHOODS = ("region", "slab", "penalty")
+
+
+# Cost squared over volume, the ranking of the unassigned cartons in all_swaps
+def penalty(package):
+    length, width, height = package.getDimensions()
+    return package.cost**2/(length*width*height)
+
+
+class LargeNeighbourhoodSearch:
+    """
+    Large neighbourhood search over the packages of the ULDs, improving the packing in place.
+
+    Neighbourhoods, taken in turn:
+        region: a box around a random package of a random ULD, tried with the best unassigned packages fitting in it.
+        slab: a slab of a random ULD along its length, with the same packages.
+        penalty: a box around one of the packages of a ULD removing the least cost per volume, tried with the
+            unassigned packages of highest penalty (cost squared over volume) first.
+
+    The size of every neighbourhood, as a fraction of the ULD along the axes it cuts, adapts to the solve times: it
+    grows while the steps are solved to optimality within half their time limit, and shrinks when a step runs out of
+    time. A part freeing more than maxCartons cartons is shrunk before being solved. Improvements are accepted as
+    soon as they are found and applied with updatePackages.
+
+    Args:
+        packages (list): package objects, as in run_all.
+        ulds (list): ULD objects holding the packages.
+        solver (str): solver backend, "gurobi" or "highs".
+        stepTime (float): time limit of a step, in seconds.
+        maxCartons (int): number of cartons, free and fixed, in the model of a step at most. The default keeps the
+            models within the size limited Gurobi license.
+        candidates (int): number of unassigned packages tried in a step at most.
+        control (SolveControl): stopping rules of the steps.
+        seed (int): seed of the random choices.
+        profile (SolverProfile or str): solver profile of the models of the steps, or the name of one.
+    """
+
+    def __init__(self, packages, ulds, solver = "gurobi", stepTime = 5, maxCartons = 20, candidates = 8, control = None,
+                 seed = 0, profile = None):
+        self.packages = packages
+        self.ulds = ulds
+        self.solver = solver
+        self.stepTime = stepTime
+        self.maxCartons = maxCartons
+        self.candidates = candidates
+        self.control = control
+        self.random = random.Random(seed)
+        self.profile = profile
+        self.size = {"region": 0.5, "slab": 0.25, "penalty": 0.5}
+        self.steps = []             #(neighbourhood, seconds, cost removed)
+
+    # Part of a ULD freed by a neighbourhood, as the origin and the extent of a box
+    def part(self, kind, uld):
+        limits = [uld.length, uld.width, uld.height]
+        size = self.size[kind]
+        if kind == "slab":
+            extent = [max(1, int(size*limits[0])), limits[1], limits[2]]
+            return [self.random.randint(0, limits[0] - extent[0]), 0, 0], extent
+        if kind == "penalty":
+            ranked = sorted(uld.packages, key=lambda package: package.cost/package.getVolume())
+            anchor = self.random.choice(ranked[:3])
+        else:
+            anchor = self.random.choice(uld.packages)
+        extent = [max(1, int(size*limit)) for limit in limits]
+        centre = [anchor.position[a] + anchor.getDimensions()[a]/2 for a in range(3)]
+        origin = [min(max(0, int(centre[a] - extent[a]/2)), limits[a] - extent[a]) for a in range(3)]
+        return origin, extent
+
+    # Packages of a ULD inside a box, and the boxes cut out of it by the packages crossing its edge, in the
+    # coordinates of the box
+    def split(self, uld, origin, extent):
+        free, obstacles = [], []
+        for package in uld.packages:
+            dimensions = package.getDimensions()
+            low = [max(package.position[a], origin[a]) for a in range(3)]
+            high = [min(package.position[a] + dimensions[a], origin[a] + extent[a]) for a in range(3)]
+            if any(high[a] <= low[a] for a in range(3)): continue
+            if all(low[a] == package.position[a] and high[a] == package.position[a] + dimensions[a] for a in range(3)):
+                free.append(package)
+            else:
+                obstacles.append({"carton_id": package.id, "container_id": uld.id,
+                                  "x": low[0] - origin[0], "y": low[1] - origin[1], "z": low[2] - origin[2],
+                                  "DimX": high[0] - low[0], "DimY": high[1] - low[1], "DimZ": high[2] - low[2]})
+        return free, obstacles
+
+    # Unassigned packages tried in a part of the given extent, the ones ranked first by a neighbourhood first
+    def choose(self, kind, extent, count):
+        size = sorted(extent)
+        unassigned = [package for package in self.packages if str(package.ULD) == "-1"
+                      and all(d <= s for d, s in zip(sorted(package.getDimensions()), size))]
+        unassigned.sort(key=penalty, reverse=True)
+        if kind != "penalty":
+            unassigned = unassigned[:3*count]
+            self.random.shuffle(unassigned)
+        return unassigned[:count]
+
+    # One step of the search with a neighbourhood. Returns the cost removed
+    def step(self, kind, timeout):
+        uld = self.random.choice([uld for uld in self.ulds if uld.packages] or self.ulds)
+        if not uld.packages: return 0
+        for _ in range(5):
+            origin, extent = self.part(kind, uld)
+            free, obstacles = self.split(uld, origin, extent)
+            if len(free) + len(obstacles) <= self.maxCartons: break
+            self.size[kind] *= 0.8
+        else:
+            return 0
+        tried = self.choose(kind, extent, min(self.candidates, self.maxCartons - len(free) - len(obstacles)))
+        if not free and not tried: return 0
+
+        cartons = [make_carton(package) for package in free + tried]
+        for obstacle in obstacles:
+            sizes = sorted((obstacle['DimX'], obstacle['DimY'], obstacle['DimZ']))
+            cartons.append({"id": obstacle['carton_id'], "length": sizes[0], "width": sizes[1], "height": sizes[2],
+                            "weight": 0, "Priority": 0, "cost": 0, "container_id": uld.id})
+        inside = set(package.id for package in free)
+        container = {"id": uld.id, "length": extent[0], "width": extent[1], "height": extent[2],
+                     "weight": uld.weight_limit - sum(package.weight for package in uld.packages if package.id not in inside)}
+        params = {'LogToConsole': 0, 'OutputFlag': 0}
+        loading = ContainerLoadingModel(cartons, [container], symmetry=False, solver=self.solver, params=params,
+                                        profile=self.profile)
+        for obstacle in obstacles:
+            loading.fixPlacement(obstacle)
+        loading.setObjective()
+        current = []
+        for package in free:
+            dimX, dimY, dimZ = package.getDimensions()
+            current.append({"carton_id": package.id, "container_id": uld.id, "x": package.position[0] - origin[0],
+                            "y": package.position[1] - origin[1], "z": package.position[2] - origin[2],
+                            "DimX": dimX, "DimY": dimY, "DimZ": dimZ})
+        loading.setStartFromSolution(current + obstacles)
+
+        start = time.time()
+        status = loading.optimize(timeout, control=self.control)
+        seconds = time.time() - start
+        if status == solver_backend.OPTIMAL and seconds < timeout/2: self.size[kind] = min(1, self.size[kind]*1.25)
+        elif status != solver_backend.OPTIMAL: self.size[kind] = max(0.1, self.size[kind]*0.8)
+        if status not in (solver_backend.OPTIMAL, solver_backend.FEASIBLE): return 0
+        gain = sum(package.cost for package in tried) - loading.backend.objectiveValue()
+        if gain <= 1e-6: return 0
+
+        fixed = set(obstacle['carton_id'] for obstacle in obstacles)
+        #the coordinates are integer variables, rounded off the tolerances of the solver
+        solution = [dict(entry, x=round(entry['x']) + origin[0], y=round(entry['y']) + origin[1], z=round(entry['z']) + origin[2],
+                         DimX=round(entry['DimX']), DimY=round(entry['DimY']), DimZ=round(entry['DimZ']))
+                    for entry in loading.solution(("weight", "cost")) if entry['carton_id'] not in fixed]
+        solution += loading.unassigned(("weight", "cost"))
+        updatePackages(self.packages, sol_to_package(solution), self.ulds)
+        return gain
+
+    # Run steps until timeout seconds are over or the control is cancelled, taking the neighbourhoods in turn.
+    # Returns the cost removed
+    def run(self, timeout):
+        deadline = time.time() + timeout
+        removed = 0
+        n = 0
+        while deadline - time.time() > 1:
+            if self.control is not None and self.control.cancelled(): break
+            kind = NEIGHBOURHOODS[n % len(NEIGHBOURHOODS)]
+            n += 1
+            start = time.time()
+            try:
+                gain = self.step(kind, min(self.stepTime, deadline - time.time()))
+            except solver_backend.SolverError as error:
+                #a model too large for the license: the next steps of the neighbourhood are smaller
+                print("LNS step failed:", error)
+                self.size[kind] = max(0.1, self.size[kind]*0.8)
+                gain = 0
+            self.steps.append((kind, time.time() - start, gain))
+            removed += gain
+        return removed
+
+    # Print the steps run, by neighbourhood
+    def report(self):
+        for kind in NEIGHBOURHOODS:
+            steps = [step for step in self.steps if step[0] == kind]
+            if not steps: continue
+            print("    {0}: {1} steps, {2} improving, {3:.2f}s, cost removed {4}, size {5:.2f}".format(
+                kind, len(steps), sum(1 for step in steps if step[2] > 0), sum(step[1] for step in steps),
+                sum(step[2] for step in steps), self.size[kind]))
@@ -1,3 +1,65 @@
+import numpy as np
+from utils.packageRegistry import PackageRegistry
+from utils.snapshot import loadSnapshot, snapshotPackages
+
+# Relative position variables of a pair of cartons along every axis: the first is 1 if carton i ends before carton k
+# starts, the second if carton i starts after carton k ends
+RELATIONS = (("aik", "bik"), ("cik", "dik"), ("eik", "fik"))
+
+
+def relative_positions(packages):
+    """
+    Start values of the relative position variables of the pairs of packages placed in the same ULD.
+    The comparisons of every ULD are done at once with NumPy broadcasting, and pairs of packages in different ULDs
+    or not placed are left out: all their relative positions start at 0, which is what the models set for a pair
+    missing from the mapping.
+    Args:
+        packages (list): package objects with id, ULD, position and dimensions along the axes.
+    Returns:
+        dict: (id_i, id_k) -> {"aik": ..., "fik": ...} for the pairs of packages in the same ULD, with id_i < id_k.
+    """
+    groups = {}
+    for package in packages:
+        if str(package.ULD) == '-1': continue
+        groups.setdefault(str(package.ULD), []).append(package)
+    relative_position = {}
+    for members in groups.values():
+        if len(members) < 2: continue
+        members.sort(key=lambda x: x.id)
+        ids = np.array([package.id for package in members], dtype=object)
+        position = np.array([list(package.position) for package in members], dtype=np.float64)
+        end = position + np.array([list(package.dimensions) for package in members], dtype=np.float64)
+        i, k = np.triu_indices(len(members), 1)
+        # packages with the same id have no pair, as in the models
+        keep = ids[i] != ids[k]
+        i, k = i[keep], k[keep]
+        before = end[i] <= position[k]
+        after = (position[i] >= end[k]) & ~before
+        # (pairs, 6) columns in the order of RELATIONS: before and after along every axis
+        values = np.stack([before, after], axis=2).reshape(len(i), 6).astype(int).tolist()
+        relative_position.update({pair: {"aik": a, "bik": b, "cik": c, "dik": d, "eik": e, "fik": f}
+                                  for pair, (a, b, c, d, e, f) in zip(zip(ids[i].tolist(), ids[k].tolist()), values)})
+    return relative_position
+
+
+def relative_start(init, i, k):
+    """
+    Start values of the relative positions of the pair (i, k) in a warm start, all 0 for a pair missing from the
+    sparse mapping of relative_positions. The models may add their cartons in any order: a pair kept as (k, i) has
+    its before and after relations swapped.
+    Args:
+        init (dict): warm start, as returned by get_from_greedy.
+        i (str): id of the first carton of the pair in the model.
+        k (str): id of the second carton.
+    Returns:
+        dict: relative position variable name -> start value.
+    """
+    values = init['relative_position'].get((i, k))
+    if values is not None: return values
+    values = init['relative_position'].get((k, i))
+    if values is None: return {name: 0 for relation in RELATIONS for name in relation}
+    return {name: values[other] for before, after in RELATIONS for name, other in ((before, after), (after, before))}
+
 def get_from_greedy(filename = None, packageArray = None):
     """
     Generates an initial solution for package placement using a greedy approach.
@@ -5,8 +67,8 @@ def get_from_greedy(filename = None, packageArray = None):
     and generates initial placement and orientation information for each package 
     in a set of predefined ULDs (Unit Load Devices).
     Args:
-        filename (str, optional): The path to the CSV file containing package data. 
-                                    If None, packageArray must be provided.
+        filename (str, optional): The path to the CSV file containing package data, or to a .npz
+                                    snapshot of utils.snapshot. If None, packageArray must be provided.
         packageArray (list, optional): A list of Package objects. If None, filename must be provided.
     Returns:
         dict: A dictionary containing the initial solution with the following keys:
@@ -14,7 +76,8 @@ def get_from_greedy(filename = None, packageArray = None):
             - 'xi': A dictionary with the x-coordinates of each package.
             - 'yi': A dictionary with the y-coordinates of each package.
             - 'zi': A dictionary with the z-coordinates of each package.
-            - 'relative_position': A dictionary indicating the relative positions of packages.
+            - 'relative_position': The relative positions of the pairs of packages in the same ULD, see
+              relative_positions. Pairs missing from it start at 0.
             - 'orientation': A dictionary indicating the orientation of each package.
     Raises:
         ValueError: If both filename and packageArray are None.
@@ -31,6 +94,8 @@ def get_from_greedy(filename = None, packageArray = None):
     ULDS = ["U1", "U2", "U3", "U4", "U5", "U6"]
     if filename is None:
         packages = packageArray
+    elif filename.endswith(".npz"):
+        packages = snapshotPackages(loadSnapshot(filename))
     else:
         with open(filename, mode='r') as file:
             csv_reader = csv.reader(file)
@@ -58,50 +123,7 @@ def get_from_greedy(filename = None, packageArray = None):
             initialxi[package.id] = 0
             initialyi[package.id] = 0
             initialzi[package.id] = 0
-    initialrelative_position = {}
-    for package in packages:
-        for other_package in packages:
-            if package.id >= other_package.id:
-                continue
-            dict = {}
-            if package.ULD != other_package.ULD :
-                dict["aik"] = 0
-                dict["bik"] = 0
-                dict["cik"] = 0
-                dict["dik"] = 0
-                dict["eik"] = 0
-                dict["fik"] = 0
-                initialrelative_position[(package.id, other_package.id)] = dict
-                continue
-
-            if (package.position[0] + package.dimensions[0] <= other_package.position[0]):
-                dict["aik"] = 1
-                dict["bik"] = 0
-            elif (package.position[0] >= other_package.position[0] + other_package.dimensions[0]):
-                dict["aik"] = 0
-                dict["bik"] = 1
-            else:
-                dict["aik"] = 0
-                dict["bik"] = 0
-            if (package.position[1] + package.dimensions[1] <= other_package.position[1]):
-                dict["cik"] = 1
-                dict["dik"] = 0
-            elif (package.position[1] >= other_package.position[1] + other_package.dimensions[1]):
-                dict["cik"] = 0
-                dict["dik"] = 1
-            else:
-                dict["cik"] = 0
-                dict["dik"] = 0
-            if (package.position[2] + package.dimensions[2] <= other_package.position[2]):
-                dict["eik"] = 1
-                dict["fik"] = 0
-            elif (package.position[2] >= other_package.position[2] + other_package.dimensions[2]):
-                dict["eik"] = 0
-                dict["fik"] = 1
-            else:
-                dict["eik"] = 0
-                dict["fik"] = 0
-            initialrelative_position[(package.id, other_package.id)] = dict
+    initialrelative_position = relative_positions(packages)
 
     initialorientation = {}
     for package in packages:
@@ -290,8 +312,12 @@ def get_specific_from_greedy( container_ids, filename= None, packageArray = None
     rem_packages = []
     specific_packages = []
     ULDS = ["U1", "U2", "U3", "U4", "U5", "U6"]
+    # a single container id, as run_all and parallel_swaps give, is not iterated character by character
+    if isinstance(container_ids, str): container_ids = [container_ids]
     if filename is None:
         packages = packageArray
+    elif filename.endswith(".npz"):
+        packages = snapshotPackages(loadSnapshot(filename))
     else:
         with open(filename, mode='r') as file:
             csv_reader = csv.reader(file)
@@ -333,16 +359,17 @@ def get_specific_from_greedy( container_ids, filename= None, packageArray = None
     initialyi = {}
     initialzi = {}
 
+    # only the pairs of packages sharing a container are kept, as in relative_positions: pairs missing from Pcij
+    # and wij are 0
+    registry = PackageRegistry(pos)
     for container_id in container_ids:
-        for package1 in pos:
-            for package2 in pos:
+        members = registry.getMembers(container_id)
+        for package1 in members:
+            for package2 in members:
                 if package1.id == package2.id:
                     continue
-                Pcij[(package1.id, package2.id, container_id)] = 0
-                wij[(package1.id, package2.id)] = 0
-                if package1.ULD != package2.ULD or package1.ULD != container_id:
-                    continue
                 Pcij[(package1.id, package2.id, container_id)] = 1
+                wij[(package1.id, package2.id)] = 0
                 if are_base_area_intersecting(package1, package2) and package1.position[2] == package2.position[2] + package2.dimensions[2]:
                         wij[(package1.id, package2.id)] = 1
 
@@ -359,50 +386,7 @@ def get_specific_from_greedy( container_ids, filename= None, packageArray = None
             initialxi[package.id] = 0
             initialyi[package.id] = 0
             initialzi[package.id] = 0
-    initialrelative_position = {}
-    for package in pos:
-        for other_package in pos:
-            if package.id >= other_package.id:
-                continue
-            dict = {}
-            if package.ULD != other_package.ULD or str(package.ULD) == '-1':
-                dict["aik"] = 0
-                dict["bik"] = 0
-                dict["cik"] = 0
-                dict["dik"] = 0
-                dict["eik"] = 0
-                dict["fik"] = 0
-                initialrelative_position[(package.id, other_package.id)] = dict
-                continue
-
-            if package.position[0] + package.dimensions[0] <= other_package.position[0]:
-                dict["aik"] = 1
-                dict["bik"] = 0
-            elif package.position[0] >= other_package.position[0] + other_package.dimensions[0]:
-                dict["aik"] = 0
-                dict["bik"] = 1
-            else:
-                dict["aik"] = 0
-                dict["bik"] = 0
-            if package.position[1] + package.dimensions[1] <= other_package.position[1]:
-                dict["cik"] = 1
-                dict["dik"] = 0
-            elif package.position[1] >= other_package.position[1] + other_package.dimensions[1]:
-                dict["cik"] = 0
-                dict["dik"] = 1
-            else:
-                dict["cik"] = 0
-                dict["dik"] = 0
-            if package.position[2] + package.dimensions[2] <= other_package.position[2]:
-                dict["eik"] = 1
-                dict["fik"] = 0
-            elif package.position[2] >= other_package.position[2] + other_package.dimensions[2]:
-                dict["eik"] = 0
-                dict["fik"] = 1
-            else:
-                dict["eik"] = 0
-                dict["fik"] = 0
-            initialrelative_position[(package.id, other_package.id)] = dict
+    initialrelative_position = relative_positions(pos)
 
     initialorientation = {}
     for package in pos:
@@ -487,7 +471,8 @@ def get_specific_from_greedy_multi( container_ids, filename= None, packageArray
     It then assigns each package to a carton or a solution based on the specified container IDs.
     Args:
         container_ids (list): A list of container IDs to filter packages.
-        filename (str, optional): The path to the CSV file containing package data. Defaults to None.
+        filename (str, optional): The path to the CSV file containing package data, or to a .npz snapshot of
+            utils.snapshot. Defaults to None.
         packageArray (list, optional): An array of package objects. Defaults to None.
     Returns:
         tuple: A tuple containing two lists:
@@ -512,6 +497,8 @@ def get_specific_from_greedy_multi( container_ids, filename= None, packageArray
     ULDS = ["U1", "U2", "U3", "U4", "U5", "U6"]
     if filename is None:
         packages = packageArray
+    elif filename.endswith(".npz"):
+        packages = snapshotPackages(loadSnapshot(filename))
     else:
         with open(filename, mode='r') as file:
             csv_reader = csv.reader(file)
@@ -542,7 +529,8 @@ def package_csv_to_sol(filename):
     """
     Reads a CSV file containing package information and converts it into a solution format.
     Args:
-        filename (str): The path to the CSV file containing package data.
+        filename (str): The path to the CSV file containing package data, or to a snapshot saved by
+            utils.snapshot.saveSnapshot (a .npz file), which is read without parsing any text.
     Returns:
         list: A list of solutions generated from the package data.
     The CSV file is expected to have the following columns:
@@ -563,6 +551,8 @@ def package_csv_to_sol(filename):
     packages = []
     sol = []
     ULDS = ["U1", "U2", "U3", "U4", "U5", "U6"]
+    if filename.endswith(".npz"):
+        return [make_solution(package) for package in snapshotPackages(loadSnapshot(filename))]
     with open(filename, mode='r') as file:
         csv_reader = csv.reader(file)
         for row in csv_reader:
@@ -0,0 +1,163 @@
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+from MIP1.model import all_swaps
+from MIP1.package_to_carton import get_specific_from_greedy
+from MIP1.solve_control import SolveControl
+from MIP1.solver_profile import SolverProfile, solver_profile
+from utils.containers import containers_specific
+
+# Swaps in several ULDs at the same time, one worker process per ULD.
+# Every worker solves all_swaps for its ULD with the unassigned cartons it is given, and sends back the placements.
+# The unassigned cartons are dealt between the ULDs beforehand, so a worker mostly tries cartons no other worker has,
+# and merge_swaps settles the cartons claimed by more than one ULD.
+
+
+def swapWorker(conn, cartons, containers, init, assigned_solutions, timeout, solver, profile, gap, stall, cancel):
+    """
+    Main function of a worker process of parallel_swaps: solves all_swaps for one ULD and sends its solution, or None
+    if no feasible solution was found. The solve stops early on the gap, the stall time or the cancel event given.
+    """
+    control = SolveControl(gap, stall, cancel)
+    try:
+        solution = all_swaps(cartons=cartons, containers=containers, init=init, assigned_solutions=assigned_solutions,
+                             timeout=timeout, solver=solver, control=control, profile=profile)
+    except Exception as error:
+        print("Swaps in", containers[0]['id'], "failed:", error)
+        solution = None
+    conn.send(solution)
+    conn.close()
+
+
+def deal_cartons(cartons, uldIds, length = 40):
+    """
+    Shares the unassigned cartons between the ULDs swapped at the same time.
+
+    The cartons are ranked as all_swaps ranks them (cost squared over volume) and dealt one at a time to the ULDs in
+    turn, so every ULD gets its own share of the best cartons. A ULD given fewer than length cartons is topped up with
+    the best cartons of the other ULDs, which it then competes for.
+
+    Args:
+        cartons (list): unassigned cartons, as made by make_carton.
+        uldIds (list): ids of the ULDs swapped.
+        length (int): number of unassigned cartons a ULD is given at most, as in all_swaps.
+    Returns:
+        dict: ULD id -> ids of its unassigned cartons, its own share first.
+    """
+    ranked = sorted(cartons, key=lambda x: -(x['cost']**2)/(x['length']*x['width']*x['height']))
+    shares = {id: [] for id in uldIds}
+    for index, carton in enumerate(ranked):
+        shares[uldIds[index % len(uldIds)]].append(carton['id'])
+    dealt = {}
+    for id in uldIds:
+        chosen = shares[id][:length]
+        taken = set(chosen)
+        for carton in ranked:
+            if len(chosen) >= length: break
+            if carton['id'] not in taken:
+                chosen.append(carton['id'])
+                taken.add(carton['id'])
+        dealt[id] = chosen
+    return dealt
+
+
+def merge_swaps(results, cartonIds):
+    """
+    Merges the solutions of the ULDs swapped at the same time into one list of placements.
+
+    Every solution is only trusted for its own ULD and the cartons its model had. A carton placed in more than one
+    ULD stays in the first of them in the order of the results, and is left out of the others: taking a carton out
+    of a packing keeps it feasible. A carton of a model placed in no ULD is unassigned.
+
+    Args:
+        results (dict): ULD id -> solution of all_swaps for the ULD, None if it found none. Ordered by priority.
+        cartonIds (dict): ULD id -> ids of the cartons in the model of the ULD.
+    Returns:
+        list: placements of all the cartons of the models whose solve succeeded, in the format of the solutions.
+    """
+    placed = {}
+    unplaced = {}
+    for id, solution in results.items():
+        if solution is None: continue
+        for entry in solution:
+            if entry['carton_id'] not in cartonIds[id]: continue
+            if str(entry['container_id']) == str(id):
+                if entry['carton_id'] not in placed: placed[entry['carton_id']] = entry
+                else: print("Carton {0} placed in {1} and {2}, kept in {1}".format(entry['carton_id'], placed[entry['carton_id']]['container_id'], id))
+            elif str(entry['container_id']) == "-1":
+                unplaced.setdefault(entry['carton_id'], entry)
+    merged = list(placed.values())
+    merged += [entry for carton_id, entry in unplaced.items() if carton_id not in placed]
+    return merged
+
+
+def parallel_swaps(packages, uldIds, timeout, workers, solver = "gurobi", control = None, length = 40, profile = None):
+    """
+    Runs all_swaps on several ULDs at the same time, one worker process each, and merges their solutions.
+
+    Every ULD is swapped with its own packages and its share of the unassigned packages (see deal_cartons). The
+    cores and memory of the profile are split between the workers (see SolverProfile.split). The solves stop on the
+    gap and the stall time of control, and all of them stop once control is cancelled. Incumbents of the workers are
+    not streamed, as every one of them only covers one ULD.
+
+    Args:
+        packages (list): package objects, as in get_specific_from_greedy.
+        uldIds (list): ids of the ULDs to swap, by priority: a package claimed by two ULDs goes to the first.
+        timeout (float): time limit of every solve, in seconds.
+        workers (int): number of solves run at the same time at most, the ULDs after them are not swapped.
+        solver (str): solver backend, "gurobi" or "highs".
+        control (SolveControl): stopping rules of the solves.
+        length (int): number of unassigned packages every ULD is given at most.
+        profile (SolverProfile or str): solver profile shared by the workers, or the name of one. Defaults to the
+            default profile.
+    Returns:
+        list: placements of the packages of the ULDs swapped, see merge_swaps, to be given to updatePackages.
+    """
+    uldIds = list(uldIds)[:max(1, workers)]
+    profile = (solver_profile(profile) or SolverProfile()).split(len(uldIds))
+    context = multiprocessing.get_context("spawn")
+    cancel = context.Event()
+    gap = control.gap if control is not None else None
+    stall = control.stall if control is not None else None
+
+    unassigned = {}
+    models = {}
+    for id in uldIds:
+        init, cartons, assigned_solutions, _ = get_specific_from_greedy(id, packageArray=packages)
+        models[id] = (init, cartons, assigned_solutions)
+        for carton in cartons:
+            if str(carton['container_id']) == "-1": unassigned[carton['id']] = carton
+    dealt = deal_cartons(list(unassigned.values()), uldIds, length)
+
+    cartonIds = {}
+    connections = {}
+    processes = []
+    for id in uldIds:
+        init, cartons, assigned_solutions = models[id]
+        own = set(dealt[id])
+        cartons = [carton for carton in cartons if str(carton['container_id']) != "-1" or carton['id'] in own]
+        cartonIds[id] = set(carton['id'] for carton in cartons)
+        conn, child = context.Pipe(duplex=False)
+        process = context.Process(target=swapWorker, daemon=True, args=(
+            child, cartons, containers_specific(id), init, assigned_solutions, timeout, solver, profile, gap, stall,
+            cancel))
+        process.start()
+        child.close()
+        connections[conn] = id
+        processes.append(process)
+
+    # wait for the solutions, passing a cancel on to the workers, and give up on a worker well past its time limit
+    results = {}
+    deadline = time.time() + timeout + 60
+    running = set(connections)
+    while running and time.time() < deadline:
+        if control is not None and control.cancelled(): cancel.set()
+        for conn in wait(list(running), timeout=0.5):
+            try: results[connections[conn]] = conn.recv()
+            except EOFError: results[connections[conn]] = None
+            running.discard(conn)
+    for process in processes:
+        process.join(timeout=1)
+        if process.is_alive(): process.terminate()
+
+    return merge_swaps({id: results.get(id) for id in uldIds}, cartonIds)
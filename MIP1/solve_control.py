@@ -0,0 +1,72 @@
+import time
+import threading
+from MIP1.carton_to_package import sol_to_package
+
+# Control of the MIP solves shared by all_swaps, complete_LPP and binsearch, on top of their time limits.
+# The solver backends call a SolveControl from their callbacks while solving: interrupt to know if the solve should
+# stop, and incumbent for every new solution found.
+
+
+class SolveControl:
+    """
+    Stopping rules and incumbent streaming of the MIP solves.
+
+    A solve given a control stops once the gap between its incumbent and its bound is at most gap, once the incumbent
+    hasn't improved for stall seconds, or once cancel is set, whichever comes first, and otherwise at its time limit.
+    The caller of a solve can watch it with a function turning the incumbent into a solution (a list of placements
+    in the format of ContainerLoadingModel.solution): every new incumbent is then given to onIncumbent as a package
+    list.
+
+    Args:
+        gap (float): relative MIP gap to stop at, as Gurobi's MipGap.
+        stall (float): seconds without a better incumbent to stop after.
+        cancel (threading.Event): external signal stopping the running solve, and the stages of run_all after it.
+            Any object with is_set, such as a multiprocessing.Event, can be given.
+        onIncumbent (function): called with the package list of every new incumbent of the solves watched.
+    """
+
+    def __init__(self, gap = None, stall = None, cancel = None, onIncumbent = None):
+        self.gap = gap
+        self.stall = stall
+        self.signal = cancel if cancel is not None else threading.Event()
+        self.onIncumbent = onIncumbent
+        self.solution = None        # function turning the incumbent values into a solution, for the solve watched
+        self.best = None            # objective of the incumbent of the running solve
+        self.improved = None        # time the incumbent last improved
+
+    # Stop the running solve and the solves after it
+    def cancel(self):
+        self.signal.set()
+
+    def cancelled(self):
+        return self.signal.is_set()
+
+    # Stream the incumbents of the next solve, turned into a solution by solution(value), where value gives the value
+    # of a variable or an expression in the incumbent
+    def watch(self, solution):
+        self.solution = solution
+
+    # Called by the backends when a solve starts and ends
+    def begin(self):
+        self.best = None
+        self.improved = time.time()
+
+    def end(self):
+        self.solution = None
+
+    # Called by the backends while solving, with the objective of the incumbent and the best bound, None if not known.
+    # Returns True if the solve should stop
+    def interrupt(self, objective = None, bound = None):
+        if self.cancelled(): return True
+        if self.stall is not None and self.best is not None and time.time() - self.improved >= self.stall: return True
+        if self.gap is None or objective is None or bound is None: return False
+        if objective == bound: return True
+        return objective != 0 and (objective - bound) / abs(objective) <= self.gap
+
+    # Called by the backends for every new incumbent, with its objective and the function giving its values
+    def incumbent(self, objective, value):
+        if self.best is not None and objective >= self.best - 1e-9: return
+        self.best = objective
+        self.improved = time.time()
+        if self.solution is not None and self.onIncumbent is not None:
+            self.onIncumbent(sol_to_package(self.solution(value)))
@@ -0,0 +1,379 @@
+import numpy as np
+
+try:
+    import gurobipy as gp
+    from gurobipy import GRB
+except ImportError:
+    gp = GRB = None
+
+try:
+    import highspy
+except ImportError:
+    highspy = None
+
+# Solver backends of the container loading MIP. ContainerLoadingModel builds and solves its model only through the
+# methods below, so the same model can be solved with Gurobi or with HiGHS, an open-source solver that runs without a
+# license (pip install highspy). Neither library is needed unless its backend is used.
+#
+# Variables and constraints are the objects of the solver library. Expressions are built with the usual operators
+# (+, -, *, <=, >=, ==), which both libraries support, and with linExpr and quicksum.
+
+# Variable types, the codes Gurobi uses for them
+BINARY, INTEGER, CONTINUOUS = "B", "I", "C"
+
+# Status of a solve, the same for every backend
+OPTIMAL = "optimal"             # solved to optimality (within the MIP gap)
+FEASIBLE = "feasible"           # stopped by the time limit or an interrupt with a solution
+INFEASIBLE = "infeasible"
+NO_SOLUTION = "no solution"     # stopped without a solution, or any other failure
+
+
+class SolverError(Exception):
+    """
+    Failure of the solver of a backend, such as a model too large for the size-limited Gurobi license.
+    """
+
+
+# Key of a block as arguments of the rule building its constraint, like Gurobi's addConstrs generators
+def ruleArguments(key):
+    return key if isinstance(key, tuple) else (key,)
+
+
+class GurobiBackend:
+    """
+    Backend solving the model with Gurobi.
+
+    Args:
+        name (str): name of the Gurobi model.
+        env (gurobipy.Env): environment to create the model in.
+    """
+
+    name = "gurobi"
+
+    def __init__(self, name = "model", env = None):
+        if gp is None:
+            raise ImportError("The Gurobi backend needs gurobipy: pip install gurobipy")
+        self.model = gp.Model(name, env=env) if env is not None else gp.Model(name)
+
+    # Add one variable for every key. Returns key -> variable
+    def addVars(self, keys, vtype, lb = 0, name = None):
+        return self.model.addVars(keys, lb=lb, vtype=vtype, name=name or "")
+
+    def linExpr(self, coeffs, variables):
+        return gp.LinExpr(coeffs, variables)
+
+    def quicksum(self, items):
+        return gp.quicksum(items)
+
+    # Add the constraint rule(*key) for every key. Returns key -> constraint
+    def addConstrs(self, keys, rule, name):
+        return self.model.addConstrs((rule(*ruleArguments(key)) for key in keys), name=name)
+
+    def chgCoeff(self, constraint, variable, value):
+        self.model.chgCoeff(constraint, variable, value)
+
+    # Remove variables and constraints, together with the coefficients of the removed variables in other rows
+    def remove(self, items):
+        self.model.remove(items)
+
+    # Fix variables to a value
+    def fix(self, variables, value):
+        for variable in variables:
+            variable.LB = value
+            variable.UB = value
+
+    def setObjective(self, expression):
+        self.model.setObjective(expression, GRB.MINIMIZE)
+
+    # Drop the integrality of all the variables, leaving the LP relaxation of the model
+    def relax(self):
+        self.model.update()
+        variables = self.model.getVars()
+        self.model.setAttr("VType", variables, [CONTINUOUS] * len(variables))
+
+    def setStart(self, variables, values):
+        for variable, value in zip(variables, values):
+            variable.Start = value
+
+    def keepSolutionAsStart(self):
+        variables = self.model.getVars()
+        self.model.setAttr("Start", variables, self.model.getAttr("X", variables))
+
+    # Set a parameter, by its Gurobi name
+    def setParam(self, name, value):
+        self.model.setParam(name, value)
+
+    # Solve, within timeout seconds if given. interrupt is called while solving, and the solve stops once it
+    # returns True. control (a SolveControl) is given the progress and the incumbents of the solve. Errors of Gurobi
+    # are raised as SolverError
+    def optimize(self, timeout = None, interrupt = None, control = None):
+        try:
+            return self.solve(timeout, interrupt, control)
+        except gp.GurobiError as error:
+            raise SolverError(str(error)) from error
+
+    def solve(self, timeout, interrupt, control):
+        model = self.model
+        if timeout is not None: model.setParam('TimeLimit', timeout)
+        if interrupt is None and control is None:
+            model.optimize()
+        else:
+            def callback(model, where):
+                if control is not None and where == GRB.Callback.MIPSOL:
+                    variables = model.getVars()
+                    values = model.cbGetSolution(variables)
+                    control.incumbent(model.cbGet(GRB.Callback.MIPSOL_OBJ), lambda item: self.evaluate(values, item))
+                if interrupt is not None and interrupt():
+                    model.terminate()
+                elif control is not None:
+                    objective = bound = None
+                    if where == GRB.Callback.MIP:
+                        objective, bound = model.cbGet(GRB.Callback.MIP_OBJBST), model.cbGet(GRB.Callback.MIP_OBJBND)
+                        if objective >= GRB.INFINITY: objective = None
+                    if control.interrupt(objective, bound): model.terminate()
+            if control is not None: control.begin()
+            try:
+                model.optimize(callback)
+            finally:
+                if control is not None: control.end()
+        if model.status == GRB.OPTIMAL: return OPTIMAL
+        if model.status in (GRB.INFEASIBLE, GRB.INF_OR_UNBD): return INFEASIBLE
+        return FEASIBLE if model.SolCount > 0 else NO_SOLUTION
+
+    # Value of a variable or an expression in the solution found
+    def value(self, item):
+        return item.X if isinstance(item, gp.Var) else item.getValue()
+
+    # Value of a variable or an expression given the values of all the variables, by their index
+    def evaluate(self, values, item):
+        if isinstance(item, gp.Var): return values[item.index]
+        return item.getConstant() + sum(item.getCoeff(n) * values[item.getVar(n).index] for n in range(item.size()))
+
+    def objectiveValue(self):
+        return self.model.ObjVal
+
+    def printQuality(self):
+        self.model.printQuality()
+
+    # Print every constraint with its left hand side in the solution found
+    def printRows(self):
+        model = self.model
+        for c in model.getConstrs():
+            lhs = model.getRow(c).getValue()
+            print(f"{c.ConstrName}: LHS = {lhs}, RHS = {c.RHS}, Sense = {c.Sense}")
+
+    def size(self):
+        self.model.update()
+        return self.model.NumVars, self.model.NumConstrs
+
+    def dispose(self):
+        self.model.dispose()
+
+
+class HighsBackend:
+    """
+    Backend solving the model with HiGHS.
+
+    Gurobi parameter names given to setParam are translated to the HiGHS options in PARAMETERS, other parameters
+    have no HiGHS counterpart and are ignored.
+
+    HiGHS keeps variables and constraints by their position in the model, and deleting them moves the ones after.
+    remove deletes them only when they are the last ones added, as for the carton trials of binsearch, where the
+    carton tried is the last one. Otherwise the variables are fixed to 0 and the constraints are relaxed, which
+    takes them out of the problem without moving anything.
+
+    Args:
+        name (str): name of the model, unused as HiGHS models have none.
+    """
+
+    name = "highs"
+
+    PARAMETERS = {"timelimit": "time_limit", "threads": "threads", "mipgap": "mip_rel_gap", "outputflag": "output_flag",
+                  "logtoconsole": "log_to_console", "logfile": "log_file", "seed": "random_seed",
+                  "solutionlimit": "mip_max_improving_sols", "presolve": "presolve"}
+    STATUSES = {"kOptimal": OPTIMAL, "kInfeasible": INFEASIBLE, "kUnboundedOrInfeasible": INFEASIBLE}
+
+    def __init__(self, name = "model"):
+        if highspy is None:
+            raise ImportError("The HiGHS backend needs highspy: pip install highspy")
+        self.highs = highspy.Highs()
+        self.start = {}             # column -> warm start value
+        self.values = None          # column values of the solution found
+
+    def addVars(self, keys, vtype, lb = 0, name = None):
+        highs = self.highs
+        keys = list(keys)
+        n = len(keys)
+        first = highs.getNumCol()
+        ub = 1 if vtype == BINARY else highspy.kHighsInf
+        highs.addVars(n, np.full(n, lb, dtype=np.float64), np.full(n, ub, dtype=np.float64))
+        if vtype != CONTINUOUS and n:
+            highs.changeColsIntegrality(n, np.arange(first, first + n, dtype=np.int32),
+                                        np.full(n, highspy.HighsVarType.kInteger))
+        return {key: highspy.highs.highs_var(first + i, highs) for i, key in enumerate(keys)}
+
+    def linExpr(self, coeffs, variables):
+        expression = highspy.highs.highs_linear_expression()
+        expression.idxs = [variable.index for variable in variables]
+        expression.vals = [float(coeff) for coeff in coeffs]
+        return expression
+
+    def quicksum(self, items):
+        return self.highs.qsum(items)
+
+    # The rows of a block are added in one call
+    def addConstrs(self, keys, rule, name):
+        highs = self.highs
+        keys = list(keys)
+        first = highs.getNumRow()
+        lower, upper, starts, indices, values = [], [], [], [], []
+        nonzeros = 0
+        for key in keys:
+            constraint = rule(*ruleArguments(key))
+            idxs, vals = constraint.unique_elements()
+            lower.append(constraint.bounds[0])
+            upper.append(constraint.bounds[1])
+            starts.append(nonzeros)
+            indices.append(idxs)
+            values.append(vals)
+            nonzeros += len(idxs)
+        if keys:
+            highs.addRows(len(keys), np.array(lower, dtype=np.float64), np.array(upper, dtype=np.float64), nonzeros,
+                          np.array(starts, dtype=np.int32), np.concatenate(indices).astype(np.int32),
+                          np.concatenate(values).astype(np.float64))
+        return {key: highspy.highs.highs_cons(first + i, highs) for i, key in enumerate(keys)}
+
+    def chgCoeff(self, constraint, variable, value):
+        self.highs.changeCoeff(constraint.index, variable.index, value)
+
+    def remove(self, items):
+        highs = self.highs
+        columns = sorted(item.index for item in items if isinstance(item, highspy.highs.highs_var))
+        rows = sorted(item.index for item in items if isinstance(item, highspy.highs.highs_cons))
+        numCol, numRow = highs.getNumCol(), highs.getNumRow()
+        for column in columns:
+            self.start.pop(column, None)
+        if columns == list(range(numCol - len(columns), numCol)) and rows == list(range(numRow - len(rows), numRow)):
+            if columns: highs.deleteVars(len(columns), np.array(columns, dtype=np.int32))
+            if rows: highs.deleteRows(len(rows), np.array(rows, dtype=np.int32))
+            return
+        if columns:
+            zeros = np.zeros(len(columns), dtype=np.float64)
+            highs.changeColsBounds(len(columns), np.array(columns, dtype=np.int32), zeros, zeros)
+        if rows:
+            highs.changeRowsBounds(len(rows), np.array(rows, dtype=np.int32), np.full(len(rows), -highspy.kHighsInf),
+                                   np.full(len(rows), highspy.kHighsInf))
+
+    def fix(self, variables, value):
+        if not variables: return
+        columns = np.array([variable.index for variable in variables], dtype=np.int32)
+        values = np.full(len(columns), value, dtype=np.float64)
+        self.highs.changeColsBounds(len(columns), columns, values, values)
+
+    def setObjective(self, expression):
+        highs = self.highs
+        numCol = highs.getNumCol()
+        costs = np.zeros(numCol, dtype=np.float64)
+        idxs, vals = expression.unique_elements()
+        costs[idxs] = vals
+        highs.changeColsCost(numCol, np.arange(numCol, dtype=np.int32), costs)
+        highs.changeObjectiveOffset(expression.constant or 0.0)
+        highs.changeObjectiveSense(highspy.ObjSense.kMinimize)
+
+    def relax(self):
+        numCol = self.highs.getNumCol()
+        self.highs.changeColsIntegrality(numCol, np.arange(numCol, dtype=np.int32),
+                                         np.full(numCol, highspy.HighsVarType.kContinuous))
+
+    def setStart(self, variables, values):
+        for variable, value in zip(variables, values):
+            self.start[variable.index] = value
+
+    def keepSolutionAsStart(self):
+        self.start = dict(enumerate(self.values.tolist()))
+
+    def setParam(self, name, value):
+        option = self.PARAMETERS.get(name.lower())
+        if option is None: return
+        if option in ("output_flag", "log_to_console"): value = bool(value)
+        elif option == "time_limit": value = float(value)
+        elif option == "mip_rel_gap": value = float(value)
+        elif option in ("threads", "random_seed", "mip_max_improving_sols"): value = int(value)
+        elif option == "presolve": value = {-1: "choose", 0: "off"}.get(int(value), "on")
+        self.highs.setOptionValue(option, value)
+
+    def optimize(self, timeout = None, interrupt = None, control = None):
+        highs = self.highs
+        if timeout is not None: self.setParam('TimeLimit', timeout)
+        if self.start:
+            columns = np.fromiter(self.start.keys(), dtype=np.int32, count=len(self.start))
+            highs.setSolution(len(columns), columns, np.fromiter(self.start.values(), dtype=np.float64, count=len(self.start)))
+        callbacks = []
+        if interrupt is not None or control is not None:
+            def stop(event):
+                data = event.data_out
+                objective, bound = data.mip_primal_bound, data.mip_dual_bound
+                if interrupt is not None and interrupt(): event.interrupt()
+                elif control is not None and control.interrupt(objective if np.isfinite(objective) else None,
+                                                               bound if np.isfinite(bound) else None):
+                    event.interrupt()
+            callbacks.append((highs.cbMipInterrupt, stop))
+        if control is not None:
+            def improved(event):
+                values = np.array(event.data_out.mip_solution)
+                control.incumbent(event.data_out.objective_function_value, lambda item: self.evaluate(values, item))
+            callbacks.append((highs.cbMipImprovingSolution, improved))
+            control.begin()
+        for event, callback in callbacks:
+            event.subscribe(callback)
+        try:
+            highs.run()
+        finally:
+            for event, callback in callbacks:
+                event.unsubscribe(callback)
+            if control is not None: control.end()
+        feasible = highs.getInfo().primal_solution_status == highspy.SolutionStatus.kSolutionStatusFeasible
+        self.values = np.array(highs.getSolution().col_value) if feasible else None
+        status = self.STATUSES.get(highs.getModelStatus().name, NO_SOLUTION)
+        if status == OPTIMAL and not feasible: status = NO_SOLUTION
+        if status == NO_SOLUTION and feasible: status = FEASIBLE
+        return status
+
+    def value(self, item):
+        return self.evaluate(self.values, item)
+
+    def evaluate(self, values, item):
+        if isinstance(item, highspy.highs.highs_var): return float(values[item.index])
+        result = float(np.dot(values[np.asarray(item.idxs, dtype=np.int32)], item.vals)) if item.idxs else 0.0
+        return result + (item.constant or 0.0)
+
+    def objectiveValue(self):
+        return self.highs.getInfo().objective_function_value
+
+    def printQuality(self):
+        info = self.highs.getInfo()
+        print(f"Max primal infeasibility: {info.max_primal_infeasibility}, MIP gap: {info.mip_gap}")
+
+    def printRows(self):
+        highs = self.highs
+        lp = highs.getLp()
+        activities = highs.getSolution().row_value
+        for row in range(highs.getNumRow()):
+            print(f"row {row}: LHS = {activities[row]}, bounds = [{lp.row_lower_[row]}, {lp.row_upper_[row]}]")
+
+    def size(self):
+        return self.highs.getNumCol(), self.highs.getNumRow()
+
+    def dispose(self):
+        self.highs.clear()
+
+
+BACKENDS = {"gurobi": GurobiBackend, "highs": HighsBackend}
+
+
+# Create the backend of a solver by name, "gurobi" or "highs". env is only used by Gurobi
+def createBackend(solver = "gurobi", name = "model", env = None):
+    if solver not in BACKENDS:
+        raise ValueError("Invalid solver!")
+    if solver == "gurobi": return GurobiBackend(name, env)
+    return BACKENDS[solver](name)
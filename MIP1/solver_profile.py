@@ -0,0 +1,154 @@
+import math
+import os
+import tempfile
+
+# Solver profiles of the MIP models: how many threads and how much memory every model may use, and named sets of
+# tuning parameters.
+# The cores and memory are those this process can actually have: its CPU affinity and the limits of its cgroup, not
+# the size of the host. Several run_all jobs sharing a host in their own containers (or pinned with taskset) then
+# each split their own share between their models, instead of every model taking all the cores of the machine.
+
+
+# Tuning parameters of the named profiles, by their Gurobi names
+#   fast-feasible   look for good solutions first, with a light presolve, for the short solves of run_all
+#   prove-optimal   work on the bound, with aggressive presolve and cuts, and concurrent MIP solves given enough threads
+#   low-memory      light presolve, and the search tree written to disk early
+PROFILES = {
+    "default": {},
+    "fast-feasible": {"MIPFocus": 1, "Presolve": 1},
+    "prove-optimal": {"MIPFocus": 2, "Presolve": 2, "Cuts": 2},
+    "low-memory": {"MIPFocus": 1, "Presolve": 1},
+}
+
+# Fraction of the memory budget the search tree may take before its nodes are written to disk
+NODEFILE_FRACTION = {"default": 0.5, "fast-feasible": 0.5, "prove-optimal": 0.5, "low-memory": 0.1}
+
+# Threads a prove-optimal model needs for two concurrent MIP solves
+CONCURRENT_THREADS = 4
+
+# Limits at least this large mean no limit (cgroup v1 reports "unlimited" as a number close to 2**63)
+UNLIMITED = 2**60
+
+
+# Path of this process in the hierarchy of a cgroup controller ("cpu", "memory"), "" for the cgroup v2 hierarchy.
+# None if not known
+def cgroup_path(controller):
+    try:
+        with open("/proc/self/cgroup") as f:
+            for line in f:
+                _, controllers, path = line.rstrip("\n").split(":", 2)
+                if controller in controllers.split(",") or (controller == "" and controllers == ""):
+                    return path
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+# Contents of the first of the files of a cgroup that can be read, looked for in the cgroup of this process and at
+# the root of the hierarchy (where a container sees its own cgroup). None if there is none
+def cgroup_file(controller, names):
+    path = cgroup_path(controller)
+    roots = ["/sys/fs/cgroup/" + controller, "/sys/fs/cgroup"] if controller else ["/sys/fs/cgroup"]
+    for root in roots:
+        folders = [root + path, root] if path and path != "/" else [root]
+        for folder in folders:
+            for name in names:
+                try:
+                    with open(os.path.join(folder, name)) as f:
+                        return f.read().strip()
+                except OSError:
+                    continue
+    return None
+
+
+def available_cores():
+    """
+    Number of cores this process can use: the cores of its CPU affinity, less if its cgroup has a CPU quota.
+    Returns:
+        int: at least 1.
+    """
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    quota = cgroup_file("", ["cpu.max"])            # cgroup v2: "quota period", or "max period"
+    if quota is not None:
+        values = quota.split()
+        if len(values) == 2 and values[0] != "max": cores = min(cores, math.ceil(int(values[0]) / int(values[1])))
+    else:                                           # cgroup v1: quota -1 for none
+        quota = cgroup_file("cpu", ["cpu.cfs_quota_us"])
+        period = cgroup_file("cpu", ["cpu.cfs_period_us"])
+        if quota is not None and period is not None and int(quota) > 0:
+            cores = min(cores, math.ceil(int(quota) / int(period)))
+    return max(1, cores)
+
+
+def available_memory():
+    """
+    Memory this process can use, in bytes: the memory of the host, less if its cgroup has a memory limit.
+    Returns:
+        int: bytes of memory.
+    """
+    try:
+        memory = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        memory = UNLIMITED
+    limit = cgroup_file("", ["memory.max"])                             # cgroup v2, "max" for none
+    if limit is None: limit = cgroup_file("memory", ["memory.limit_in_bytes"])   # cgroup v1
+    if limit is not None and limit.isdigit() and int(limit) < UNLIMITED: memory = min(memory, int(limit))
+    return memory
+
+
+class SolverProfile:
+    """
+    Threads, memory and tuning parameters of the models of one solve.
+
+    The cores and memory available (see available_cores and available_memory) are split evenly between the models
+    solved at the same time. The budget of a model is given to Gurobi as Threads, as SoftMemLimit, which stops the
+    solve with its incumbent instead of running out of memory, and as NodefileStart, past which the search tree is
+    written to disk. HiGHS only takes the threads and the presolve.
+
+    Args:
+        name (str): name of the tuning profile, one of PROFILES.
+        models (int): number of models solved at the same time, sharing the cores and memory.
+        cores (int): cores to share, the cores available to this process if not given.
+        memory (int): bytes of memory to share, the memory available to this process if not given.
+    Raises:
+        ValueError: if name is not the name of a profile.
+    """
+
+    def __init__(self, name = "default", models = 1, cores = None, memory = None):
+        if name not in PROFILES:
+            raise ValueError("Unknown solver profile {0!r}, expected one of {1}".format(name, ", ".join(PROFILES)))
+        self.name = name
+        self.models = max(1, models)
+        self.cores = cores if cores is not None else available_cores()
+        self.memory = memory if memory is not None else available_memory()
+        self.threads = max(1, self.cores // self.models)
+        self.memoryBudget = self.memory // self.models
+
+    # Profile of every one of models models solved at the same time with this profile's share, such as the workers
+    # of parallel_swaps
+    def split(self, models):
+        return SolverProfile(self.name, self.models * max(1, models), self.cores, self.memory)
+
+    # Solver parameters of a model, by their Gurobi names
+    def params(self):
+        params = {'Threads': self.threads}
+        if self.memoryBudget < UNLIMITED:
+            gigabytes = self.memoryBudget / 2**30
+            params['SoftMemLimit'] = gigabytes
+            params['NodefileStart'] = gigabytes * NODEFILE_FRACTION[self.name]
+            params['NodefileDir'] = tempfile.gettempdir()
+        params.update(PROFILES[self.name])
+        if self.name == "prove-optimal" and self.threads >= CONCURRENT_THREADS: params['ConcurrentMIP'] = 2
+        return params
+
+    def __repr__(self):
+        return "SolverProfile({0!r}, threads={1}, memory={2:.1f}GB)".format(self.name, self.threads, self.memoryBudget / 2**30)
+
+
+# Profile of a profile name, or the profile given. None stays None, for the solver's own defaults
+def solver_profile(profile):
+    if profile is None or isinstance(profile, SolverProfile): return profile
+    return SolverProfile(profile)
@@ -1,15 +1,19 @@
 import csv
 from math import floor
 import time
-from MIP2.model_binsearch import container_loading_with_relative_constraints as solver
+from MIP2.model_binsearch import ContainerSession
+from MIP2.parallel_probe import ContainerPool
 from MIP1.carton_to_package import sol_to_package
 from MIP1.package_to_carton import make_solution
+from utils.packageRegistry import PackageRegistry
+from utils.snapshot import loadSnapshot, snapshotPackages
 
 def package_csv_to_sol(filename):
     """
     Reads a CSV file containing package information and converts it into a solution format.
     Args:
-        filename (str): The path to the CSV file containing package data.
+        filename (str): The path to the CSV file containing package data, or to a snapshot saved by
+            utils.snapshot.saveSnapshot (a .npz file), which is read without parsing any text.
     Returns:
         list: A list of solutions generated from the package data.
     The CSV file is expected to have the following columns:
@@ -30,6 +34,8 @@ def package_csv_to_sol(filename):
     packages = []
     sol = []
     ULDS = ["U1", "U2", "U3", "U4", "U5", "U6"]
+    if filename.endswith(".npz"):
+        return [make_solution(package) for package in snapshotPackages(loadSnapshot(filename))]
     with open(filename, mode='r') as file:
         csv_reader = csv.reader(file)
         for row in csv_reader:
@@ -42,7 +48,10 @@ def package_csv_to_sol(filename):
 file_path = 'output.csv'
 # get_containers()
 
-def binsearch(file_path = None, packageArray = None, uldArray = None, timeout = 30, time_split_1 = 6000):
+# Fit unassigned packages in the ULDs one at a time. With a deadline (a time.time() value), no trial runs past it
+# profile is the solver profile of the container models (see MIP1.solver_profile), or the name of one
+def binsearch(file_path = None, packageArray = None, uldArray = None, timeout = 30, time_split_1 = 6000, workers = 1, solver = "gurobi",
+              control = None, deadline = None, profile = None):
 
     def get_more_packages(file_path = None, packageArray = None, uldArray = None):
 
@@ -93,6 +102,8 @@ def binsearch(file_path = None, packageArray = None, uldArray = None, timeout =
             soln=package_csv_to_sol(file_path)
             packageArray=sol_to_package(soln)
 
+        containerById = {container['id']: container for container in containers}
+
         for package in packageArray:
             package.dimensions = package.getDimensions()
             
@@ -123,9 +134,8 @@ def binsearch(file_path = None, packageArray = None, uldArray = None, timeout =
                     "priority": package.priority
                 }
                 container_assigned[package.ULD].append(new_package)
-                for container in containers:
-                    if container['id'] == package.ULD:
-                        container['free_space'] -= package.dimensions[0] * package.dimensions[1] * package.dimensions[2]
+                if package.ULD in containerById:
+                    containerById[package.ULD]['free_space'] -= package.dimensions[0] * package.dimensions[1] * package.dimensions[2]
         old_new_cartons = new_cartons
 
         # sort based on a metric to get those cartons first that have a higher chance of getting assigned
@@ -135,11 +145,10 @@ def binsearch(file_path = None, packageArray = None, uldArray = None, timeout =
 
         # get the original solution for each container to be used in the solver 
 
+        registry = PackageRegistry(packageArray)
         for container in container_assigned:    
             original_solution = []
-            for package in packageArray:
-                if package.ULD != container:
-                    continue
+            for package in registry.getMembers(container):
                 package.dimensions = package.getDimensions()
                 original_solution.append({
                     "carton_id": package.id,
@@ -160,14 +169,43 @@ def binsearch(file_path = None, packageArray = None, uldArray = None, timeout =
         prev = [-1] * len(new_cartons)
         ind=0
         counter=0
-        for i in new_cartons:                   # iterate over all cartons to try to fit them to containers
-            containers=sorted(containers,key=lambda x: x['free_space'])         # sort containers based on free space
-            for container in containers:                    
-                starttime = time.time()
-                container_assigned[container['id']].append(i)                   # temporarily add carton to container 
-                obtained_solution = solver(container_assigned[container['id']], [container], timeout)
-                if obtained_solution:
+        sessions = {}                           # container id -> model of the container, kept across the trials
+        # with more than one worker, all the containers are probed at once for every carton
+        pool = ContainerPool(containers, container_assigned, container_wise_solution, workers, solver, profile) if workers > 1 else None
+        # a cancelled control interrupts the running trial and stops the search, keeping the cartons fitted so far
+        interrupt = control.cancelled if control is not None else None
+        def trialTimeout():
+            return timeout if deadline is None else min(timeout, deadline - time.time())
+        try:
+            for i in new_cartons:                   # iterate over all cartons to try to fit them to containers
+                if interrupt is not None and interrupt(): break
+                if deadline is not None and time.time() >= deadline: break     # no trial runs past the deadline
+                containers=sorted(containers,key=lambda x: x['free_space'])         # sort containers based on free space
+                found = None
+                if pool is not None:
+                    starttime = time.time()
+                    probed = pool.probe(i, [container['id'] for container in containers], trialTimeout())
+                    counter+=(time.time()-starttime)                                # the whole probe counts, fitting or not
+                    if probed: found = (containerById[probed[0]], probed[1])
+                else:
+                    for container in containers:
+                        starttime = time.time()
+                        session = sessions.get(container['id'])
+                        if session is None:
+                            session = sessions[container['id']] = ContainerSession(container_assigned[container['id']], container,
+                                                                                   container_wise_solution.get(container['id']), solver, profile)
+                        if trialTimeout() <= 0: break
+                        obtained_solution = session.trial(i, trialTimeout(), interrupt)   # the carton is taken out again if it doesn't fit
+                        if obtained_solution:
+                            found = (container, obtained_solution)
+                            break
+
+                        counter+=(time.time()-starttime)
+
+                if found:
                     # if the carton fits in the container, add it to the container_lists and update the free space of the container
+                    container, obtained_solution = found
+                    container_assigned[container['id']].append(i)
                     x+=1
                     extra_fitted_cartons.append(i['id'])                                    # keep track of new cartons added
                     container_lists[container['id']].append(i)  
@@ -187,16 +225,13 @@ def binsearch(file_path = None, packageArray = None, uldArray = None, timeout =
                     print("###")
                     current_container = obtained_solution[0]['container_id']
                     container_wise_solution[current_container] = obtained_solution
-                    break
-                else:                # infeasible solution is found, remove added from container
-                    container_assigned[container['id']].pop()
-
-                counter+=(time.time()-starttime)
 
-            prev[ind]=x
-            if((ind>=3 and prev[ind]==prev[ind-3]) or time_split_1<=counter):
-                break
-            ind+=1
+                prev[ind]=x
+                if((ind>=3 and prev[ind]==prev[ind-3]) or time_split_1<=counter):
+                    break
+                ind+=1
+        finally:
+            if pool is not None: pool.close()
 
         for container_id, packages in container_lists.items():
             print(f"Container {container_id} contains packages: {packages}")
@@ -1,7 +1,7 @@
-import gurobipy as gp
-from gurobipy import GRB, quicksum
+from MIP1.container_loading_model import ContainerLoadingModel
+from MIP1.solver_backend import OPTIMAL
 
-def container_loading_with_relative_constraints(cartons, containers,timeout = 30):
+def container_loading_with_relative_constraints(cartons, containers,timeout = 30, solver = "gurobi", profile = None):
     """
     Solve the 3D container loading problem using mixed integer programming,
     incorporating relative positioning constraints (aik, bik, cik, dik, eik, fik).
@@ -11,194 +11,67 @@ def container_loading_with_relative_constraints(cartons, containers,timeout = 30
              Each carton is represented as {'id': int, 'length': float, 'width': float, 'height': float, 'weight': float}.
     containers: list of dictionaries with container dimensions.
              Each container is represented as {'id': int, 'length': float, 'width': float, 'height': float}.
+    solver: solver backend, "gurobi" or "highs".
+    profile: solver profile (see MIP1.solver_profile), or the name of one.
 
     Returns:
     Optimal packing solution with carton placements, orientations, and container usage.
     """
 
     # Create a model
-    model = gp.Model("3D_Container_Loading_with_Relative_Positioning")
-    model.Params.LogToConsole = 0 # Show optimization logs
+    loading = ContainerLoadingModel(cartons, containers, assignAll=True, solver=solver, params={'LogToConsole': 0}, # Show optimization logs
+                                    profile=profile)
 
-    # Define constants
-    M = 100000  # Large constant for "big-M" constraints
+    status = loading.optimize(timeout)      # Stop after timout seconds
+    if status == OPTIMAL:                   # if optimal solution is found, update the result
+        return loading.solution()
 
-    # Decision variables
-    sij = {}  # Binary: carton i assigned to container j
-    xi, yi, zi = {}, {}, {}  # Continuous: coordinates of FLB corner of carton i
-    nj = {}
-    orientation = {}  # Binary variables for carton orientation (rotation matrix)
-    relative_position = {}  # Binary variables for relative positions (aik, bik, cik, dik, eik, fik)
-    # Add variables
-    x = model.addVar(vtype=GRB.BINARY, name="1")
-    model.addConstr(x == 1)
 
-    for container in containers:        #nj variable is 1 if j-th container is used
-        nj[container['id']] = model.addVar(vtype=GRB.INTEGER, name=f"n_{container['id']}")
-
-    for carton in cartons:
-        for container in containers:
-            '''
-            sij[(carton['id'], container['id'])] is a binary variable that is 1 if the carton is assigned to the container
-            yi[carton['id']] is the y-coordinate of the front-left-bottom corner of the carton
-            xi[carton['id']] is the x-coordinate of the front-left-bottom corner of the carton
-            zi[carton['id']] is the z-coordinate of the front-left-bottom corner of the carton
-            '''
-
-            sij[(carton['id'], container['id'])] = model.addVar(vtype=GRB.BINARY,
-                                                                name=f"s_{carton['id']}_{container['id']}")
-        xi[carton['id']] = model.addVar(vtype=GRB.INTEGER, name=f"x_{carton['id']}")
-        yi[carton['id']] = model.addVar(vtype=GRB.INTEGER, name=f"y_{carton['id']}")
-        zi[carton['id']] = model.addVar(vtype=GRB.INTEGER, name=f"z_{carton['id']}")
-
-        # coordinates must be non-negative
-        model.addConstr(xi[carton['id']] >= 0)
-        model.addConstr(yi[carton['id']] >= 0)
-        model.addConstr(zi[carton['id']] >= 0)
-
-        # Add 9 binary orientation variables for each carton
-        orientation[carton['id']] = {
-            
-
-            "lx": model.addVar(vtype=GRB.BINARY, name=f"lx_{carton['id']}"),
-            "ly": model.addVar(vtype=GRB.BINARY, name=f"ly_{carton['id']}"),
-            "lz": model.addVar(vtype=GRB.BINARY, name=f"lz_{carton['id']}"),
-            "wx": model.addVar(vtype=GRB.BINARY, name=f"wx_{carton['id']}"),
-            "wy": model.addVar(vtype=GRB.BINARY, name=f"wy_{carton['id']}"),
-            "wz": model.addVar(vtype=GRB.BINARY, name=f"wz_{carton['id']}"),
-            "hx": model.addVar(vtype=GRB.BINARY, name=f"hx_{carton['id']}"),
-            "hy": model.addVar(vtype=GRB.BINARY, name=f"hy_{carton['id']}"),
-            "hz": model.addVar(vtype=GRB.BINARY, name=f"hz_{carton['id']}"),
-        }
-
-    # Relative positioning variables: aik, bik, cik, dik, eik, fik
-    '''
-        aik - carton i is to the left of carton k
-        bik - carton i is to the right of carton k
-        cik - carton i is behind carton k
-        dik - carton i is in front of carton k
-        eik - carton i is below carton k
-        fik - carton i is above carton k
-    '''
-    for i in range(len(cartons)):
-        for k in range(i + 1, len(cartons)):
-            carton_i = cartons[i]
-            carton_k = cartons[k]
-            relative_position[(carton_i['id'], carton_k['id'])] = {
-                "aik": model.addVar(vtype=GRB.BINARY, name=f"aik_{carton_i['id']}_{carton_k['id']}"),
-                "bik": model.addVar(vtype=GRB.BINARY, name=f"bik_{carton_i['id']}_{carton_k['id']}"),
-                "cik": model.addVar(vtype=GRB.BINARY, name=f"cik_{carton_i['id']}_{carton_k['id']}"),
-                "dik": model.addVar(vtype=GRB.BINARY, name=f"dik_{carton_i['id']}_{carton_k['id']}"),
-                "eik": model.addVar(vtype=GRB.BINARY, name=f"eik_{carton_i['id']}_{carton_k['id']}"),
-                "fik": model.addVar(vtype=GRB.BINARY, name=f"fik_{carton_i['id']}_{carton_k['id']}"),
-            }
-
-    # Constraints
-    # 1. Assign each carton to exactly one container
-    for carton in cartons:
-        model.addConstr(sum(sij[(carton['id'], container['id'])] for container in containers) == 1,
-                        name=f"assign_{carton['id']}")
-    
-    # carton must be assigned to a used container 
-    for container in containers:
-       model.addConstr(sum(sij[(carton['id'], container['id'])] for carton in cartons) <= M*nj[container['id']],
-      name=f"assign_{container['id']}")
-
-
-    # 2. Orientation consistency: Each dimension aligns with exactly one axis
-    for carton in cartons:
-        orients = orientation[carton['id']]
-        model.addConstr(orients["lx"] + orients["ly"] + orients["lz"] == 1, name=f"orient_length_{carton['id']}")
-        model.addConstr(orients["wx"] + orients["wy"] + orients["wz"] == 1, name=f"orient_width_{carton['id']}")
-        model.addConstr(orients["hx"] + orients["hy"] + orients["hz"] == 1, name=f"orient_height_{carton['id']}")
-
-        # Each axis has one dimension
-        model.addConstr(orients["lx"] + orients["wx"] + orients["hx"] == 1, name=f"axis_x_{carton['id']}")
-        model.addConstr(orients["ly"] + orients["wy"] + orients["hy"] == 1, name=f"axis_y_{carton['id']}")
-        model.addConstr(orients["lz"] + orients["wz"] + orients["hz"] == 1, name=f"axis_z_{carton['id']}")
-
-    # 3. Fit cartons within container dimensions
-    for carton in cartons:
-        for container in containers:
-            orients = orientation[carton['id']]
-            model.addConstr(xi[carton['id']] + carton['length'] * orients["lx"] +
-                            carton['width'] * orients["wx"] +
-                            carton['height'] * orients["hx"] <= container['length'] + (
-                                        1 - sij[(carton['id'], container['id'])]) * M,
-                            name=f"fit_x_{carton['id']}_{container['id']}")
-
-            model.addConstr(yi[carton['id']] + carton['length'] * orients["ly"] +
-                            carton['width'] * orients["wy"] +
-                            carton['height'] * orients["hy"] <= container['width'] + (
-                                        1 - sij[(carton['id'], container['id'])]) * M,
-                            name=f"fit_y_{carton['id']}_{container['id']}")
-
-            model.addConstr(zi[carton['id']] + carton['length'] * orients["lz"] +
-                            carton['width'] * orients["wz"] +
-                            carton['height'] * orients["hz"] <= container['height'] + (
-                                        1 - sij[(carton['id'], container['id'])]) * M,
-                            name=f"fit_z_{carton['id']}_{container['id']}")
+class ContainerSession:
+    """
+    Model of one container kept alive across the carton trials of binsearch, instead of building a new model with
+    container_loading_with_relative_constraints for every trial.
+
+    Every trial adds the variables and constraints of one carton to the model, and takes them out again if the
+    cartons don't fit together. The last feasible placement is used as the warm start of the next trial.
+
+    Args:
+        cartons (list): cartons already assigned to the container, as for container_loading_with_relative_constraints.
+        container (dict): the container.
+        placements (list): current placements of the cartons, in the format of the solutions, used as the first
+            warm start.
+        solver (str): solver backend, "gurobi" or "highs".
+        profile (SolverProfile or str): threads, memory and tuning parameters of the model (see MIP1.solver_profile),
+            or the name of a profile. The solver's defaults if not given.
+    """
 
-    
-    for container in containers:
-        # weight constraints
-        model.addConstr(sum((sij[(carton['id'], container['id'])] * carton['weight']) for carton in cartons) <= container['weight'],
-                        name=f"weight_limit_constr{container['id']}")
-        for i in range(len(cartons)):
-            for k in range(i + 1, len(cartons)):
-                carton_i = cartons[i]
-                carton_k = cartons[k]
-                rel = relative_position[(carton_i['id'], carton_k['id'])]
-                model.addConstr((rel["aik"] + rel["bik"] + rel["cik"] + rel["dik"] + rel["eik"] + rel["fik"] >=
-                                 sij[(carton_i['id'], container['id'])] + sij[(carton_k['id'], container['id'])] - x),
-                                name=f"relative_sum_{carton_i['id']}_{carton_k['id']}_{container['id']}")
-    
-    # 4. Prevent overlapping of cartons with aik, bik, cik, dik, eik, fik constraints
-    for i in range(len(cartons)):
-        for k in range(i+1, len(cartons)):
-            carton_i = cartons[i]
-            carton_k = cartons[k]
-            rel = relative_position[(carton_i['id'], carton_k['id'])]
-            model.addConstr(
-                xi[carton_i['id']] + carton_i['length'] * orientation[carton_i['id']]["lx"] + carton_i['width'] *
-                orientation[carton_i['id']]["wx"] + carton_i['height'] * orientation[carton_i['id']]["hx"] <= xi[
-                    carton_k['id']] + (1 - rel["aik"]) * M, name=f"no_overlap_x_a_{carton_i['id']}_{carton_k['id']}")
-            model.addConstr(
-                xi[carton_k['id']] + carton_k['length'] * orientation[carton_k['id']]["lx"] + carton_k['width'] *
-                orientation[carton_k['id']]["wx"] + carton_k['height'] * orientation[carton_k['id']]["hx"] <= xi[
-                    carton_i['id']] + (1 - rel["bik"]) * M, name=f"no_overlap_x_b_{carton_i['id']}_{carton_k['id']}")
-            model.addConstr(
-                yi[carton_i['id']] + carton_i['length'] * orientation[carton_i['id']]["ly"] + carton_i['width'] *
-                orientation[carton_i['id']]["wy"] + carton_i['height'] * orientation[carton_i['id']]["hy"] <= yi[
-                    carton_k['id']] + (1 - rel["cik"]) * M, name=f"no_overlap_y_c_{carton_i['id']}_{carton_k['id']}")
-            model.addConstr(
-                yi[carton_k['id']] + carton_k['length'] * orientation[carton_k['id']]["ly"] + carton_k['width'] *
-                orientation[carton_k['id']]["wy"] + carton_k['height'] * orientation[carton_k['id']]["hy"] <= yi[
-                    carton_i['id']] + (1 - rel["dik"]) * M, name=f"no_overlap_y_d_{carton_i['id']}_{carton_k['id']}")
-            model.addConstr(
-                zi[carton_i['id']] + carton_i['length'] * orientation[carton_i['id']]["lz"] + carton_i['width'] *
-                orientation[carton_i['id']]["wz"] + carton_i['height'] * orientation[carton_i['id']]["hz"] <= zi[
-                    carton_k['id']] + (1 - rel["eik"]) * M, name=f"no_overlap_z_e_{carton_i['id']}_{carton_k['id']}")
-            model.addConstr(
-                zi[carton_k['id']] + carton_k['length'] * orientation[carton_k['id']]["lz"] + carton_k['width'] *
-                orientation[carton_k['id']]["wz"] + carton_k['height'] * orientation[carton_k['id']]["hz"] <= zi[
-                    carton_i['id']] + (1 - rel["fik"]) * M, name=f"no_overlap_z_f_{carton_i['id']}_{carton_k['id']}")
-    
-    model.setParam('TimeLimit', timeout)    # Stop after timout seconds
-    model.optimize()
-    if model.status == GRB.OPTIMAL:
-        solution = []                       # if optimal solution is found, update the result
-        for container in containers:
-            for carton in cartons:
-                if sij[(carton['id'], container['id'])].X > 0.5:  # used to check if sij variable is one in optimal solution
-                    solution.append({
-                            "carton_id": carton['id'],
-                            "container_id": container['id'],
-                            "x": xi[carton['id']].X,
-                            "y": yi[carton['id']].X,
-                            "z": zi[carton['id']].X,
-                            "DimX": carton['length'] * orientation[carton['id']]["lx"].X + carton['width'] * orientation[carton['id']]["wx"].X + carton['height'] * orientation[carton['id']]["hx"].X,
-                            "DimY": carton['length'] * orientation[carton['id']]["ly"].X + carton['width'] * orientation[carton['id']]["wy"].X + carton['height'] * orientation[carton['id']]["hy"].X,
-                            "DimZ": carton['length'] * orientation[carton['id']]["lz"].X + carton['width'] * orientation[carton['id']]["wz"].X + carton['height'] * orientation[carton['id']]["hz"].X
-                        })
-        return solution
\ No newline at end of file
+    def __init__(self, cartons, container, placements = None, solver = "gurobi", profile = None):
+        self.loading = ContainerLoadingModel(list(cartons), [container], assignAll=True, solver=solver,
+                                             params={'LogToConsole': 0}, profile=profile)
+        self.pending = None         # carton that fit in the last probe, until kept or dropped
+        if placements: self.loading.setStartFromSolution(placements)
+
+    # Try to fit one more carton in the container. Returns the placement of all its cartons if they fit, else None
+    # and the carton is taken out of the model. An interrupted solve counts as not fitting
+    def trial(self, carton, timeout = 30, interrupt = None):
+        solution = self.probe(carton, timeout, interrupt)
+        if solution: self.keep()
+        return solution
+
+    # Same as trial, but a carton that fits stays pending: keep makes it part of the container, drop takes it out
+    # again. interrupt is passed to the optimize, and an interrupted solve counts as not fitting
+    def probe(self, carton, timeout = 30, interrupt = None):
+        self.loading.addCarton(carton)
+        if self.loading.optimize(timeout, interrupt) == OPTIMAL:
+            self.pending = carton
+            return self.loading.solution()
+        self.loading.removeCarton(carton['id'])
+        return None
+
+    def keep(self):
+        self.loading.keepSolutionAsStart()
+        self.pending = None
+
+    def drop(self):
+        self.loading.removeCarton(self.pending['id'])
+        self.pending = None
@@ -0,0 +1,143 @@
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+from MIP1.solver_profile import SolverProfile, solver_profile
+from MIP2.model_binsearch import ContainerSession
+
+# Probing of all the containers for a carton at the same time, in a pool of worker processes.
+# Solver models can't be sent between processes, so every container is given to one worker for the whole run and
+# the worker keeps the ContainerSession of its containers.
+
+
+def probeWorker(conn, containers, cartons, placements, profile, solver):
+    """
+    Main loop of a worker process of a ContainerPool.
+
+    Messages received:
+        ("probe", carton, container ids, deadline): try the carton in the containers, in the order given, until the
+            deadline (a time.time() value), and send
+            ("result", container id, solution or None) for every container tried, then ("done",). A ("cancel",)
+            received meanwhile stops the probing, interrupting the running solve.
+        ("commit", container id or None): keep the carton in the container chosen, drop it from the others.
+        ("stop",): end the worker.
+    """
+    sessions = {}
+    pending = []
+
+    def session(id):
+        if id not in sessions:
+            sessions[id] = ContainerSession(cartons[id], containers[id], placements.get(id), solver, profile)
+        return sessions[id]
+
+    # Stop a solve as soon as the main process sends a message, which can only be a cancel while probing
+    def interrupt():
+        return conn.poll()
+
+    while True:
+        message = conn.recv()
+        if message[0] == "stop": break
+        if message[0] == "commit":
+            for id in pending:
+                if id == message[1]: sessions[id].keep()
+                else: sessions[id].drop()
+            pending = []
+        elif message[0] == "probe":
+            _, carton, ids, deadline = message
+            for id in ids:
+                if conn.poll(): break
+                timeout = deadline - time.time()
+                if timeout <= 0: break
+                solution = session(id).probe(carton, timeout, interrupt)
+                if solution: pending.append(id)
+                conn.send(("result", id, solution))
+            conn.send(("done",))
+        # a cancel arriving after the probing was over is ignored
+    conn.close()
+
+
+class ContainerPool:
+    """
+    Pool of worker processes probing containers for the cartons of binsearch.
+
+    A carton is tried in all the containers at the same time, and the feasible container that comes first in the
+    order given (binsearch orders them by free space) gets it, as with trying them one after another. Solves of
+    containers further in the order are cancelled as soon as the result is known.
+
+    Args:
+        containers (list): containers as dictionaries, as in binsearch.
+        cartons (dict): container id -> cartons already assigned to the container.
+        placements (dict): container id -> current placements of its cartons, used as warm starts.
+        workers (int): number of worker processes. The cores and memory of the profile are split between them.
+        solver (str): solver backend, "gurobi" or "highs".
+        profile (SolverProfile or str): solver profile shared by the workers, or the name of one. Defaults to the
+            default profile.
+    """
+
+    def __init__(self, containers, cartons, placements, workers, solver = "gurobi", profile = None):
+        workers = max(1, min(workers, len(containers)))
+        profile = (solver_profile(profile) or SolverProfile()).split(workers)
+        context = multiprocessing.get_context("spawn")
+        self.workerOf = {}
+        self.connections = []
+        self.processes = []
+        for w in range(workers):
+            own = containers[w::workers]
+            for container in own:
+                self.workerOf[container['id']] = w
+            conn, child = context.Pipe()
+            process = context.Process(target=probeWorker, daemon=True, args=(
+                child, {container['id']: container for container in own},
+                {container['id']: list(cartons[container['id']]) for container in own},
+                {container['id']: placements.get(container['id']) for container in own}, profile, solver))
+            process.start()
+            child.close()
+            self.connections.append(conn)
+            self.processes.append(process)
+
+    # Try a carton in all the containers, ordered by preference, within timeout seconds in total. Returns the
+    # container id and the solution of the first feasible container in the order, or None
+    def probe(self, carton, order, timeout):
+        deadline = time.time() + timeout
+        running = set()
+        for w, conn in enumerate(self.connections):
+            ids = [id for id in order if self.workerOf[id] == w]
+            if not ids: continue
+            conn.send(("probe", carton, ids, deadline))
+            running.add(w)
+        results = {}
+        chosen = None
+        cancelled = False
+        while running:
+            for conn in wait([self.connections[w] for w in running]):
+                message = conn.recv()
+                w = self.connections.index(conn)
+                if message[0] == "done":
+                    running.discard(w)
+                    continue
+                results[message[1]] = message[2]
+            # the result is known once a container is feasible and all the containers before it are not
+            for id in order:
+                if id not in results: break
+                if results[id]:
+                    chosen = id
+                    break
+            if chosen is not None and not cancelled:
+                for w in running:
+                    self.connections[w].send(("cancel",))
+                cancelled = True
+        # containers a worker had no time left for count as not fitting
+        chosen = next((id for id in order if results.get(id)), None)
+        for w in range(len(self.connections)):
+            self.connections[w].send(("commit", chosen))
+        if chosen is None: return None
+        return chosen, results[chosen]
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive(): process.terminate()
@@ -0,0 +1,91 @@
+import csv
+import os
+import random
+import tempfile
+import time
+from utils.structs import Package
+from utils.manifest import loadPackages, loadULDs, streamPackages, select, packageObjects, cartonDicts, containerDicts
+
+# Benchmark of reading the manifests: parsing package.csv into package objects and carton dictionaries with the csv
+# readers the input functions had, against the columnar manifest of utils.manifest, and looking up one ULD of
+# ULD.csv as containers_specific does in every swaps stage of run_all.
+# Run from the repository folder with: python -m benchmarks.manifest_benchmark
+
+
+#Write a package manifest of numPackages random packages, a fifth of them priority packages
+def writePackages(path, numPackages, seed = 0):
+    rng = random.Random(seed)
+    with open(path, mode="w", newline="") as f:
+        writer = csv.writer(f)
+        for i in range(numPackages):
+            priority = rng.random() < 0.2
+            writer.writerow([f"P-{i+1}", rng.randint(40, 120), rng.randint(40, 120), rng.randint(40, 120),
+                             rng.randint(10, 100), "Priority" if priority else "Economy", "-" if priority else rng.randint(50, 200)])
+
+
+#Package objects and carton dictionaries as getPackages and cartons read them before the manifest, one file read each
+def legacyRead(path):
+    packages = []
+    with open(path, mode="r") as f:
+        for p in csv.reader(f):
+            if p[5] == "Economy": packages.append(Package(p[1],p[2],p[3],p[4],p[0],p[5],p[6]))
+            else: packages.append(Package(p[1],p[2],p[3],p[4],p[0],p[5]))
+    cartons = []
+    with open(path, mode="r") as f:
+        for row in csv.reader(f):
+            v = sorted([float(row[1]), float(row[2]), float(row[3])])
+            cartons.append({"id": row[0], "length": v[0], "width": v[1], "height": v[2], "weight": float(row[4]),
+                            "priority": 1 if row[5] == "Priority" else 0, "cost": float(row[6]) if row[6] != '-' else 1e6})
+    cartons.sort(key=lambda x: x['id'])
+    return packages, cartons
+
+
+def manifestRead(path):
+    records = loadPackages(path)
+    return packageObjects(records), cartonDicts(records)
+
+
+#ULD.csv read again for every lookup, as containers_specific did
+def legacyContainer(path, id):
+    with open(path, mode="r") as f:
+        return [{"id": row[0], "length": float(row[1]), "width": float(row[2]), "height": float(row[3]), "weight": float(row[4])}
+                for row in csv.reader(f) if row[0] == id]
+
+
+def run(sizes = (400, 10000, 100000), lookups = 1000):
+    folder = tempfile.mkdtemp()
+    print(f"{'packages':>10} {'csv (s)':>9} {'manifest (s)':>13} {'again (s)':>10} {'stream (s)':>11} {'MB':>6}")
+    for size in sizes:
+        path = os.path.join(folder, f"package_{size}.csv")
+        writePackages(path, size)
+        start = time.perf_counter()
+        legacyPackages, legacyCartons = legacyRead(path)
+        legacy = time.perf_counter() - start
+        start = time.perf_counter()
+        packages, cartons = manifestRead(path)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        loadPackages(path)
+        again = time.perf_counter() - start
+        start = time.perf_counter()
+        streamed = sum(len(chunk) for chunk in streamPackages(path, chunkSize=10000))
+        stream = time.perf_counter() - start
+        assert cartons == legacyCartons and streamed == size
+        assert [(p.id, p.getDimensions(), p.weight, p.priority, p.cost) for p in packages] == \
+               [(p.id, p.getDimensions(), p.weight, p.priority, p.cost) for p in legacyPackages]
+        print(f"{size:>10} {legacy:>9.4f} {first:>13.4f} {again:>10.6f} {stream:>11.4f} {loadPackages(path).nbytes/1e6:>6.2f}")
+
+    uldPath = os.path.join(folder, "ULD.csv")
+    with open(uldPath, mode="w", newline="") as f:
+        csv.writer(f).writerows([[f"U{i+1}", 224, 318, 162, 2500] for i in range(6)])
+    start = time.perf_counter()
+    for n in range(lookups): legacyContainer(uldPath, f"U{n % 6 + 1}")
+    legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    for n in range(lookups): containerDicts(select(loadULDs(uldPath), f"U{n % 6 + 1}"))
+    manifest = time.perf_counter() - start
+    print(f"{lookups} ULD lookups: csv {legacy:.4f}s, manifest {manifest:.4f}s")
+
+
+if __name__ == "__main__":
+    run()
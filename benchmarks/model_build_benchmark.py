@@ -0,0 +1,123 @@
+import time
+import tracemalloc
+import gurobipy as gp
+from gurobipy import GRB
+from utils.cartons import cartons as readCartons
+from utils.containers import containers as readContainers
+from MIP1.container_loading_model import ContainerLoadingModel
+
+# Benchmark of building the container loading MIP, without solving it. The model of all_swaps is built one variable
+# and one constraint at a time, the way the MIP functions used to build it, and through ContainerLoadingModel.
+# Build time and the peak memory allocated by Python while building are compared.
+# Run from the repository folder with: python -m benchmarks.model_build_benchmark
+
+
+#Build the all_swaps model with one addVar/addConstr call per variable and constraint
+def buildLegacy(cartons, containers):
+    model = gp.Model("3D_Container_Loading_with_Relative_Positioning")
+    M = 100000
+    sij = {}
+    xi, yi, zi = {}, {}, {}
+    orientation = {}
+    relative_position = {}
+    x = model.addVar(vtype=GRB.BINARY, name="1")
+    model.addConstr(x == 1)
+    for carton in cartons:
+        for container in containers:
+            sij[(carton['id'], container['id'])] = model.addVar(vtype=GRB.BINARY, name=f"s_{carton['id']}_{container['id']}")
+        xi[carton['id']] = model.addVar(vtype=GRB.INTEGER, name=f"x_{carton['id']}")
+        yi[carton['id']] = model.addVar(vtype=GRB.INTEGER, name=f"y_{carton['id']}")
+        zi[carton['id']] = model.addVar(vtype=GRB.INTEGER, name=f"z_{carton['id']}")
+        model.addConstr(xi[carton['id']] >= 0)
+        model.addConstr(yi[carton['id']] >= 0)
+        model.addConstr(zi[carton['id']] >= 0)
+        orientation[carton['id']] = {orient: model.addVar(vtype=GRB.BINARY, name=f"{orient}_{carton['id']}")
+                                     for orient in ("lx", "ly", "lz", "wx", "wy", "wz", "hx", "hy", "hz")}
+    for i in range(len(cartons)):
+        for k in range(i + 1, len(cartons)):
+            relative_position[(cartons[i]['id'], cartons[k]['id'])] = {
+                rel: model.addVar(vtype=GRB.BINARY, name=f"{rel}_{cartons[i]['id']}_{cartons[k]['id']}")
+                for rel in ("aik", "bik", "cik", "dik", "eik", "fik")}
+
+    #Extent of a carton along an axis, written out in every constraint like the MIP functions did
+    def extent(carton, axis):
+        orients = orientation[carton['id']]
+        return carton['length'] * orients["l" + axis] + carton['width'] * orients["w" + axis] + carton['height'] * orients["h" + axis]
+
+    for carton in cartons:
+        model.addConstr(sum(sij[(carton['id'], container['id'])] for container in containers) <= 1, name=f"assign_{carton['id']}")
+    for carton in cartons:
+        orients = orientation[carton['id']]
+        for d in "lwh":
+            model.addConstr(orients[d + "x"] + orients[d + "y"] + orients[d + "z"] == 1, name=f"orient_{d}_{carton['id']}")
+        for a in "xyz":
+            model.addConstr(orients["l" + a] + orients["w" + a] + orients["h" + a] == 1, name=f"axis_{a}_{carton['id']}")
+    for carton in cartons:
+        for container in containers:
+            s = sij[(carton['id'], container['id'])]
+            model.addConstr(xi[carton['id']] + extent(carton, "x") <= container['length'] + (1 - s) * M,
+                            name=f"fit_x_{carton['id']}_{container['id']}")
+            model.addConstr(yi[carton['id']] + extent(carton, "y") <= container['width'] + (1 - s) * M,
+                            name=f"fit_y_{carton['id']}_{container['id']}")
+            model.addConstr(zi[carton['id']] + extent(carton, "z") <= container['height'] + (1 - s) * M,
+                            name=f"fit_z_{carton['id']}_{container['id']}")
+    for container in containers:
+        model.addConstr(sum((sij[(carton['id'], container['id'])] * carton['weight']) for carton in cartons) <= container['weight'],
+                        name=f"weight_limit_constr{container['id']}")
+        for i in range(len(cartons)):
+            for k in range(i + 1, len(cartons)):
+                rel = relative_position[(cartons[i]['id'], cartons[k]['id'])]
+                model.addConstr(rel["aik"] + rel["bik"] + rel["cik"] + rel["dik"] + rel["eik"] + rel["fik"] >=
+                                sij[(cartons[i]['id'], container['id'])] + sij[(cartons[k]['id'], container['id'])] - x,
+                                name=f"relative_sum_{cartons[i]['id']}_{cartons[k]['id']}_{container['id']}")
+    for i in range(len(cartons)):
+        for k in range(i + 1, len(cartons)):
+            ci, ck = cartons[i], cartons[k]
+            rel = relative_position[(ci['id'], ck['id'])]
+            for a, position, before, after in (("x", xi, "aik", "bik"), ("y", yi, "cik", "dik"), ("z", zi, "eik", "fik")):
+                model.addConstr(position[ci['id']] + extent(ci, a) <= position[ck['id']] + (1 - rel[before]) * M,
+                                name=f"no_overlap_{a}_{before[0]}_{ci['id']}_{ck['id']}")
+                model.addConstr(position[ck['id']] + extent(ck, a) <= position[ci['id']] + (1 - rel[after]) * M,
+                                name=f"no_overlap_{a}_{after[0]}_{ci['id']}_{ck['id']}")
+    penalty = sum((1 - (sum(sij[(carton['id'], container['id'])] for container in containers))) * carton['cost'] for carton in cartons)
+    model.setObjective(penalty, GRB.MINIMIZE)
+    model.update()
+    return model
+
+
+#Build the same model through ContainerLoadingModel
+def buildShared(cartons, containers):
+    loading = ContainerLoadingModel(cartons, containers)
+    loading.setObjective()
+    loading.backend.model.update()
+    return loading.backend.model
+
+
+#Time a build and measure the peak of the memory Python allocated during it
+def measure(build, cartons, containers):
+    tracemalloc.start()
+    start = time.perf_counter()
+    model = build(cartons, containers)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = (model.NumVars, model.NumConstrs)
+    model.dispose()
+    return elapsed, peak, size
+
+
+def run(sizes = ((10, 1), (20, 1), (40, 1), (20, 6), (40, 6))):
+    cartons = readCartons()
+    containers = readContainers()
+    print(f"{'cartons':>8} {'ULDs':>5} {'vars':>7} {'constrs':>8} {'legacy (s)':>11} {'shared (s)':>11} {'legacy (MB)':>12} {'shared (MB)':>12}")
+    for numCartons, numContainers in sizes:
+        instance = (cartons[:numCartons], containers[:numContainers])
+        legacyTime, legacyPeak, _ = measure(buildLegacy, *instance)
+        sharedTime, sharedPeak, (numVars, numConstrs) = measure(buildShared, *instance)
+        print(f"{numCartons:>8} {numContainers:>5} {numVars:>7} {numConstrs:>8} {legacyTime:>11.3f} {sharedTime:>11.3f} "
+              f"{legacyPeak / 2**20:>12.2f} {sharedPeak / 2**20:>12.2f}")
+
+
+if __name__ == "__main__":
+    gp.setParam("OutputFlag", 0)
+    run()
@@ -0,0 +1,55 @@
+import sys
+import time
+import gurobipy as gp
+from utils.cartons import cartons as readCartons
+from utils.containers import containers as readContainers
+from MIP1.container_loading_model import ContainerLoadingModel
+from MIP1.solver_backend import OPTIMAL, FEASIBLE
+
+# Benchmark of the preprocessing of ContainerLoadingModel (prune): the same models of package.csv and ULD.csv are
+# built without and with it, and the number of variables and constraints, the time to solve the LP relaxation and its
+# bound, and the time to solve the MIP are compared.
+# HiGHS is the default solver, as the pip license of Gurobi only solves models of up to 2000 variables and constraints.
+# Run from the repository folder with: python -m benchmarks.model_pruning_benchmark [solver] [MIP time limit]
+
+
+#Build an instance, solve its LP relaxation or the MIP, and return the model size, the objective and the solve time
+def solve(cartons, containers, assignAll, prune, solver, relax, timeLimit):
+    loading = ContainerLoadingModel(cartons, containers, assignAll=assignAll, prune=prune, solver=solver,
+                                    params={'OutputFlag': 0, 'Threads': 1})
+    if not assignAll: loading.setObjective()
+    if relax: loading.backend.relax()
+    size = loading.backend.size()
+    start = time.perf_counter()
+    status = loading.optimize(timeLimit)
+    elapsed = time.perf_counter() - start
+    objective = loading.backend.objectiveValue() if status in (OPTIMAL, FEASIBLE) else None
+    loading.backend.dispose()
+    return size, objective, elapsed, status
+
+
+def run(solver = "highs", timeLimit = 30, instances = (("binsearch", "first", 20, ("U1",)), ("binsearch", "first", 40, ("U3",)),
+                                                      ("all_swaps", "largest", 12, ("U1",)), ("all_swaps", "largest", 40, ("U1",)),
+                                                      ("all_swaps", "first", 15, ("U1", "U2", "U3")))):
+    cartons = readCartons()
+    largest = sorted(cartons, key=lambda carton: -carton['length'] * carton['width'] * carton['height'])
+    containers = {container['id']: container for container in readContainers()}
+    print(f"{'model':>10} {'cartons':>14} {'ULDs':>9} {'prune':>6} {'vars':>6} {'constrs':>8} {'LP (s)':>8} {'LP bound':>10} "
+          f"{'MIP (s)':>8} {'MIP status':>11} {'objective':>10}")
+    for model, selection, numCartons, ids in instances:
+        instance = (cartons if selection == "first" else largest)[:numCartons]
+        for prune in (False, True):
+            args = (instance, [containers[id] for id in ids], model == "binsearch", prune, solver)
+            (numVars, numConstrs), bound, lpTime, _ = solve(*args, True, None)
+            _, objective, mipTime, status = solve(*args, False, timeLimit)
+            bound = "-" if bound is None else str(round(bound))
+            objective = "-" if objective is None else str(round(objective))
+            print(f"{model:>10} {selection + ' ' + str(numCartons):>14} {','.join(ids):>9} {str(prune):>6} {numVars:>6} {numConstrs:>8} "
+                  f"{lpTime:>8.3f} {bound:>10} {mipTime:>8.2f} {status:>11} {objective:>10}")
+
+
+if __name__ == "__main__":
+    gp.setParam("OutputFlag", 0)
+    solver = sys.argv[1] if len(sys.argv) > 1 else "highs"
+    timeLimit = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    run(solver, timeLimit)
@@ -0,0 +1,71 @@
+import random
+import time
+from utils.structs import ULD, Package, CartonPackage
+from utils.updatePackages import mergePackages
+
+# Benchmark of merging a solver result into the packages, matching ids with nested loops against the PackageRegistry
+# used by updatePackages.
+# Run from the repository folder with: python -m benchmarks.package_registry_benchmark
+
+NUM_ULDS = 6
+
+
+#Merge as updatePackages did before the registry: every package scans the new packages and the ULD lists
+def legacyMerge(packages, newPackages, ulds):
+    for package in packages:
+        for finalpackage in newPackages:
+            if package.id == finalpackage.id:
+                package.ULD = finalpackage.ULD
+                if str(package.ULD) != '-1':
+                    for uld in ulds:
+                        if uld.id == package.ULD and package not in uld.packages:
+                            uld.packages.append(package)
+                package.position = finalpackage.position
+                package.dimensions = finalpackage.dimensions
+                package.rotation = -1
+                break
+    for uld in ulds:
+        newpackages = [package for package in uld.packages if package.ULD == uld.id]
+        uld.setPackages(newpackages)
+
+
+#Make packages spread over the ULDs and a solver result moving some of them, in shuffled order
+def buildProblem(numPackages, seed = 0):
+    rng = random.Random(seed)
+    ulds = [ULD(10**4, 10**4, 10**4, 10**9, f"U{i+1}") for i in range(NUM_ULDS)]
+    packages = []
+    for i in range(numPackages):
+        package = Package(rng.randint(10, 100), rng.randint(10, 100), rng.randint(10, 100), 1, f"P-{i}", "Economy", 100)
+        package.position = [rng.randrange(10**4), rng.randrange(10**4), rng.randrange(10**4)]
+        if rng.random() < 0.8:
+            package.ULD = ulds[i % NUM_ULDS].id
+            ulds[i % NUM_ULDS].packages.append(package)
+        packages.append(package)
+    solution = []
+    for package in packages:
+        uld = package.ULD
+        if rng.random() < 0.1: uld = rng.choice([-1] + [uld.id for uld in ulds])
+        solution.append(CartonPackage(package.id, uld, list(package.position), list(package.getDimensions()), package.weight, package.cost, 0))
+    rng.shuffle(solution)
+    return packages, solution, ulds
+
+
+def timeMerge(merge, numPackages):
+    packages, solution, ulds = buildProblem(numPackages)
+    start = time.perf_counter()
+    merge(packages, solution, ulds)
+    elapsed = time.perf_counter() - start
+    return elapsed, [(package.id, str(package.ULD)) for package in packages], [[package.id for package in uld.packages] for uld in ulds]
+
+
+def run(sizes = (1000, 2000, 10000)):
+    print(f"{'packages':>10} {'nested (s)':>12} {'registry (s)':>13} {'speedup':>9}")
+    for size in sizes:
+        legacy, legacyPackages, legacyULDs = timeMerge(legacyMerge, size)
+        registry, registryPackages, registryULDs = timeMerge(mergePackages, size)
+        assert legacyPackages == registryPackages and legacyULDs == registryULDs
+        print(f"{size:>10} {legacy:>12.4f} {registry:>13.4f} {legacy/registry:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run()
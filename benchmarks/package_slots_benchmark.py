@@ -0,0 +1,111 @@
+import random
+import time
+import tracemalloc
+from utils.structs import ULD, Package, Rotation
+
+# Benchmark of the slotted Package and ULD against the previous dict backed versions: memory per package, speed of
+# the intersection checks and of weightLeft on a full ULD.
+# Run from the repository folder with: python -m benchmarks.package_slots_benchmark
+
+NUM_PACKAGES = 10000
+NUM_CHECKS = 200000
+
+
+#Package as it was before __slots__: attributes live in a dict and the dimensions are rebuilt on every call
+class DictPackage:
+
+    def __init__(self, length, width, height, weight,id,priority,cost = 10000000):
+        self.position = [-1,-1,-1]
+        self.ULD = -1
+        [self.length,self.width,self.height] = sorted([int(length),int(width),int(height)])
+        self.weight = int(weight)
+        self.id = id
+        self.priority = priority
+        self.cost = int(cost)
+        self.rotation = Rotation.LWH
+        self.pqPriority = 0
+        self.stable = True
+        self.pushLim = [-1,-1,-1]
+        self.dimensions = [self.length,self.width,self.height]
+
+    def getDimensions(self):
+        dim = []
+        if self.rotation == -1: return self.dimensions
+        if self.rotation == Rotation.LWH: dim = [self.length,self.width,self.height]
+        if self.rotation == Rotation.WLH: dim = [self.width,self.length,self.height]
+        if self.rotation == Rotation.HLW: dim = [self.height,self.length,self.width]
+        if self.rotation == Rotation.HWL: dim = [self.height,self.width,self.length]
+        if self.rotation == Rotation.LHW: dim = [self.length,self.height,self.width]
+        if self.rotation == Rotation.WHL: dim = [self.width,self.height,self.length]
+        self.dimensions = dim
+        return dim
+
+    isIntersecting = Package.isIntersecting
+
+
+#Make packages of random sizes, rotations and positions
+def buildPackages(cls, seed = 0):
+    rng = random.Random(seed)
+    packages = []
+    for i in range(NUM_PACKAGES):
+        package = cls(rng.randint(10, 100), rng.randint(10, 100), rng.randint(10, 100), rng.randint(1, 100), f"P-{i}", "Economy", 100)
+        package.rotation = rng.randrange(6)
+        package.position = [rng.randrange(0, 200), rng.randrange(0, 200), rng.randrange(0, 200)]
+        packages.append(package)
+    return packages
+
+
+#Memory taken by the packages, in bytes per package
+def measureMemory(cls):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    packages = buildPackages(cls)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del packages
+    return size / NUM_PACKAGES
+
+
+#Time intersection checks between random pairs of packages
+def timeIntersections(cls):
+    packages = buildPackages(cls)
+    rng = random.Random(1)
+    pairs = [(rng.choice(packages), rng.choice(packages)) for _ in range(NUM_CHECKS)]
+    start = time.perf_counter()
+    hits = 0
+    for a, b in pairs:
+        if a.isIntersecting(b): hits += 1
+    return time.perf_counter() - start, hits
+
+
+#Time weightLeft on a ULD holding every package, summing the weights against reading the running total
+def timeWeightLeft(calls = 1000):
+    uld = ULD(10**4, 10**4, 10**4, 10**9, "B1")
+    uld.setPackages(buildPackages(Package))
+    start = time.perf_counter()
+    for _ in range(calls):
+        curr = uld.weight_limit
+        for package in uld.packages: curr -= package.weight
+    summed = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(calls):
+        cached = uld.weightLeft()
+    assert curr == cached
+    return summed, time.perf_counter() - start
+
+
+def run():
+    dictMemory = measureMemory(DictPackage)
+    slotMemory = measureMemory(Package)
+    print(f"memory per package: dict {dictMemory:.0f} B, slots {slotMemory:.0f} B ({dictMemory/slotMemory:.2f}x)")
+    dictTime, dictHits = timeIntersections(DictPackage)
+    slotTime, slotHits = timeIntersections(Package)
+    assert dictHits == slotHits
+    print(f"{NUM_CHECKS} intersection checks: dict {dictTime:.4f}s, slots {slotTime:.4f}s ({dictTime/slotTime:.2f}x)")
+    summed, cached = timeWeightLeft()
+    print(f"weightLeft with {NUM_PACKAGES} packages: summed {summed:.4f}s, cached {cached:.6f}s")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,66 @@
+import contextlib
+import io
+import time
+from heuristics.solver2_withSpaceDefrag import Solver2
+from utils.convergence import ConvergenceEngine
+from utils.inputGetter import getPackages, getULD
+from utils.structs import ULD
+
+# Benchmark of the push limits under the requests space defragmentation really makes: the greedy solution and the
+# convergence of run_all on the bundled data, where every unpacked package asks for the push limits of a ULD before
+# trying to replace its packages. A failed inflate_and_replace leaves the ULD as it was and keeps the limits, a
+# successful one moves packages (pushOut, then normalize) and the limits are computed again on the next request.
+# The run is timed keeping the limits until the ULD changes and computing them on every request, along with the
+# time spent in normalize and in inflate_and_replace.
+# Run from the repository folder with: python -m benchmarks.push_limit_benchmark
+
+
+#Wrap a ULD method to count its calls and the seconds spent in it
+def counted(stats, name, method):
+    def wrapper(self, *args):
+        start = time.perf_counter()
+        result = method(self, *args)
+        stats[name] = stats.get(name, 0) + time.perf_counter() - start
+        stats[name + " calls"] = stats.get(name + " calls", 0) + 1
+        return result
+    return wrapper
+
+
+#Solve the bundled data and converge, with the ULD methods counted. Without cached, the push limits are forgotten
+#before every request
+def timeRun(cached):
+    stats = {}
+    calculatePushLimit, normalize, inflate_and_replace = ULD.calculatePushLimit, ULD.normalize, ULD.inflate_and_replace
+    def pushLimit(self):
+        if not cached: self.pushLimVersion = -1
+        if self.pushLimVersion != self.version: stats["recomputed"] = stats.get("recomputed", 0) + 1
+        calculatePushLimit(self)
+    ULD.calculatePushLimit = counted(stats, "push limits", pushLimit)
+    ULD.normalize = counted(stats, "normalize", normalize)
+    ULD.inflate_and_replace = counted(stats, "replace", inflate_and_replace)
+    try:
+        packages, ulds = [], []
+        getPackages(packages)
+        getULD(ulds)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Solver2(packages, ulds).solve()
+            ConvergenceEngine(packages, ulds).converge()
+        stats["total"] = time.perf_counter() - start
+    finally:
+        ULD.calculatePushLimit, ULD.normalize, ULD.inflate_and_replace = calculatePushLimit, normalize, inflate_and_replace
+    return stats
+
+
+def run():
+    print(f"{'limits':>9} {'requests':>9} {'computed':>9} {'limits (s)':>11} {'normalize':>10} {'(s)':>6} "
+          f"{'replace tries':>14} {'(s)':>6} {'total (s)':>10}")
+    for cached in (False, True):
+        stats = timeRun(cached)
+        print(f"{'kept' if cached else 'each':>9} {stats['push limits calls']:>9} {stats['recomputed']:>9} "
+              f"{stats['push limits']:>11.2f} {stats['normalize calls']:>10} {stats['normalize']:>6.2f} "
+              f"{stats['replace calls']:>14} {stats['replace']:>6.2f} {stats['total']:>10.2f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,70 @@
+import csv
+import os
+import random
+import tempfile
+import time
+from utils.structs import CartonPackage
+from utils.snapshot import saveSnapshot, loadSnapshot, snapshotPackages, takeSnapshot, writeOutput, readOutput
+from MIP1.package_to_carton import package_csv_to_sol
+
+# Benchmark of saving and reloading a solution: the CSV rows of stringified lists read by package_csv_to_sol with
+# ast.literal_eval, against the .npz snapshots of utils.snapshot. Also checks that output.csv written from a
+# snapshot reads back into the same snapshot.
+# Run from the repository folder with: python -m benchmarks.snapshot_benchmark
+
+NUM_ULDS = 6
+
+
+#Packages spread over the ULDs, a fifth of them unassigned
+def buildPackages(numPackages, seed = 0):
+    rng = random.Random(seed)
+    packages = []
+    for i in range(numPackages):
+        uld = "-1" if rng.random() < 0.2 else f"U{rng.randrange(NUM_ULDS) + 1}"
+        position = [-1, -1, -1] if uld == "-1" else [rng.randrange(300), rng.randrange(300), rng.randrange(300)]
+        packages.append(CartonPackage(f"P-{i+1}", uld, position, [rng.randint(40, 120) for _ in range(3)],
+                                      rng.randint(10, 100), rng.randint(50, 200), -1))
+    return packages
+
+
+#Solution as CSV rows with the positions and dimensions written as lists, the format package_csv_to_sol reads
+def writeRows(path, packages):
+    with open(path, mode="w", newline="") as f:
+        writer = csv.writer(f)
+        for package in packages:
+            writer.writerow([package.id, package.ULD, str(package.position), str(package.dimensions), package.weight,
+                             package.cost, package.rotation])
+
+
+def run(sizes = (400, 10000, 100000)):
+    folder = tempfile.mkdtemp()
+    print(f"{'packages':>10} {'csv write (s)':>14} {'csv read (s)':>13} {'npz save (s)':>13} {'npz load (s)':>13}")
+    for size in sizes:
+        packages = buildPackages(size)
+        csvPath = os.path.join(folder, f"solution_{size}.csv")
+        npzPath = os.path.join(folder, f"solution_{size}.npz")
+        start = time.perf_counter()
+        writeRows(csvPath, packages)
+        csvWrite = time.perf_counter() - start
+        start = time.perf_counter()
+        legacy = package_csv_to_sol(csvPath)
+        csvRead = time.perf_counter() - start
+        start = time.perf_counter()
+        saveSnapshot(npzPath, packages)
+        npzSave = time.perf_counter() - start
+        start = time.perf_counter()
+        snapshot = package_csv_to_sol(npzPath)
+        npzLoad = time.perf_counter() - start
+        key = lambda entry: (entry['carton_id'], entry['container_id'], entry['x'], entry['y'], entry['z'])
+        assert sorted(map(key, legacy)) == sorted(map(key, snapshot))
+
+        outputPath = os.path.join(folder, f"output_{size}.csv")
+        writeOutput(loadSnapshot(npzPath), outputPath)
+        again = readOutput(outputPath, manifest=None)
+        assert again["ids"].tolist() == takeSnapshot(packages)["ids"].tolist()
+        assert [str(package.ULD) for package in snapshotPackages(again)] == again["ulds"].tolist()
+        print(f"{size:>10} {csvWrite:>14.4f} {csvRead:>13.4f} {npzSave:>13.4f} {npzLoad:>13.4f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,55 @@
+import sys
+import time
+from utils.cartons import cartons as readCartons
+from utils.containers import containers as readContainers
+from MIP1.container_loading_model import ContainerLoadingModel
+from MIP1.solver_backend import BACKENDS, OPTIMAL, FEASIBLE, SolverError
+
+# Benchmark of the solver backends of the container loading MIP, on cartons and ULDs of package.csv and ULD.csv.
+# Every instance is solved with every backend: the binary search feasibility model (all the cartons must be placed)
+# on the first cartons of package.csv, and the all_swaps model (minimize the cost of the cartons left out) on the
+# largest cartons, which don't all fit, with the same time limit.
+# The pip license of Gurobi only solves models of up to 2000 variables and constraints, larger instances are
+# reported as over the license limit.
+# Run from the repository folder with: python -m benchmarks.solver_backend_benchmark [time limit] [threads]
+
+
+#Solve one instance with one backend. Returns the model size, the status, the objective and the solve time
+def solve(cartons, containers, solver, assignAll, timeLimit, threads):
+    loading = ContainerLoadingModel(cartons, containers, assignAll=assignAll, solver=solver,
+                                    params={'OutputFlag': 0, 'Threads': threads})
+    if not assignAll: loading.setObjective()
+    size = loading.backend.size()
+    start = time.perf_counter()
+    try:
+        status = loading.optimize(timeLimit)
+        elapsed = time.perf_counter() - start
+        objective = loading.backend.objectiveValue() if status in (OPTIMAL, FEASIBLE) else None
+    except SolverError:
+        status, objective, elapsed = "license limit", None, None
+    loading.backend.dispose()
+    return size, status, objective, elapsed
+
+
+def run(timeLimit = 30, threads = 1, instances = (("binsearch", 6, 1), ("binsearch", 10, 1), ("binsearch", 14, 1),
+                                                  ("all_swaps", 8, 2), ("all_swaps", 12, 1), ("all_swaps", 40, 1))):
+    cartons = readCartons()
+    largest = sorted(cartons, key=lambda carton: -carton['length'] * carton['width'] * carton['height'])
+    containers = readContainers()
+    print(f"{'model':>10} {'cartons':>8} {'ULDs':>5} {'solver':>7} {'vars':>6} {'constrs':>8} {'status':>14} {'objective':>12} {'solve (s)':>10}")
+    for model, numCartons, numContainers in instances:
+        for solver in BACKENDS:
+            instance = cartons[:numCartons] if model == "binsearch" else largest[:numCartons]
+            (numVars, numConstrs), status, objective, elapsed = solve(instance, containers[:numContainers], solver,
+                                                                      model == "binsearch", timeLimit, threads)
+            objective = "-" if objective is None else str(round(objective))
+            elapsed = "-" if elapsed is None else f"{elapsed:.2f}"
+            print(f"{model:>10} {numCartons:>8} {numContainers:>5} {solver:>7} {numVars:>6} {numConstrs:>8} {status:>14} "
+                  f"{objective:>12} {elapsed:>10}")
+
+
+if __name__ == "__main__":
+    gp.setParam("OutputFlag", 0)
+    timeLimit = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    run(timeLimit, threads)
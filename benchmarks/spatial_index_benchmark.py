@@ -0,0 +1,72 @@
+import math
+import random
+import time
+from utils.structs import ULD, Package
+
+# Benchmark of the collision check in ULD.addBox, scanning every package in the ULD against querying the spatial index.
+# Run from the repository folder with: python -m benchmarks.spatial_index_benchmark
+
+SIDE = 10           # side of every benchmark package
+NUM_QUERIES = 500   # number of collision checks timed for every size
+
+
+#Build a ULD filled with a grid of cubic packages
+def buildULD(numPackages):
+    nx = math.ceil(numPackages ** (1/3))
+    ny = nx
+    nz = math.ceil(numPackages / (nx*ny))
+    uld = ULD(nx*SIDE, ny*SIDE, nz*SIDE, 10**9, "B1")
+    count = 0
+    for k in range(nz):
+        for j in range(ny):
+            for i in range(nx):
+                if count == numPackages: return uld
+                package = Package(SIDE, SIDE, SIDE, 1, f"P-{count}", "Economy", 100)
+                uld.addBox(package, (i*SIDE, j*SIDE, k*SIDE))
+                count += 1
+    return uld
+
+
+#Make probe packages at random positions inside the ULD
+def buildProbes(uld, seed = 0):
+    rng = random.Random(seed)
+    probes = []
+    for _ in range(NUM_QUERIES):
+        probe = Package(SIDE, SIDE, SIDE, 1, "probe", "Economy", 100)
+        probe.position = [rng.randrange(0, uld.length - SIDE), rng.randrange(0, uld.width - SIDE), rng.randrange(0, uld.height - SIDE)]
+        probes.append(probe)
+    return probes
+
+
+#Time the collision check of every probe, scanning all packages in the ULD
+def timeLinear(uld, probes):
+    start = time.perf_counter()
+    hits = 0
+    for probe in probes:
+        if any(package.isIntersecting(probe) for package in uld.packages): hits += 1
+    return time.perf_counter() - start, hits
+
+
+#Time the collision check of every probe, only looking at the packages returned by the spatial index
+def timeIndexed(uld, probes):
+    start = time.perf_counter()
+    hits = 0
+    for probe in probes:
+        end = [probe.position[i] + SIDE for i in range(3)]
+        if any(package.isIntersecting(probe) for package in uld.nearbyPackages(probe.position, end)): hits += 1
+    return time.perf_counter() - start, hits
+
+
+def run(sizes = (400, 2000, 10000)):
+    print(f"{'packages':>10} {'linear (s)':>12} {'indexed (s)':>12} {'speedup':>9}")
+    for size in sizes:
+        uld = buildULD(size)
+        probes = buildProbes(uld)
+        linear, linearHits = timeLinear(uld, probes)
+        indexed, indexedHits = timeIndexed(uld, probes)
+        assert linearHits == indexedHits
+        print(f"{size:>10} {linear:>12.4f} {indexed:>12.4f} {linear/indexed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run()
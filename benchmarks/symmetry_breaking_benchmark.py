@@ -0,0 +1,56 @@
+import sys
+import time
+import gurobipy as gp
+from utils.cartons import cartons as readCartons
+from utils.containers import containers as readContainers
+from MIP1.container_loading_model import ContainerLoadingModel
+from MIP1.solver_backend import OPTIMAL, FEASIBLE
+
+# Benchmark of the symmetry breaking of ContainerLoadingModel (symmetry) on instances with identical cartons and
+# identical ULDs. package.csv has no two identical cartons, so an instance takes the largest carton types of
+# package.csv with a number of copies of every type, and U1 and U2 of ULD.csv are identical.
+# Every model is solved without and with symmetry breaking, once stopping at the first solution found, for the time
+# to the first incumbent, and once to optimality (or a proof of infeasibility), within the time limit.
+# HiGHS is the default solver, as the pip license of Gurobi only solves models of up to 2000 variables and constraints.
+# Run from the repository folder with: python -m benchmarks.symmetry_breaking_benchmark [solver] [time limit]
+
+
+#Build an instance and solve it, until the first solution with firstSolution. Returns the status, the objective and
+#the solve time
+def solve(cartons, containers, assignAll, symmetry, solver, firstSolution, timeLimit):
+    params = {'OutputFlag': 0, 'Threads': 1}
+    if firstSolution: params['SolutionLimit'] = 1
+    loading = ContainerLoadingModel(cartons, containers, assignAll=assignAll, symmetry=symmetry, solver=solver, params=params)
+    if not assignAll: loading.setObjective()
+    start = time.perf_counter()
+    status = loading.optimize(timeLimit)
+    elapsed = time.perf_counter() - start
+    objective = loading.backend.objectiveValue() if status in (OPTIMAL, FEASIBLE) else None
+    loading.backend.dispose()
+    return status, objective, elapsed
+
+
+def run(solver = "highs", timeLimit = 120, instances = (("binsearch", 1, 6, ("U1",)), ("binsearch", 1, 7, ("U1",)),
+                                                       ("binsearch", 2, 4, ("U1",)), ("binsearch", 3, 3, ("U1",)),
+                                                       ("all_swaps", 2, 4, ("U1", "U2")), ("all_swaps", 3, 5, ("U1", "U2")))):
+    largest = sorted(readCartons(), key=lambda carton: -carton['length'] * carton['width'] * carton['height'])
+    containers = {container['id']: container for container in readContainers()}
+    print(f"{'model':>10} {'types':>6} {'copies':>7} {'ULDs':>6} {'symmetry':>9} {'first (s)':>10} {'optimal (s)':>12} "
+          f"{'status':>11} {'objective':>10}")
+    for model, types, copies, ids in instances:
+        instance = [dict(carton, id=f"{carton['id']}-{n}") for carton in largest[:types] for n in range(copies)]
+        for symmetry in (False, True):
+            args = (instance, [containers[id] for id in ids], model == "binsearch", symmetry, solver)
+            firstStatus, _, firstTime = solve(*args, True, timeLimit)
+            status, objective, elapsed = solve(*args, False, timeLimit)
+            first = f"{firstTime:.2f}" if firstStatus in (OPTIMAL, FEASIBLE) else "-"
+            objective = "-" if objective is None else str(round(objective))
+            print(f"{model:>10} {types:>6} {copies:>7} {','.join(ids):>6} {str(symmetry):>9} {first:>10} {elapsed:>12.2f} "
+                  f"{status:>11} {objective:>10}")
+
+
+if __name__ == "__main__":
+    gp.setParam("OutputFlag", 0)
+    solver = sys.argv[1] if len(sys.argv) > 1 else "highs"
+    timeLimit = float(sys.argv[2]) if len(sys.argv) > 2 else 120
+    run(solver, timeLimit)
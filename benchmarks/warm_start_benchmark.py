@@ -0,0 +1,75 @@
+import random
+import time
+import tracemalloc
+from utils.structs import CartonPackage
+from MIP1.package_to_carton import relative_positions, relative_start
+
+# Benchmark of the relative positions of the warm start of get_from_greedy: one dictionary for every pair of
+# packages, built with a double loop as get_from_greedy used to, against the sparse mapping of relative_positions
+# with only the pairs in the same ULD. Build time and the peak memory allocated by Python are compared, and the
+# start values read through relative_start are checked to be the same.
+# Run from the repository folder with: python -m benchmarks.warm_start_benchmark
+
+NUM_ULDS = 6
+
+
+#Packages stacked in columns in the ULDs, a tenth of them unassigned
+def buildPackages(numPackages, seed = 0):
+    rng = random.Random(seed)
+    packages = []
+    for i in range(numPackages):
+        uld = "-1" if rng.random() < 0.1 else f"U{rng.randrange(NUM_ULDS) + 1}"
+        dimensions = [rng.randint(20, 60) for _ in range(3)]
+        position = [-1, -1, -1] if uld == "-1" else [60 * rng.randrange(5), 60 * rng.randrange(5), 60 * rng.randrange(3)]
+        packages.append(CartonPackage(f"P-{i+1}", uld, position, dimensions, rng.randint(10, 100), rng.randint(50, 200), -1))
+    return packages
+
+
+#Relative positions of every pair of packages, as the double loop of get_from_greedy built them
+def legacyRelativePositions(packages):
+    relative_position = {}
+    for package in packages:
+        for other_package in packages:
+            if package.id >= other_package.id:
+                continue
+            values = {}
+            for axis, (before, after) in enumerate((("aik", "bik"), ("cik", "dik"), ("eik", "fik"))):
+                if package.ULD != other_package.ULD or str(package.ULD) == '-1':
+                    values[before], values[after] = 0, 0
+                elif package.position[axis] + package.dimensions[axis] <= other_package.position[axis]:
+                    values[before], values[after] = 1, 0
+                elif package.position[axis] >= other_package.position[axis] + other_package.dimensions[axis]:
+                    values[before], values[after] = 0, 1
+                else:
+                    values[before], values[after] = 0, 0
+            relative_position[(package.id, other_package.id)] = values
+    return relative_position
+
+
+#Time a build, then measure the peak of the memory Python allocates during another one. Tracing the allocations
+#slows the build down, so it is not timed
+def measure(build, packages):
+    start = time.perf_counter()
+    relative_position = build(packages)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    build(packages)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return relative_position, elapsed, peak
+
+
+def run(sizes = (400, 1000, 2000)):
+    print(f"{'packages':>9} {'pairs':>9} {'kept':>7} {'legacy (s)':>11} {'sparse (s)':>11} {'legacy (MB)':>12} {'sparse (MB)':>12}")
+    for size in sizes:
+        packages = buildPackages(size)
+        legacy, legacyTime, legacyPeak = measure(legacyRelativePositions, packages)
+        sparse, sparseTime, sparsePeak = measure(relative_positions, packages)
+        init = {'relative_position': sparse}
+        assert all(relative_start(init, i, k) == values for (i, k), values in legacy.items())
+        print(f"{size:>9} {len(legacy):>9} {len(sparse):>7} {legacyTime:>11.3f} {sparseTime:>11.3f} "
+              f"{legacyPeak / 2**20:>12.2f} {sparsePeak / 2**20:>12.2f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,17 +1,44 @@
+import contextlib
+import io
+import itertools
 import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from utils.metrics import calculateCost
-from utils.structs import Axis, calculateEuclideanDistance
+from utils.costLedger import CostLedger
+from utils.structs import Axis
+from utils.extremePoints import ExtremePointSet
+from utils.replacementPlanner import ReplacementPlanner
+
+
+#Run the full pipeline for one ULD ordering and economy sort key on a copy of the problem (the arguments are pickled
+#into the worker process). Returns the cost and the solved Solver, or None if the candidate started after the deadline.
+#A candidate still running at the deadline stops where it is (see Solver2.expired)
+def solveCandidate(packages, ulds, permutation, economySort, deadline = None):
+    if deadline is not None and time.time() > deadline: return None
+    with contextlib.redirect_stdout(io.StringIO()):
+        solver = Solver2(packages, ulds, permutation, economySort, deadline=deadline)
+        solver.solve()
+    return calculateCost(solver.packages, solver.ulds, 5000), solver
+
 
 class Solver2:
 
-    #Solver Initialisation
-    def __init__(self, packages, ulds):
+    #Solver Initialisation. permutation is an index in permuationsAll or an explicit ULD ordering, economySort a key of economySortKeys,
+    #replaceOrder the order space defragmentation tries packed packages in (see ReplacementPlanner), deadline the time
+    #(as time.time()) after which no more packages are tried, None for none
+    def __init__(self, packages, ulds, permutation = 0, economySort = "cost", replaceOrder = "list", deadline = None):
         self.packages = packages
         self.ulds = ulds
         self.priority = []
         self.economy = []
         self.takenPackages = []
         self.priorityULDs =  0
+        self.permutation = permutation
+        self.economySort = economySort
+        self.planner = ReplacementPlanner(order=replaceOrder)
+        self.deadline = deadline
 
         for package in packages:
             if package.priority == "Priority":
@@ -21,6 +48,13 @@ class Solver2:
     
     # SORTING FUNCTIONS
     
+    # Cost functions Economy Packages can be sorted by, higher first
+    economySortKeys = {
+        "cost": lambda x: x.cost**3/(x.getVolume()**2 + x.weight**2),
+        "costPerVolume": lambda x: x.cost/x.getVolume(),
+        "costPerWeight": lambda x: x.cost/max(x.weight, 1),
+    }
+
     # Sort Packages For Assignment. Priority Packages first, sorted by Volume and Economy Packages sorted by a cost function
     def sortPackagesAssignment(self, packages):
 
@@ -28,7 +62,7 @@ class Solver2:
         non_priority_packages = [p for p in packages if p.priority != "Priority"]
         
         priority_packages.sort(key=lambda x: x.getVolume(), reverse=True)
-        non_priority_packages.sort(key=lambda x: x.cost**3/(x.getVolume()**2 + x.weight**2) , reverse=True)
+        non_priority_packages.sort(key=self.economySortKeys[self.economySort], reverse=True)
         packages[:] = priority_packages + non_priority_packages
    
     
@@ -39,6 +73,9 @@ class Solver2:
     # Sort ULDs. Either Sort By Volume of Brute Force all permutations to find most optimal sorting
     permuationsAll = [[6,4,5,2,1,3],[4, 5, 6, 2, 3, 1],[6, 4, 5, 2, 3, 1],[5, 6, 4, 2, 3, 1],[4, 6, 5, 2, 3, 1],[6, 5, 4, 2, 3, 1], [5, 4, 6, 3, 2, 1], [4, 5, 6, 3, 2, 1], [6, 4, 5, 3, 2, 1], [5, 6, 4, 3, 2, 1], [4, 6, 5, 3, 2, 1], [6, 5, 4, 3, 2, 1], [5, 4, 6, 2, 1, 3], [4, 5, 6, 2, 1, 3], [6, 4, 5, 2, 1, 3], [5, 6, 4, 2, 1, 3], [4, 6, 5, 2, 1, 3], [6, 5, 4, 2, 1, 3], [5, 4, 6, 3, 1, 2], [4, 5, 6, 3, 1, 2], [6, 4, 5, 3, 1, 2], [5, 6, 4, 3, 1, 2], [4, 6, 5, 3, 1, 2], [6, 5, 4, 3, 1, 2]]
     def sortULDs(self,permutation):
+        if not isinstance(permutation, int):
+            self.ulds = [self.ulds[i-1] for i in permutation]
+            return
         currPermutation=self.permuationsAll[permutation]
        
         if(len(self.ulds)==6):
@@ -48,27 +85,48 @@ class Solver2:
             self.ulds = newUld
         else:
             self.ulds.sort(key=lambda x: x.getVolume(), reverse=True)
+
+    # Get the ULD orderings to search, as 1-based indices in the input order of the ULDs. With 6 ULDs these are the
+    # hand-picked permutations, otherwise the volume order followed by every other ordering, or by seeded random
+    # orderings when there are more than limit of them
+    def getPermutations(self, limit = len(permuationsAll), seed = 0):
+        n = len(self.ulds)
+        if n == 6: return [list(p) for p in self.permuationsAll[:limit]]
+        first = sorted(range(1, n+1), key=lambda i: self.ulds[i-1].getVolume(), reverse=True)
+        permutations = [first]
+        if math.factorial(n) <= limit:
+            permutations.extend(list(p) for p in itertools.permutations(range(1, n+1)) if list(p) != first)
+            return permutations
+        rng = random.Random(seed)
+        seen = {tuple(first)}
+        while len(permutations) < limit:
+            p = first.copy()
+            rng.shuffle(p)
+            if tuple(p) in seen: continue
+            seen.add(tuple(p))
+            permutations.append(p)
+        return permutations
     
+    #True once the deadline is past. The pipeline then stops trying packages and skips its remaining steps, keeping
+    #the packages already placed (those of the assignment if it was cut short), so the solution stays valid but
+    #leaves the rest of the packages unassigned
+    def expired(self):
+        return self.deadline is not None and time.time() > self.deadline
+
     #FITTING PACKAGES
 
-    #Try to fit given packages in a ULD by sorting extreme points by Euclidean Distance and trying to fit the package in the corner
+    #Try to fit given packages in a ULD by trying the extreme points nearest to the origin first
     def fitPackages(self, packages, uld, corners, isassigning = 0):
         takenPackages = []
       
         for package in packages:            
+            if self.expired(): break
             if str(package.ULD) == '-1': 
-                done = False
-
-                corners.sort(key=lambda corner: calculateEuclideanDistance(corner)) 
-                for corner in corners:
-                    if uld.addBox(package, corner):
-                        # Remove this corner and add the other 7 new corners
-                        corners.remove(corner)
-                        new_corners = uld.getNewCorners(package)
-                        corners.extend(new_corners)                        
-                        takenPackages.append(package)
-                        done = True
-                        break
+                if corners.fit(uld, package) is not None:
+                    # The used corner is gone, add the new corners and drop the ones the package now covers
+                    corners.extend(uld.getNewCorners(package))
+                    corners.evictCovered(package)
+                    takenPackages.append(package)
 
         print(len(takenPackages))        
         return corners, takenPackages
@@ -85,19 +143,17 @@ class Solver2:
             cornermap[uld.id] = corners
             takenPackages.extend(taken_pck)
             for unpacked_package in packages:
+                if self.expired(): break
                 if str(unpacked_package.ULD) == '-1':
-                    for jj in range(ii+1):
-                        ulds[jj].calculatePushLimit()
-                        for poss_replace in ulds[jj].packages:
-                            if(ulds[jj].inflate_and_replace(unpacked_package,poss_replace)):
-                                if(takenPackages.count(poss_replace) > 0):
-                                    takenPackages.remove(poss_replace)
-                                takenPackages.append(unpacked_package)
-                                cornermap[uld.id] = ulds[jj].recalculate_corners()
-                                done = True
-                                break
-                        if done:
-                            break   
+                    # Once a replacement worked, the next packages only try the first ULD
+                    replaced = self.planner.replace(ulds[:1] if done else ulds[:ii+1], unpacked_package)
+                    if replaced is not None:
+                        [replacedULD, poss_replace] = replaced
+                        if(takenPackages.count(poss_replace) > 0):
+                            takenPackages.remove(poss_replace)
+                        takenPackages.append(unpacked_package)
+                        cornermap[uld.id] = replacedULD.recalculate_corners()
+                        done = True
                 
         return cornermap,takenPackages    
     
@@ -107,9 +163,9 @@ class Solver2:
         ulds = self.ulds[0:len(self.ulds)]
         cm = {}
         for i in ulds:
-            cm[i.id] = [[0, 0, 0]]
+            cm[i.id] = ExtremePointSet([(0, 0, 0)])
             print("Assigning Priorty ULD: ", i.id)
-            [_, packagesInULD] = self.fitPackages(self.packages, i, [[0, 0, 0]],True)
+            [_, packagesInULD] = self.fitPackages(self.packages, i, ExtremePointSet([(0, 0, 0)]),True)
             self.takenPackages.extend(packagesInULD)
             priority_done = True
             for pack in self.packages:
@@ -123,6 +179,8 @@ class Solver2:
         for uld in ulds:
             if(len(uld.packages)!=0):
                 self.priorityULDs+=1
+        #Out of time, the packages assigned are the solution
+        if self.expired(): return
         for uld in ulds:
             uld.clearBin()
 
@@ -133,9 +191,10 @@ class Solver2:
         ulds = self.ulds[self.priorityULDs:len(self.ulds)]
         for i in ulds:
             print("Assigning Normal ULD: ", i.id)
-            [_, packagesInULD] = self.fitPackages(self.packages, i, [[0, 0, 0]],True)
+            [_, packagesInULD] = self.fitPackages(self.packages, i, ExtremePointSet([(0, 0, 0)]),True)
             self.takenPackages.extend(packagesInULD)
 
+        if self.expired(): return
         for uld in ulds:
             uld.clearBin()
 
@@ -150,24 +209,18 @@ class Solver2:
             for package in uld.packages:
                 for axis in Axis.ALL:
                     if uld.project(package,axis) != -1:
-                        package.position[axis] = uld.project(package,axis)
-        cost = calculateCost(self.packages,self.ulds,5000)
+                        uld.movePackage(package, axis, uld.project(package,axis))
+        #The ledger follows the replacements, so the cost of every round is read without scanning the packages
+        ledger = CostLedger(self.packages,self.ulds,5000)
+        cost = ledger.cost()
         oldCost = 10000000000
-        while cost != oldCost:
+        while cost != oldCost and not self.expired():
             oldCost = cost
             #Space Defragmentation
             for unpacked_package in self.packages:
+                if self.expired(): break
                 if str(unpacked_package.ULD) == '-1':
-                    done = False
-                    for jj in range(len(self.ulds)):
-                        self.ulds[jj].calculatePushLimit()
-                        for poss_replace in self.ulds[jj].packages:
-                            if(self.ulds[jj].inflate_and_replace(unpacked_package,poss_replace)):
-                            
-                                done = True
-                                break
-                        if done:
-                            break
+                    self.planner.replace(self.ulds, unpacked_package)
 
             #Projecting Packages
             for uld in self.ulds:
@@ -175,9 +228,10 @@ class Solver2:
                     uld.packages.sort(key=lambda x: x.position[axis])
                     for package in uld.packages:
                         if uld.projectFinal(package,axis) != -1:
-                            package.position[axis] = uld.projectFinal(package,axis)
+                            uld.movePackage(package, axis, uld.projectFinal(package,axis))
 
-            cost = calculateCost(self.packages,self.ulds,5000)
+            cost = ledger.cost()
+        ledger.detach()
 
     
 
@@ -187,15 +241,15 @@ class Solver2:
         self.sortPackagesAssignment(self.packages)
         
         #Sort ULDS in appropriate Order
-        self.sortULDs(0)
+        self.sortULDs(self.permutation)
 
         #Assign Packages to Priority ULDs
         self.assignPackagesPriority()
 
-        #CornerMap maintains list of extreme points of each ULDs, initialised from origin [0,0,0]
+        #CornerMap maintains the set of extreme points of each ULDs, initialised from origin [0,0,0]
         cornermap = {}
         for uld in self.ulds:
-            cornermap[uld.id] = [[0, 0, 0]]
+            cornermap[uld.id] = ExtremePointSet([(0, 0, 0)])
 
         #Assigned Packages are fitted in the ULDs sorted by the fitting order
         self.sortPackagesFitting(self.takenPackages)
@@ -216,4 +270,66 @@ class Solver2:
 
         #Applying Space Defragmentation and Projection 
         self.defragAndProject()
-        
+
+
+    #Solve for every ULD ordering (and every economy sort key given) in a pool of worker processes and keep the
+    #lowest cost solution. Ties go to the earlier candidate, so the result does not depend on the order workers
+    #finish in. After timeLimit seconds, candidates not yet started are dropped, the running ones stop where they are
+    #and the best one found so far is used
+    def solve_parallel(self, workers = None, timeLimit = None, seed = 0, economySorts = ("cost",), limit = len(permuationsAll)):
+
+        candidates = [(permutation, economySort) for economySort in economySorts for permutation in self.getPermutations(limit, seed)]
+        deadline = None if timeLimit is None else time.time() + timeLimit
+
+        best = None
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {pool.submit(solveCandidate, self.packages, self.ulds, permutation, economySort, deadline): i
+                       for i, (permutation, economySort) in enumerate(candidates)}
+            pending = set(futures)
+            while pending:
+                # Running candidates return soon after the deadline, the ones not started at once
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result is None: continue
+                    i = futures[future]
+                    print("Permutation: ", candidates[i][0], "Sort: ", candidates[i][1], "Cost: ", result[0])
+                    if best is None or (result[0], i) < best[:2]:
+                        best = (result[0], i, result[1])
+        finally:
+            # Workers of candidates still running stop at the deadline, so waiting for them leaves no core busy
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        if best is None:
+            self.solve()
+            return
+        self.adoptSolution(best[2])
+
+    #Copy the placements of a Solver working on copies of the packages and ULDs back to the objects of this Solver
+    def adoptSolution(self, solver):
+        packageById = {package.id: package for package in self.packages}
+        uldById = {uld.id: uld for uld in self.ulds}
+
+        for uld in self.ulds:
+            uld.clearBin()
+        for solved in solver.packages:
+            package = packageById[solved.id]
+            package.ULD = solved.ULD
+            package.rotation = solved.rotation
+            if solved.rotation == -1: package.dimensions = solved.dimensions
+            package.position = list(solved.position)
+            package.pushLim = list(solved.pushLim)
+            package.stable = solved.stable
+        for solved in solver.ulds:
+            uld = uldById[solved.id]
+            uld.setPackages([packageById[package.id] for package in solved.packages])
+            uld.isPriority = solved.isPriority
+
+        # Same orders solve() leaves behind
+        self.packages[:] = [packageById[package.id] for package in solver.packages]
+        self.ulds = [uldById[uld.id] for uld in solver.ulds]
+        self.takenPackages = [packageById[package.id] for package in solver.takenPackages]
+        self.priorityULDs = solver.priorityULDs
+        self.permutation = solver.permutation
+        self.economySort = solver.economySort
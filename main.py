@@ -1,14 +1,22 @@
 import csv
 from heuristics.solver2_withSpaceDefrag import Solver2
-from utils.generateOutput import generateOutput
+from utils.generateOutput import outputCost
+from utils.checkpoint import Checkpoint
 from utils.inputGetter import getPackages, getULD
-from utils.cartons import cartons
 from MIP1.carton_to_package import sol_to_package
-from utils.containers import containers, containers_specific, containers_specific_multiple
-from MIP1.model import all_swaps as solver, complete_LPP
+from utils.containers import containers_specific, containers_specific_multiple
+from MIP1.model import all_swaps, complete_LPP
+from MIP1.parallel_swaps import parallel_swaps
+from MIP1.lns import LargeNeighbourhoodSearch
 from MIP1.package_to_carton import get_from_greedy, get_specific_from_greedy, get_specific_from_greedy_multi, package_csv_to_sol
 from MIP2.binsearch import binsearch
-from utils.metrics import calculateCost, metrics, uldPlot
+from MIP1.solve_control import SolveControl
+from MIP1.solver_profile import SolverProfile
+from MIP1.solver_backend import SolverError
+from utils.metrics import metrics, uldPlot
+from utils.costLedger import CostLedger
+from utils.convergence import ConvergenceEngine, uldSignature
+from utils.timeBudget import TimeBudget
 from utils.updatePackages import updatePackages
 import sys
 import time
@@ -16,104 +24,165 @@ import time
 
 
 
-def run_all(ulds, packages,timeout = 300, stabilityThreshold = 0.5, k = 5000):
+def run_all(ulds, packages,timeout = 300, stabilityThreshold = 0.5, k = 5000, workers = 1, solver = "gurobi",
+            mipGap = None, stallTime = None, cancel = None, onIncumbent = None, checkpoint = None, profile = "default"):
 
     """
     Executes the optimization process for loading packages into ULDs (Unit Load Devices).
     Args:
         ulds (list): List of ULD objects representing the containers.
         packages (list): List of package objects to be loaded into ULDs.
-        timeout (int, optional): Total time allowed for the optimization process. Defaults to 300 seconds.
+        timeout (int, optional): Total wall-clock time of the optimization process, the greedy solution and writing
+            the output included. Defaults to 300 seconds.
         stabilityThreshold (float, optional): Threshold for stability in the optimization process. Defaults to 0.5.
         k (int, optional): Parameter for the cost calculation. Defaults to 5000.
+        workers (int, optional): Worker processes searching ULD orderings for the greedy solution, probing the
+            ULDs at the same time in binary search, and running swaps in several ULDs at the same time. With 1, only
+            the default ordering is solved and ULDs are probed and swapped one after another. Defaults to 1.
+        solver (str, optional): Solver of the MIP stages, "gurobi" or "highs" (open-source, needs no license).
+            Defaults to "gurobi".
+        mipGap (float, optional): Relative gap at which the MIP stages stop before their time limit. Defaults to None.
+        stallTime (float, optional): Seconds without a better incumbent after which the MIP stages stop. Defaults to
+            None.
+        cancel (threading.Event, optional): When set, the running MIP stage stops and the stages after it are skipped,
+            keeping the best solution found. Defaults to None.
+        onIncumbent (function, optional): Called with the package list of every new incumbent of the MIP stages.
+            Incumbents better than the current solution are also written to output.csv as they are found.
+            Defaults to None.
+        checkpoint (str, optional): Path of a .npz snapshot (see utils.snapshot) saved along with output.csv every
+            time a better solution is written. Defaults to None.
+        profile (str, optional): Solver profile of the MIP stages, one of MIP1.solver_profile.PROFILES
+            ("fast-feasible", "prove-optimal", "low-memory" or "default"). The cores and memory this process may use
+            are split between the models solved at the same time. Defaults to "default".
     Returns:
         float: The final cost after the optimization process.
     The function performs the following steps:
     1. Initializes the solver with the given packages and ULDs.
     2. Updates the packages and generates the initial output.
     3. Calculates and prints the initial metrics.
-    4. Performs a binary search optimization if the initial time split is greater than 0.
-    5. Iteratively updates the packages and recalculates the cost until it stabilizes.
-    6. If the remaining time is sufficient, performs further optimization on specific ULDs.
-    7. Generates the final output and returns the final cost.
+    4. Shares the time left between binary search, swaps on every ULD and a large neighbourhood search over parts
+       of the ULDs (a TimeBudget): every slice goes to the stage that removed the most cost per second on its last
+       run, stages not run yet first, until the time is up. A stage is left out once several runs in a row removed
+       nothing from the same inputs, except the search, which is randomized. With several workers, swaps
+       run in up to workers ULDs at the same time, the next ones in the order of the budget.
+    5. Iteratively updates the packages after every stage until a round changes nothing, reporting the rounds each
+       stage took, and checkpoints the solution: output.csv is replaced atomically whenever a stage improved it, so
+       the best solution so far can be taken from it at any time.
+    6. Generates the final output and returns the final cost.
     """
 
 
-    solver2 = Solver2(packages,ulds)
-    solver2.solve()
-
+    #The whole run, greedy and output included, ends by the timeout. The search picks its neighbourhoods at random, so
+    #it is worth running again on the same solution
+    budget = TimeBudget(timeout, randomized=("LNS",))
+    #Threads and memory of the MIP models, from the cores and memory this process may use
+    profile = SolverProfile(profile)
+    print("Solver profile:", profile)
+    #the greedy solution stops where it is if it runs out of time, keeping the packages placed so far. A fifth of the
+    #time is left for updating the packages and writing the first output
+    solver2 = Solver2(packages,ulds,deadline=time.time()+budget.remaining()*0.8)
+    if workers > 1:
+        solver2.solve_parallel(workers=workers, timeLimit=budget.remaining()/5)
+    else:
+        solver2.solve()
+
+    #Cost of the solution, kept up to date as updatePackages moves packages in and out of the ULDs
+    ledger = CostLedger(packages,ulds,5000)
+    #Repeats updatePackages(packages,packages,ulds) until nothing changes, redoing only the work affected by the last round
+    engine = ConvergenceEngine(packages,ulds,ledger)
+
+    start = time.time()
     updatePackages(packages,packages,ulds)
-    generateOutput(packages)
+    #output.csv (and the snapshot) hold the best solution so far from here on
+    output = Checkpoint("output.csv", checkpoint, k)
+    output.save(packages, "Greedy")
 
     metrics(packages,ulds,k)
-    cartonss = cartons()
-    containerss = containers()
-    cost = calculateCost(packages,ulds,5000)
-    oldCost = 10000000000
-    while cost != oldCost:
-        oldCost = cost
-        updatePackages(packages,packages,ulds)
-        cost = calculateCost(packages,ulds,5000)
-        print(cost,oldCost)
-    time_split_1 = min(100,timeout/5)
+    engine.converge("Greedy")
+    #the final convergence and output take about as long as this one
+    budget.reserve = max(1, time.time() - start)
+
+    #Incumbents of the MIP stages better than the current solution are written to output.csv as they are found
+    def incumbent(newPackages):
+        if outputCost(newPackages, k)[0] < ledger.cost():
+            output.save(newPackages, "Incumbent")
+        if onIncumbent is not None: onIncumbent(newPackages)
+    control = SolveControl(mipGap, stallTime, cancel, incumbent)
+
+    #Stages share the time left by the cost they remove per second: binary search over all the ULDs, the large
+    #neighbourhood search, and swaps in every ULD, last ones first. The state of a stage tells if it can do better
+    #than its last runs that removed nothing: binary search when any ULD changed, swaps in a ULD when the ULD or the
+    #unassigned packages changed, the search always
+    swapStages = {"Swaps " + str(uld.id): uld for uld in reversed(ulds)}
+    def states():
+        unassigned = frozenset(package.id for package in packages if str(package.ULD) == "-1")
+        signatures = {uld.id: uldSignature(uld) for uld in ulds}
+        result = {"Binary Search": tuple(signatures.values())}
+        result["LNS"] = (result["Binary Search"], unassigned)
+        for stage, uld in swapStages.items():
+            result[stage] = (signatures[uld.id], unassigned)
+        return result
+    #the search keeps the sizes of its neighbourhoods between its runs
+    lns = LargeNeighbourhoodSearch(packages, ulds, solver=solver, control=control, profile=profile)
     bin_timeout = 5
-    if time_split_1 > 0:
-        binsearchSolution = binsearch(packageArray=packages, uldArray=ulds,timeout=bin_timeout, time_split_1=time_split_1)
-        newPackages = sol_to_package(binsearchSolution)
-
-
-        updatePackages(packages,newPackages,ulds)  
-        generateOutput(packages)
-
-        metrics(packages,ulds,k)
-        # uldPlot(ulds)
-    solution = []
-    time_split_2 = timeout - time_split_1
-    cost = calculateCost(packages,ulds,5000)
-    oldCost = 10000000000
-    while cost != oldCost:
-        oldCost = cost
-        updatePackages(packages,packages,ulds)
-        cost = calculateCost(packages,ulds,5000)
-        print(cost,oldCost)
-    if time_split_2 > 2:
-        num_uld = 2
-        if time_split_2 >= 600:
-            num_uld = 3
-        if time_split_2 >= 1200:
-            num_uld = 4
-        if time_split_2 >= 1800:
-            num_uld = 5
-        if time_split_2 >= 2400:
-            num_uld = 6
-
-        for uld in reversed(ulds[len(ulds)-num_uld:]):
-            init,cartonss,assigned_solutions,_ = get_specific_from_greedy(uld.id,packageArray=packages)
-            containerss = containers_specific(uld.id)
-            solution = solver(cartons=cartonss, containers=containerss, init=init, assigned_solutions=assigned_solutions,timeout=time_split_2//num_uld)
-            temp = sol_to_package(solution)
-            updatePackages(packages,temp,ulds)
-            cost = calculateCost(packages,ulds,5000)
-            oldCost = 10000000000
-            while cost != oldCost:
-                oldCost = cost
-                updatePackages(packages,packages,ulds)
-                cost = calculateCost(packages,ulds,5000)
-                print(cost,oldCost)
-
-    generateOutput(sol_to_package(solution))
-    finalsol = sol_to_package(solution)
-
-
-    updatePackages(packages,finalsol,ulds)
-        
-    cost = calculateCost(packages,ulds,5000)
-    oldCost = 10000000000
-    while cost != oldCost:
-        oldCost = cost
-        updatePackages(packages,packages,ulds)
-        cost = calculateCost(packages,ulds,5000)
-        print(cost,oldCost)
+    while not control.cancelled():
+        current = states()
+        stage = budget.choose(current)
+        if stage is None: break
+        #with several workers, the swaps stages next in the order of the budget run alongside this one
+        batch = [stage]
+        if workers > 1 and stage in swapStages:
+            batch = [other for other in budget.ranked(current) if other in swapStages][:workers]
+        limit = budget.slice(stage, current, len(batch))
+        if limit <= budget.minimum: break
+        start = time.time()
+        before = ledger.cost()
+        packed = {other: sum(package.cost for package in swapStages[other].packages) for other in batch if other in swapStages}
+        #a stage whose model the solver refuses (too large for a size-limited license) keeps the current solution, and
+        #is recorded as removing nothing
+        failed = False
+        try:
+            if stage == "Binary Search":
+                binsearchSolution = binsearch(packageArray=packages, uldArray=ulds,timeout=min(bin_timeout, limit), time_split_1=limit, workers=workers,
+                                              solver=solver, control=control, deadline=start+limit, profile=profile)
+                newPackages = sol_to_package(binsearchSolution)
+                updatePackages(packages,newPackages,ulds)
+                metrics(packages,ulds,k)
+                # uldPlot(ulds)
+            elif stage == "LNS":
+                lns.run(limit)
+                lns.report()
+            elif len(batch) > 1:
+                solution = parallel_swaps(packages, [swapStages[other].id for other in batch], timeout=limit, workers=workers,
+                                          solver=solver, control=control, profile=profile)
+                if solution: updatePackages(packages,sol_to_package(solution),ulds)
+            else:
+                uld = swapStages[stage]
+                init,cartonss,assigned_solutions,_ = get_specific_from_greedy(uld.id,packageArray=packages)
+                containerss = containers_specific(uld.id)
+                solution = all_swaps(cartons=cartonss, containers=containerss, init=init, assigned_solutions=assigned_solutions,timeout=limit, solver=solver,
+                                     control=control, profile=profile)
+                if solution: updatePackages(packages,sol_to_package(solution),ulds)
+        except SolverError as error:
+            print(stage if len(batch) == 1 else "Parallel Swaps", "failed:", error)
+            failed = True
+        engine.converge(stage if len(batch) == 1 else "Parallel Swaps")
+        #a stage that removed nothing several times is run again only once another stage changed its inputs. Swaps run
+        #at the same time are each credited with the cost of the packages they added to their ULD
+        after = states()
+        if len(batch) == 1:
+            budget.record(stage, after[stage], limit, time.time() - start, 0 if failed else before - ledger.cost())
+        else:
+            for other in batch:
+                gain = 0 if failed else sum(package.cost for package in swapStages[other].packages) - packed[other]
+                budget.record(other, after[other], limit, time.time() - start, gain)
+        output.save(packages, stage if len(batch) == 1 else "Parallel Swaps")
+    budget.report()
+
+    engine.converge("Final")
+    output.save(packages, "Final", force=True)
+    output.report()
+    cost = ledger.cost()
     print("----------------------------------------------------------------------------")
     print("Successfully Ran the Optimization Process, check output.csv for the results")
     print("Final Cost: ",cost)
@@ -126,11 +195,17 @@ def run_all(ulds, packages,timeout = 300, stabilityThreshold = 0.5, k = 5000):
 #Running using command line
 if __name__ == "__main__":
     timeout = 300 #default timeout
-    if len(sys.argv) > 2:
-        print("Usage: python main.py <timeout>")
+    solver = "gurobi" #default MIP solver
+    profile = "default" #default solver profile
+    if len(sys.argv) > 4:
+        print("Usage: python main.py <timeout> <solver> <profile>")
         sys.exit(1)
-    if len(sys.argv) == 2:
+    if len(sys.argv) >= 2:
         timeout = int(sys.argv[1])
+    if len(sys.argv) >= 3:
+        solver = sys.argv[2]
+    if len(sys.argv) == 4:
+        profile = sys.argv[3]
 
     k = 5000
     ulds = []
@@ -138,4 +213,4 @@ if __name__ == "__main__":
     getPackages(packages)
     getULD(ulds)
 
-    run_all(ulds, packages,timeout)
+    run_all(ulds, packages,timeout, solver=solver, profile=profile)
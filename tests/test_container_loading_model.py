@@ -0,0 +1,72 @@
+import pytest
+from MIP1 import solver_backend
+from MIP1.package_to_carton import get_from_greedy
+from utils.structs import CartonPackage
+
+pytest.importorskip("highspy")
+from MIP1.container_loading_model import ContainerLoadingModel
+
+
+def carton(id, length, width, height, cost, weight = 10):
+    return {'id': id, 'length': length, 'width': width, 'height': height, 'weight': weight, 'cost': cost, 'priority': 0}
+
+
+def container(id, length, width, height, weight = 100):
+    return {'id': id, 'length': length, 'width': width, 'height': height, 'weight': weight}
+
+
+#Best objective of the model, solved to optimality with HiGHS
+def optimum(cartons, containers, **options):
+    loading = ContainerLoadingModel(cartons, containers, solver="highs", params={"OutputFlag": 0}, **options)
+    loading.setObjective()
+    assert loading.optimize(60) == solver_backend.OPTIMAL
+    return loading.backend.objectiveValue()
+
+
+#C does not fit in U2 and D is too long to stand beside anything along x, so pruning leaves out variables of both.
+#With stability the big-M values of the container sizes replace M
+@pytest.mark.parametrize("stability", [False, True])
+def test_pruning_keeps_the_optimum(stability):
+    cartons = [carton("A", 6, 4, 4, 30), carton("B", 5, 5, 3, 25), carton("C", 9, 3, 3, 40), carton("D", 10, 2, 2, 20),
+               carton("E", 4, 4, 4, 15, weight=60)]
+    containers = [container("U1", 10, 6, 5), container("U2", 6, 6, 6)]
+    pruned = optimum(cartons, containers, stability=stability, symmetry=False)
+    assert pruned == pytest.approx(optimum(cartons, containers, stability=stability, prune=False, symmetry=False))
+    assert 0 < pruned < sum(carton['cost'] for carton in cartons)
+
+
+#Four identical cartons A, two identical cartons B and a cube C for three identical containers, with room for all but
+#the two B
+def identical():
+    cartons = [carton("A{0}".format(n), 5, 10, 10, 10) for n in range(1, 5)] + [carton("B1", 5, 5, 10, 4),
+               carton("B2", 5, 5, 10, 4), carton("C", 10, 10, 10, 30)]
+    return cartons, [container("U{0}".format(n), 10, 10, 10) for n in range(1, 4)]
+
+
+def test_symmetry_keeps_the_optimum():
+    cartons, containers = identical()
+    assert optimum(cartons, containers) == pytest.approx(optimum(cartons, containers, symmetry=False)) == pytest.approx(8)
+
+
+#A greedy solution breaking the symmetry rules: C, the last carton, in the first container, and A2 before A1, A4 before
+#A3 along x. Relabelled by setStart, it must still be a solution of the model
+def test_relabelled_warm_start_is_feasible():
+    cartons, containers = identical()
+    packages = [CartonPackage("A2", "U2", [0, 0, 0], [5, 10, 10], 10, 10, -1),
+                CartonPackage("A1", "U2", [5, 0, 0], [5, 10, 10], 10, 10, -1),
+                CartonPackage("A4", "U3", [0, 0, 0], [5, 10, 10], 10, 10, -1),
+                CartonPackage("A3", "U3", [5, 0, 0], [5, 10, 10], 10, 10, -1),
+                CartonPackage("B1", "-1", [-1, -1, -1], [5, 5, 10], 10, 4, -1),
+                CartonPackage("B2", "-1", [-1, -1, -1], [5, 5, 10], 10, 4, -1),
+                CartonPackage("C", "U1", [0, 0, 0], [10, 10, 10], 10, 30, -1)]
+    loading = ContainerLoadingModel(cartons, containers, solver="highs", params={"OutputFlag": 0})
+    loading.setObjective()
+    loading.setStart(get_from_greedy(packageArray=packages))
+    start = loading.backend.start
+    assert start
+    variables = [*loading.sij.values(), *loading.xi.values(), *loading.yi.values(), *loading.zi.values(),
+                 *loading.orientation.values(), *loading.relative_position.values()]
+    for variable in variables:
+        if variable.index in start: loading.backend.fix([variable], start[variable.index])
+    assert loading.optimize(60) == solver_backend.OPTIMAL
+    assert loading.backend.objectiveValue() == pytest.approx(8)
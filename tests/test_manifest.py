@@ -0,0 +1,72 @@
+import math
+import pytest
+from utils.manifest import loadPackages, loadULDs, streamPackages
+
+
+#Write the lines of a manifest to a file of the test folder
+def manifest(tmp_path, lines, name = "package.csv"):
+    path = tmp_path / name
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_load_packages(tmp_path):
+    path = manifest(tmp_path, ["P-1,99,53,55,61,Economy,176", "", "P-2,56,99,81,53,Priority,-"])
+    records = loadPackages(path)
+    assert records["id"].tolist() == ["P-1", "P-2"]
+    assert records["dimensions"].tolist() == [[99, 53, 55], [56, 99, 81]]
+    assert records["priority"].tolist() == [False, True]
+    assert records["cost"][0] == 176 and math.isnan(records["cost"][1])
+
+
+@pytest.mark.parametrize("row, message", [
+    ("P-2,56,99", "line 2: expected at least 6 columns, got 3"),
+    ("P-2,56,x,81,53,Economy,10", "line 2: dimension 'x' is not an integer"),
+    ("P-2,56,0,81,53,Economy,10", "line 2: dimension must be positive, got 0"),
+    ("P-2,56,99,81,-5,Economy,10", "line 2: weight must be positive, got -5"),
+    ("P-2,56,99,81,53,Express,10", "line 2: package type must be Priority or Economy, got 'Express'"),
+    ("P-2,56,99,81,53,Economy,-", "line 2: economy package without a cost"),
+    ("P-2,56,99,81,53,Economy", "line 2: economy package without a cost"),
+    ("P-2,56,99,81,53,Economy,cheap", "line 2: cost 'cheap' is not a number"),
+    ("P-2,56,99,81,53,Economy,-3", "line 2: cost must be a non-negative number, got -3"),
+    ("P-2,56,99,81,53,Economy,inf", "line 2: cost must be a non-negative number, got inf"),
+    (",56,99,81,53,Economy,10", "line 2: empty id"),
+    ("P" * 33 + ",56,99,81,53,Economy,10", "line 2: id '" + "P" * 33 + "' is too long"),
+])
+def test_package_errors(tmp_path, row, message):
+    path = manifest(tmp_path, ["P-1,99,53,55,61,Economy,176", row])
+    with pytest.raises(ValueError) as error:
+        loadPackages(path)
+    assert str(error.value) == message
+
+
+@pytest.mark.parametrize("row, message", [
+    ("U2,224,318", "line 2: expected 5 columns, got 3"),
+    ("U2,224,318,162,heavy", "line 2: weight limit 'heavy' is not an integer"),
+    ("U2,224,-318,162,2500", "line 2: dimension must be positive, got -318"),
+])
+def test_uld_errors(tmp_path, row, message):
+    path = manifest(tmp_path, ["U1,224,318,162,2500", row], "ULD.csv")
+    with pytest.raises(ValueError) as error:
+        loadULDs(path)
+    assert str(error.value) == message
+
+
+#The chunk with the bad row is checked again row by row, so the line reported is the line of the file
+def test_error_line_in_later_chunk(tmp_path):
+    lines = ["P-{0},10,10,10,1,Economy,5".format(i) for i in range(1, 6)]
+    lines[3] = "P-4,10,10,10,1,Economy,-1"
+    path = manifest(tmp_path, lines)
+    chunks = streamPackages(path, chunkSize=2)
+    assert len(next(chunks)) == 2
+    with pytest.raises(ValueError, match="^line 4: cost must be a non-negative number, got -1$"):
+        next(chunks)
+
+
+def test_reloaded_when_changed(tmp_path):
+    path = manifest(tmp_path, ["P-1,99,53,55,61,Economy,176"])
+    first = loadPackages(path)
+    assert loadPackages(path) is first
+    assert not first.flags.writeable
+    manifest(tmp_path, ["P-1,99,53,55,61,Economy,176", "P-2,56,99,81,53,Priority,-"])
+    assert loadPackages(path)["id"].tolist() == ["P-1", "P-2"]
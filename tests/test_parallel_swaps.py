@@ -0,0 +1,46 @@
+from MIP1.parallel_swaps import merge_swaps, deal_cartons
+
+
+#Placement of a carton as the solutions of all_swaps give it
+def entry(carton, container, x = 0):
+    return {'carton_id': carton, 'container_id': container, 'x1': x, 'y1': 0, 'z1': 0}
+
+
+def byCarton(merged):
+    return {placement['carton_id']: placement for placement in merged}
+
+
+def test_carton_placed_twice_stays_in_first_uld():
+    results = {"U2": [entry("P-1", "U2", 5), entry("P-2", "U2")], "U1": [entry("P-1", "U1", 7), entry("P-3", "U1")]}
+    merged = merge_swaps(results, {"U2": {"P-1", "P-2"}, "U1": {"P-1", "P-3"}})
+    assert len(merged) == 3
+    assert byCarton(merged) == {"P-1": entry("P-1", "U2", 5), "P-2": entry("P-2", "U2"), "P-3": entry("P-3", "U1")}
+
+
+def test_unplaced_in_one_uld_placed_in_another():
+    results = {"U1": [entry("P-1", "-1", -1)], "U2": [entry("P-1", "U2")]}
+    merged = merge_swaps(results, {"U1": {"P-1"}, "U2": {"P-1"}})
+    assert merged == [entry("P-1", "U2")]
+
+
+def test_carton_unplaced_everywhere_is_unassigned():
+    results = {"U1": [entry("P-1", "-1", -1)], "U2": [entry("P-1", "-1", -2)]}
+    assert merge_swaps(results, {"U1": {"P-1"}, "U2": {"P-1"}}) == [entry("P-1", "-1", -1)]
+
+
+#A solution only speaks for its own ULD and the cartons of its model
+def test_placements_outside_the_model_ignored():
+    results = {"U1": [entry("P-1", "U1"), entry("P-2", "U1"), entry("P-3", "U2")], "U2": [entry("P-3", "-1")]}
+    merged = merge_swaps(results, {"U1": {"P-1", "P-3"}, "U2": {"P-3"}})
+    assert merged == [entry("P-1", "U1"), entry("P-3", "-1")]
+
+
+def test_failed_solve_skipped():
+    results = {"U1": None, "U2": [entry("P-1", "U2")]}
+    assert merge_swaps(results, {"U1": {"P-1", "P-2"}, "U2": {"P-1"}}) == [entry("P-1", "U2")]
+
+
+def test_deal_cartons_shares_then_tops_up():
+    cartons = [{'id': "P-{0}".format(i), 'cost': 10 - i, 'length': 1, 'width': 1, 'height': 1} for i in range(5)]
+    dealt = deal_cartons(cartons, ["U1", "U2"], length=3)
+    assert dealt == {"U1": ["P-0", "P-2", "P-4"], "U2": ["P-1", "P-3", "P-0"]}
@@ -0,0 +1,98 @@
+import random
+import pytest
+from utils.structs import CartonPackage
+from MIP1.package_to_carton import RELATIONS, relative_positions, relative_start, get_from_greedy
+
+
+#Relative positions of every pair of packages, with the double loop get_from_greedy used to build them with
+def denseRelativePositions(packages):
+    relative_position = {}
+    for package in packages:
+        for other_package in packages:
+            if package.id >= other_package.id:
+                continue
+            values = {}
+            for axis, (before, after) in enumerate(RELATIONS):
+                if package.ULD != other_package.ULD or str(package.ULD) == '-1':
+                    values[before], values[after] = 0, 0
+                elif package.position[axis] + package.dimensions[axis] <= other_package.position[axis]:
+                    values[before], values[after] = 1, 0
+                elif package.position[axis] >= other_package.position[axis] + other_package.dimensions[axis]:
+                    values[before], values[after] = 0, 1
+                else:
+                    values[before], values[after] = 0, 0
+            relative_position[(package.id, other_package.id)] = values
+    return relative_position
+
+
+#Packages on a coarse grid of 3 ULDs, so that many pairs touch or overlap along an axis, a fifth of them unassigned.
+#Ids are not in the order of their numbers as strings (P-10 < P-2)
+def randomPackages(count, seed):
+    rng = random.Random(seed)
+    packages = []
+    for i in range(count):
+        uld = "-1" if rng.random() < 0.2 else "U{0}".format(rng.randrange(3) + 1)
+        dimensions = [rng.choice((10, 20, 30)) for _ in range(3)]
+        position = [-1, -1, -1] if uld == "-1" else [10 * rng.randrange(4) for _ in range(3)]
+        packages.append(CartonPackage("P-{0}".format(i + 1), uld, position, dimensions, 10, 100, -1))
+    rng.shuffle(packages)
+    return packages
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_dense_builder(seed):
+    packages = randomPackages(60, seed)
+    dense = denseRelativePositions(packages)
+    sparse = relative_positions(packages)
+    init = {'relative_position': sparse}
+    assert all(relative_start(init, i, k) == values for (i, k), values in dense.items())
+    #only pairs of the same ULD are kept, and every one of them is a pair of the dense builder
+    assert set(sparse) <= set(dense)
+    ulds = {package.id: str(package.ULD) for package in packages}
+    assert all(ulds[i] == ulds[k] != "-1" for i, k in sparse)
+
+
+def test_touching_and_overlapping():
+    packages = [CartonPackage("A", "U1", [0, 0, 0], [10, 10, 10], 1, 1, -1),
+                CartonPackage("B", "U1", [10, 5, 0], [10, 10, 10], 1, 1, -1),
+                CartonPackage("C", "U1", [0, 0, 10], [10, 10, 10], 1, 1, -1)]
+    sparse = relative_positions(packages)
+    assert sparse[("A", "B")] == {"aik": 1, "bik": 0, "cik": 0, "dik": 0, "eik": 0, "fik": 0}
+    assert sparse[("A", "C")] == {"aik": 0, "bik": 0, "cik": 0, "dik": 0, "eik": 1, "fik": 0}
+    assert sparse[("B", "C")] == {"aik": 0, "bik": 1, "cik": 0, "dik": 0, "eik": 1, "fik": 0}
+
+
+def test_same_id_has_no_pair():
+    packages = [CartonPackage("A", "U1", [0, 0, 0], [10, 10, 10], 1, 1, -1),
+                CartonPackage("A", "U1", [10, 0, 0], [10, 10, 10], 1, 1, -1)]
+    assert relative_positions(packages) == {}
+
+
+def test_warm_start_of_greedy():
+    packages = randomPackages(40, 7)
+    init = get_from_greedy(packageArray=packages)
+    assert all(relative_start(init, i, k) == values for (i, k), values in denseRelativePositions(packages).items())
+
+
+def test_pair_in_the_other_order():
+    packages = randomPackages(40, 3)
+    init = {'relative_position': relative_positions(packages)}
+    for (i, k), values in denseRelativePositions(packages).items():
+        flipped = {name: values[other] for before, after in RELATIONS for name, other in ((before, after), (after, before))}
+        assert relative_start(init, k, i) == flipped
+
+
+#Cartons added to the model out of the order of their ids get the start of their pair with the relations swapped
+def test_model_with_unsorted_cartons():
+    pytest.importorskip("highspy")
+    from MIP1.container_loading_model import ContainerLoadingModel
+    packages = [CartonPackage("P-2", "U1", [0, 0, 0], [10, 10, 10], 1, 5, -1),
+                CartonPackage("P-10", "U1", [10, 0, 0], [10, 10, 10], 1, 5, -1)]
+    cartons = [{'id': package.id, 'length': 10, 'width': 10, 'height': 10, 'weight': 1, 'cost': 5, 'priority': 0}
+               for package in packages]
+    containers = [{'id': "U1", 'length': 30, 'width': 10, 'height': 10, 'weight': 100}]
+    loading = ContainerLoadingModel(cartons, containers, symmetry=False, solver="highs")
+    loading.setStart(get_from_greedy(packageArray=packages))
+    start = {name: loading.backend.start.get(variable.index) for (i, k, name), variable in loading.relative_position.items()}
+    assert loading.pairs == [("P-2", "P-10")]
+    assert start["aik"] == 1 and start["bik"] == 0
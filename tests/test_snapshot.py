@@ -0,0 +1,87 @@
+import csv
+import numpy as np
+import pytest
+from utils.generateOutput import generateOutput, outputRows
+from utils.snapshot import takeSnapshot, saveSnapshot, loadSnapshot, snapshotPackages, readOutput, writeOutput
+from utils.structs import Package
+
+MANIFEST = ["P-1,99,53,55,61,Economy,176", "P-2,56,99,81,53,Priority,-", "P-3,42,101,51,17,Economy,88",
+            "P-4,30,20,10,5,Economy,12"]
+
+
+#Packages of MANIFEST, P-1 and P-2 in U1 (P-2 turned), P-4 in U2 and P-3 unassigned
+def placedPackages():
+    packages = [Package(99, 53, 55, 61, "P-1", "Economy", 176), Package(56, 99, 81, 53, "P-2", "Priority"),
+                Package(42, 101, 51, 17, "P-3", "Economy", 88), Package(30, 20, 10, 5, "P-4", "Economy", 12)]
+    for package, uld, position, rotation in zip(packages, ["U1", "U1", -1, "U2"], [[0, 0, 0], [0, 53, 0], [-1, -1, -1], [10, 0, 20]],
+                                                [0, 3, 0, 0]):
+        package.ULD = uld
+        package.position = position
+        package.rotation = rotation
+    return packages
+
+
+def readRows(path):
+    with open(path, newline="") as f:
+        return [row for row in csv.reader(f) if row]
+
+
+def written(rows):
+    return [[str(value) for value in row] for row in rows]
+
+
+@pytest.fixture
+def files(tmp_path):
+    manifest = tmp_path / "package.csv"
+    manifest.write_text("\n".join(MANIFEST) + "\n")
+    return str(manifest), str(tmp_path / "output.csv")
+
+
+def test_output_round_trip(files):
+    manifest, output = files
+    packages = placedPackages()
+    generateOutput(packages, output)
+    snapshot = readOutput(output, manifest)
+    expected = takeSnapshot(packages)
+    for name in ("ids", "ulds", "positions", "weights", "costs", "summary"):
+        assert np.array_equal(snapshot[name], expected[name]), name
+    placed = snapshot["ulds"] != "-1"
+    assert np.array_equal(snapshot["dimensions"][placed], expected["dimensions"][placed])
+    #output.csv has no sizes for unassigned packages, they come from the manifest as written there
+    assert snapshot["dimensions"][~placed].tolist() == [[42, 101, 51]]
+
+    writeOutput(snapshot, output + ".copy")
+    assert readRows(output + ".copy") == readRows(output) == written(outputRows(packages))
+
+
+def test_output_without_manifest(files):
+    _, output = files
+    generateOutput(placedPackages(), output)
+    snapshot = readOutput(output, manifest=None)
+    assert np.isnan(snapshot["weights"]).all() and np.isnan(snapshot["costs"]).all()
+    assert np.isnan(snapshot["dimensions"][snapshot["ulds"] == "-1"]).all()
+    assert snapshot["summary"].tolist() == [5088, 3, 1]
+
+
+def test_snapshot_file_round_trip(tmp_path):
+    packages = placedPackages()
+    path = str(tmp_path / "solution.npz")
+    saved = saveSnapshot(path, packages)
+    loaded = loadSnapshot(path)
+    for name, array in saved.items():
+        assert np.array_equal(loaded[name], array), name
+    assert written(outputRows(snapshotPackages(loaded))) == written(outputRows(packages))
+
+
+def test_snapshot_version_refused(tmp_path):
+    path = str(tmp_path / "solution.npz")
+    np.savez(path, version=np.array(0), **takeSnapshot(placedPackages()))
+    with pytest.raises(ValueError, match="snapshot version 0, expected 1"):
+        loadSnapshot(path)
+
+
+def test_empty_output_refused(tmp_path):
+    path = tmp_path / "output.csv"
+    path.write_text("")
+    with pytest.raises(ValueError, match="empty output"):
+        readOutput(str(path), manifest=None)
@@ -0,0 +1,98 @@
+import threading
+import pytest
+import MIP1.solve_control
+from MIP1.solve_control import SolveControl
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(MIP1.solve_control, "time", clock)
+    return clock
+
+
+def test_no_rules_never_interrupts():
+    control = SolveControl()
+    control.begin()
+    control.incumbent(100, None)
+    assert not control.interrupt(100, 0)
+
+
+@pytest.mark.parametrize("objective, bound, stop", [
+    (100, 95, True),            # gap 0.05
+    (100, 94, False),           # gap 0.06
+    (-100, -105, True),         # gap relative to the absolute objective
+    (50, 50, True),             # bound reached
+    (0, -1, False),             # no relative gap at a zero objective
+    (0, 0, True),
+    (None, 95, False),          # no incumbent yet
+    (100, None, False),         # no bound known
+])
+def test_gap(objective, bound, stop):
+    control = SolveControl(gap=0.05)
+    control.begin()
+    assert control.interrupt(objective, bound) is stop
+
+
+def test_stall_counts_from_last_improvement(clock):
+    control = SolveControl(stall=10)
+    control.begin()
+    clock.now += 60
+    assert not control.interrupt()              # no incumbent yet, the solve may take its time to find one
+    control.incumbent(100, None)
+    clock.now += 9
+    assert not control.interrupt()
+    control.incumbent(100, None)                # not better, the stall goes on
+    control.incumbent(120, None)
+    clock.now += 1
+    assert control.interrupt()
+    control.incumbent(90, None)
+    assert not control.interrupt()
+    clock.now += 10
+    assert control.interrupt()
+
+
+def test_begin_resets_the_incumbent(clock):
+    control = SolveControl(stall=10)
+    control.begin()
+    control.incumbent(100, None)
+    clock.now += 20
+    assert control.interrupt()
+    control.begin()
+    assert control.best is None and not control.interrupt()
+
+
+def test_cancel():
+    cancel = threading.Event()
+    control = SolveControl(gap=0.5, cancel=cancel)
+    assert not control.cancelled() and not control.interrupt(100, 0)
+    cancel.set()
+    assert control.cancelled() and control.interrupt()
+    control = SolveControl()
+    control.cancel()
+    assert control.interrupt()
+
+
+def test_incumbents_streamed_while_watched():
+    streamed = []
+    control = SolveControl(onIncumbent=streamed.append)
+    solution = lambda value: [{'carton_id': "P-1", 'container_id': "U1", 'x': value("x"), 'y': 0, 'z': 0,
+                               'DimX': 1, 'DimY': 2, 'DimZ': 3, 'weight': 4, 'cost': 5}]
+    control.begin()
+    control.incumbent(10, lambda name: 7)       # not watched
+    control.watch(solution)
+    control.incumbent(9, lambda name: 3)
+    control.incumbent(9.5, lambda name: 1)      # not better
+    control.end()
+    control.incumbent(1, lambda name: 2)
+    assert len(streamed) == 1
+    [package] = streamed[0]
+    assert (package.id, package.ULD, package.position) == ("P-1", "U1", [3, 0, 0])
@@ -0,0 +1,35 @@
+import time
+from utils.generateOutput import outputCost, outputRows, writeCSV
+from utils.snapshot import saveSnapshot
+
+#CHECKPOINTS OF run_all: THE BEST SOLUTION FOUND SO FAR, WRITTEN OUT AFTER EVERY STAGE
+
+
+#Output file (and optionally a .npz snapshot) kept at the best solution given to it so far. Both are replaced
+#atomically, so a supervisor can take them at any time, even while a run is killed
+class Checkpoint:
+
+    #Initialisation Function for the Checkpoint. snapshot is the path of the snapshot saved with every output written
+    def __init__(self, path = "output.csv", snapshot = None, k = 5000):
+        self.path = path
+        self.snapshot = snapshot
+        self.k = k
+        self.best = None    #cost of the solution written last
+        self.saved = []     #(stage, cost, seconds taken to write it)
+
+    #Write the solution of packages found by a stage if it costs less than the one written last, or anyway with
+    #force. Returns True if written
+    def save(self, packages, stage, force = False):
+        cost = outputCost(packages, self.k)[0]
+        if not force and self.best is not None and cost >= self.best: return False
+        start = time.time()
+        writeCSV(outputRows(packages, self.k), self.path)
+        if self.snapshot is not None: saveSnapshot(self.snapshot, packages, k=self.k)
+        self.best = cost
+        self.saved.append((stage, cost, time.time() - start))
+        return True
+
+    #Print the checkpoints written
+    def report(self):
+        for stage, cost, seconds in self.saved:
+            print("    checkpoint {0}: cost {1}, written in {2:.3f}s".format(stage, cost, seconds))
@@ -1,4 +1,4 @@
-import csv
+from utils.manifest import loadULDs, select, containerDicts
 
 def containers():
     """
@@ -13,30 +13,13 @@ def containers():
         list of dict: A list of dictionaries where each dictionary represents a container with keys:
         'id', 'length', 'width', 'height', and 'weight'. The list is sorted by container 'id'.
     """
-    # Open the CSV file and read its contents
-    # Create a list of containers with their attributes
-    # Sort the list of containers by their 'id' before returning
-
-    file_path = './ULD.csv'
-    containers = []
-    with open(file_path, mode='r') as file:
-        csv_reader = csv.reader(file)
-        for row in csv_reader:
-            container = {
-                "id": row[0],
-                "length": float(row[1]),
-                "width": float(row[2]),
-                "height": float(row[3]),
-                "weight": float(row[4])
-            }
-            containers.append(container)
-    containers.sort(key=lambda x: x['id'])
-    return containers
+    return containerDicts(loadULDs('./ULD.csv'))
 
 def containers_specific(container_id):
     """
     Retrieve specific container details from a CSV file.
-    This function reads container data from a CSV file named 'ULD.csv', 
+    This function reads container data from a CSV file named 'ULD.csv' (parsed
+    once by utils.manifest, so calling it in a loop doesn't read the file again),
     filters the containers based on the provided container_id, and returns 
     a list of containers that match the given ID. The containers are sorted 
     by their ID.
@@ -54,24 +37,7 @@ def containers_specific(container_id):
 
 
 
-    file_path = './ULD.csv'
-    containers = []
-    with open(file_path, mode='r') as file:
-        csv_reader = csv.reader(file)
-        for row in csv_reader:
-            container = {
-                "id": row[0],
-                "length": float(row[1]),
-                "width": float(row[2]),
-                "height": float(row[3]),
-                "weight": float(row[4])
-            }
-            if container['id'] != container_id:
-                continue
-            containers.append(container)
-    containers.sort(key=lambda x: x['id'])
-    return containers
-
+    return containerDicts(select(loadULDs('./ULD.csv'), [container_id]))
 
 def containers_specific_multiple(container_ids):
     """
@@ -90,21 +56,4 @@ def containers_specific_multiple(container_ids):
         # containers will be a list of dictionaries with details of containers 'C1' and 'C2'
     """
     
-    file_path = './ULD.csv'
-    containers = []
-    with open(file_path, mode='r') as file:
-        csv_reader = csv.reader(file)
-        for row in csv_reader:
-            container = {
-                "id": row[0],
-                "length": float(row[1]),
-                "width": float(row[2]),
-                "height": float(row[3]),
-                "weight": float(row[4])
-            }
-            if container['id'] not in container_ids:
-                continue
-            containers.append(container)
-    containers.sort(key=lambda x: x['id'])
-    return containers
-
+    return containerDicts(select(loadULDs('./ULD.csv'), container_ids))
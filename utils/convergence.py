@@ -0,0 +1,110 @@
+import time
+from utils.structs import Axis
+from utils.replacementPlanner import ReplacementPlanner
+
+#FIXED POINT OF updatePackages(packages, packages, ulds), ONLY REDOING THE WORK WHOSE INPUTS CHANGED SINCE THE LAST ROUND
+
+
+#Get the placement state of a ULD: its packages in list order with their positions and dimensions.
+#Replacement attempts and projection passes only depend on this, so their outcome is the same for the same signature
+def uldSignature(uld):
+    return tuple((package.id, tuple(package.position), tuple(package.getDimensions())) for package in uld.packages)
+
+
+#Repeats rounds of replacing unpacked packages and projecting the packages of every ULD until a round changes nothing,
+#or brings back placements seen after an earlier round (equal cost packages can keep replacing each other).
+#Replacement attempts that failed on a ULD are not retried while the ULD is in the same state, and ULDs whose last
+#projection pass moved nothing are not projected again while unchanged. The engine remembers this across stages,
+#since the signatures describe the placements themselves
+class ConvergenceEngine:
+
+    #Initialisation Function for the Engine. The ledger, if any, is used to report the cost after every round
+    def __init__(self, packages, ulds, ledger = None, replaceOrder = "list"):
+        self.packages = packages
+        self.ulds = ulds
+        self.ledger = ledger
+        self.planner = ReplacementPlanner(lpp=True, order=replaceOrder)
+        self.failed = {}        #(unpacked package, ULD) -> signature of the ULD when the replacement failed
+        self.projected = {}     #ULD -> signature of the ULD when a projection pass moved nothing
+        self.stages = []        #(stage name, list of round stats)
+
+    #Same bookkeeping as updatePackages(packages, packages, ulds) does before its replacements: dimensions are fixed
+    #as they are and the ULD lists are made to hold exactly the packages assigned to them
+    def sync(self):
+        members = {uld.id: [] for uld in self.ulds}
+        for package in self.packages:
+            package.rotation = -1
+            if str(package.ULD) != '-1' and package.ULD in members: members[package.ULD].append(package)
+        for uld in self.ulds:
+            assigned = set(members[uld.id])
+            kept = [package for package in uld.packages if package in assigned]
+            keptSet = set(kept)
+            newpackages = kept + [package for package in members[uld.id] if package not in keptSet]
+            if newpackages != uld.packages: uld.setPackages(newpackages)
+
+    #Try to put every unpacked package in place of a packed one, skipping ULDs it already failed on in their current state
+    def replaceRound(self, signatures):
+        replaced = 0
+        skipped = 0
+        for unpacked_package in self.packages:
+            if str(unpacked_package.ULD) != '-1': continue
+            for uld in self.ulds:
+                signature = signatures.get(uld)
+                if signature is None: signature = signatures[uld] = uldSignature(uld)
+                if self.failed.get((unpacked_package, uld)) == signature:
+                    skipped += 1
+                    continue
+                if self.planner.replace([uld], unpacked_package) is not None:
+                    del signatures[uld]
+                    replaced += 1
+                    break
+                self.failed[(unpacked_package, uld)] = signature
+        return replaced, skipped
+
+    #Project the packages of every ULD along every axis, skipping ULDs already at a fixed point of the projection
+    def projectRound(self, signatures):
+        moved = 0
+        for uld in self.ulds:
+            signature = signatures.get(uld)
+            if signature is None: signature = uldSignature(uld)
+            if self.projected.get(uld) == signature: continue
+            for axis in Axis.ALL:
+                uld.packages.sort(key=lambda x: x.position[axis])
+                for package in uld.packages:
+                    if uld.projectFinal(package,axis) != -1:
+                        uld.movePackage(package, axis, uld.projectFinal(package,axis))
+            newSignature = uldSignature(uld)
+            if newSignature == signature:
+                self.projected[uld] = signature
+            else:
+                moved += 1
+        return moved
+
+    #Run rounds until one changes nothing or repeats earlier placements, or maxRounds were run. Returns the stats of every round
+    def converge(self, stage = "", maxRounds = 50):
+        self.sync()
+        rounds = []
+        seen = {tuple(uldSignature(uld) for uld in self.ulds)}
+        for i in range(maxRounds):
+            start = time.time()
+            signatures = {}
+            replaced, skipped = self.replaceRound(signatures)
+            moved = self.projectRound(signatures)
+            stats = {"round": i+1, "time": time.time() - start, "replaced": replaced, "skipped": skipped, "moved": moved}
+            if self.ledger is not None: stats["cost"] = self.ledger.cost()
+            rounds.append(stats)
+            if replaced == 0 and moved == 0: break
+            state = tuple(uldSignature(uld) for uld in self.ulds)
+            if state in seen: break
+            seen.add(state)
+        self.stages.append((stage, rounds))
+        self.report(stage, rounds)
+        return rounds
+
+    #Print how many rounds a stage took and how long each one ran
+    def report(self, stage, rounds):
+        print("{0}: {1} rounds in {2:.2f}s".format(stage, len(rounds), sum(stats["time"] for stats in rounds)))
+        for stats in rounds:
+            line = "    round {round}: {time:.2f}s, {replaced} replaced, {moved} ULDs moved, {skipped} attempts skipped".format(**stats)
+            if "cost" in stats: line += ", cost {0}".format(stats["cost"])
+            print(line)
@@ -0,0 +1,64 @@
+#RUNNING TOTAL OF THE COST OF A SOLUTION, KEPT UP TO DATE BY THE ULDS IT IS ATTACHED TO
+
+
+#Cost of a solution (cost of the packages not in any ULD plus k for every priority ULD), updated in O(1) on every
+#package added to or taken out of a ULD and every change of a ULD's priority flag. Gives the same value as
+#calculateCost as long as the ULD of every package matches the ULD lists it is in
+class CostLedger:
+
+    #Initialisation Function for the Ledger. Attaches itself to the ULDs and reads their current state
+    def __init__(self, packages, ulds, k = 5000):
+        self.k = k
+        self.ulds = ulds
+        self.totalCost = sum(package.cost for package in packages)
+        self.placed = {}        #package -> ULD whose package list holds it
+        self.members = {}       #ULD -> packages it holds
+        self.placedCost = 0
+        self.priorityULDs = 0
+        self.changes = 0        #number of events that changed the cost
+        for uld in ulds:
+            uld.ledger = self
+            self.reset(uld, uld.packages)
+            if uld.isPriority: self.priorityULDs += 1
+        self.changes = 0
+
+    #Get the Cost of the Solution
+    def cost(self):
+        return self.totalCost - self.placedCost + self.k*self.priorityULDs
+
+    #Stop receiving events from the ULDs
+    def detach(self):
+        for uld in self.ulds:
+            if uld.ledger is self: uld.ledger = None
+
+    #A Package was put in the package list of a ULD
+    def added(self, uld, package):
+        holder = self.placed.get(package)
+        if holder is None:
+            self.placedCost += package.cost
+            self.changes += 1
+        elif holder is not uld:
+            self.members[holder].discard(package)
+        self.placed[package] = uld
+        self.members.setdefault(uld, set()).add(package)
+
+    #A Package was taken out of the package list of a ULD
+    def removed(self, uld, package):
+        if self.placed.get(package) is not uld: return
+        del self.placed[package]
+        self.members[uld].discard(package)
+        self.placedCost -= package.cost
+        self.changes += 1
+
+    #The package list of a ULD was replaced
+    def reset(self, uld, packages):
+        packages = set(packages)
+        for package in self.members.get(uld, set()) - packages:
+            self.removed(uld, package)
+        for package in packages:
+            self.added(uld, package)
+
+    #The priority flag of a ULD changed
+    def priorityChanged(self, uld, isPriority):
+        self.priorityULDs += 1 if isPriority else -1
+        self.changes += 1
@@ -0,0 +1,97 @@
+import heapq
+import math
+from utils.structs import calculateEuclideanDistance
+
+#EXTREME POINTS OF A ULD, KEPT IN A HEAP ORDERED BY DISTANCE FROM THE ORIGIN
+
+
+class ExtremePointSet:
+
+    #Initialisation Function for the Set. cellSize is the side of the grid cells used to find points covered by a new box
+    def __init__(self, points = (), cellSize = 32):
+        self.heap = []      #(distance, insertion counter, point), stale entries are skipped when popped
+        self.points = {}    #live point -> insertion counter of its heap entry
+        self.cells = {}     #grid cell -> live points in the cell
+        self.counter = 0
+        self.cellSize = cellSize
+        self.extend(points)
+
+    def __len__(self):
+        return len(self.points)
+
+    def __contains__(self, point):
+        return tuple(point) in self.points
+
+    #Iterate over the live points, nearest to the origin first
+    def __iter__(self):
+        return iter(sorted(self.points, key=lambda point: (calculateEuclideanDistance(point), self.points[point])))
+
+    def getCell(self, point):
+        c = self.cellSize
+        return (math.floor(point[0]/c), math.floor(point[1]/c), math.floor(point[2]/c))
+
+    #Add an Extreme Point, ignoring it if the same point is already in the set
+    def add(self, point):
+        point = tuple(point)
+        if point in self.points: return
+        self.counter += 1
+        self.points[point] = self.counter
+        heapq.heappush(self.heap, (calculateEuclideanDistance(point), self.counter, point))
+        self.cells.setdefault(self.getCell(point), set()).add(point)
+
+    def extend(self, points):
+        for point in points:
+            self.add(point)
+
+    #Remove an Extreme Point. Its heap entry is dropped lazily
+    def discard(self, point):
+        point = tuple(point)
+        if self.points.pop(point, None) is None: return
+        cell = self.getCell(point)
+        self.cells[cell].discard(point)
+        if not self.cells[cell]: del self.cells[cell]
+
+    #Remove the points inside a placed package. A box placed at such a point would always intersect the package
+    def evictCovered(self, package):
+        c = self.cellSize
+        lo = package.position
+        dimensions = package.getDimensions()
+        hi = [lo[i] + dimensions[i] for i in range(3)]
+        ranges = [range(math.floor(lo[i]/c), math.ceil(hi[i]/c)) for i in range(3)]
+        covered = []
+        for i in ranges[0]:
+            for j in ranges[1]:
+                for k in ranges[2]:
+                    for point in self.cells.get((i, j, k), ()):
+                        if all(lo[a] <= point[a] < hi[a] for a in range(3)): covered.append(point)
+        for point in covered:
+            self.discard(point)
+
+    #Place a Package in the ULD at the nearest Extreme Point where it fits. Points tried before it go back in the heap,
+    #points outside the ULD are dropped for good. Returns the point used, or None if the package does not fit anywhere
+    def fit(self, uld, package):
+        limits = [uld.length, uld.width, uld.height]
+        tried = []
+        placed = None
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            point = entry[2]
+            if self.points.get(point) != entry[1]: continue
+            if point[0] >= limits[0] or point[1] >= limits[1] or point[2] >= limits[2]:
+                self.discard(point)
+                continue
+            if uld.addBox(package, point):
+                self.discard(point)
+                placed = point
+                break
+            tried.append(entry)
+        for entry in tried:
+            heapq.heappush(self.heap, entry)
+        self.compact()
+        return placed
+
+    #Rebuild the heap without its stale entries once they outnumber the live points
+    def compact(self):
+        if len(self.heap) <= 2*len(self.points) + 32: return
+        self.heap = [entry for entry in self.heap if self.points.get(entry[2]) == entry[1]]
+        heapq.heapify(self.heap)
@@ -1,48 +1,95 @@
 import csv
+import os
+import tempfile
 
 
-def generateOutput(packages):
+def outputCost(packages, k = 5000):
     """
-    Generates the final output CSV file with package details and calculates the total cost.
+    Cost of a solution as written by generateOutput: the cost of the unassigned packages plus k for every ULD
+    holding a priority package.
     Args:
-        packages (list): A list of package objects. Each package object should have the following attributes:
-            - ULD (str or int): Unit Load Device identifier. If ULD is "-1", the package is considered unassigned.
-            - cost (int): The cost associated with the package.
-            - position (list): A list of three integers representing the position of the package.
-            - id (int): The unique identifier of the package.
-            - getDimensions (method): A method that sets the dimensions attribute of the package.
-    The function performs the following steps:
-        1. Sorts the packages based on ULD and position.
-        2. Calculates the total cost by summing the cost of unassigned packages and adding a fixed cost for priority containers.
-        3. Writes the total cost, number of packages, and number of priority containers to a CSV file.
-        4. Writes the details of each package to the CSV file, including the package ID, ULD, and corner positions.
+        packages (list): package objects, with ULD and cost.
+        k (int, optional): cost of a priority ULD. Defaults to 5000.
+    Returns:
+        tuple: the cost and the set of priority ULDs.
     """
-
-    
     cost = 0
-    packages.sort(key=lambda x: (str(x.ULD), list(x.position)))
     priority_containers = set()
-    numPackages = len(packages)
     for package in packages:
         if str(package.ULD) == "-1":
             cost += package.cost
-            numPackages -= 1
         elif int(package.cost) > 10000:
             priority_containers.add(package.ULD)
-    cost += len(priority_containers)*5000
-    f = open(f"output.csv", mode="w", newline='\n')
-    outputCSV = csv.writer(f)
+    return cost + len(priority_containers)*k, priority_containers
+
 
-    outputCSV.writerow([int(cost),numPackages,len(priority_containers)])
+def writeCSV(rows, path = "output.csv"):
+    """
+    Writes rows to a CSV file atomically: the rows go through one buffered writer into a temporary file next to the
+    file, which then replaces it. A run stopped while writing leaves the previous file whole, never a truncated one.
+    Args:
+        rows (iterable): rows of the CSV file, as lists of values.
+        path (str, optional): path of the CSV file. Defaults to "output.csv".
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(handle, mode="w", newline='\n', buffering=1 << 16) as f:
+            csv.writer(f).writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary): os.remove(temporary)
+        raise
+
+
+def outputRows(packages, k = 5000):
+    """
+    Rows of output.csv for packages: the total cost, number of packages placed and number of priority ULDs, then
+    one row per package with its id, ULD and corners, sorted by ULD and position. The packages given are not sorted.
+    Args:
+        packages (list): package objects, as for generateOutput.
+        k (int, optional): cost of a priority ULD. Defaults to 5000.
+    Returns:
+        list: the rows.
+    """
+    packages = sorted(packages, key=lambda x: (str(x.ULD), list(x.position)))
+    cost, priority_containers = outputCost(packages, k)
+    numPackages = sum(1 for package in packages if str(package.ULD) != "-1")
+    rows = [[int(cost),numPackages,len(priority_containers)]]
     for package in packages:
         corner = package.position
-        package.getDimensions()
-        othercorner = [package.position[0] + package.dimensions[0], package.position[1] + package.dimensions[1],package.position[2] + package.dimensions[2]]
+        dimensions = package.getDimensions()
+        othercorner = [package.position[0] + dimensions[0], package.position[1] + dimensions[1],package.position[2] + dimensions[2]]
         othercorner = [int(x) for x in othercorner]
         corner = [int(x) for x in corner]
         if str(package.ULD) == "-1":
             corner = [-1,-1,-1]
             othercorner = [-1,-1,-1]
         uld = package.ULD if str(package.ULD) != "-1" else 'NONE'
-        outputCSV.writerow(
-            [package.id, uld, corner[0], corner[1], corner[2], othercorner[0], othercorner[1], othercorner[2]])
+        rows.append([package.id, uld, corner[0], corner[1], corner[2], othercorner[0], othercorner[1], othercorner[2]])
+    return rows
+
+
+def generateOutput(packages, path = "output.csv"):
+    """
+    Generates the final output CSV file with package details and calculates the total cost.
+    Args:
+        packages (list): A list of package objects. Each package object should have the following attributes:
+            - ULD (str or int): Unit Load Device identifier. If ULD is "-1", the package is considered unassigned.
+            - cost (int): The cost associated with the package.
+            - position (list): A list of three integers representing the position of the package.
+            - id (int): The unique identifier of the package.
+            - getDimensions (method): A method returning the dimensions of the package along the axes.
+        path (str, optional): Path of the output file. Defaults to "output.csv".
+    The function performs the following steps:
+        1. Sorts a copy of the packages based on ULD and position, leaving the list given as it is.
+        2. Calculates the total cost by summing the cost of unassigned packages and adding a fixed cost for priority containers.
+        3. Writes the total cost, number of packages, and number of priority containers to a CSV file.
+        4. Writes the details of each package to the CSV file, including the package ID, ULD, and corner positions.
+    The file is replaced atomically (see writeCSV), so readers see either the previous output or the new one.
+    """
+
+    writeCSV(outputRows(packages), path)
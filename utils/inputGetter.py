@@ -1,5 +1,4 @@
-import csv
-from utils.structs import ULD,Package
+from utils.manifest import loadPackages, loadULDs, packageObjects, uldObjects
 
 def getPackages(packages):
     """
@@ -8,21 +7,13 @@ def getPackages(packages):
         packages (list): A list to which the Package objects will be appended.
     Returns:
         list: The updated list with Package objects appended.
-    The function reads from a CSV file named "package.csv". For each row in the CSV:
+    The function reads from a CSV file named "package.csv", parsed once and validated by utils.manifest. For each row:
     - If the package type (6th column) is "Economy", it creates a Package object with 7 attributes.
     - Otherwise, it creates a Package object with 6 attributes.
     - The created Package object is then appended to the provided packages list.
     """
-    
-    f = open("package.csv", mode="r")
-    packageCSV = csv.reader(f)
-    for p in packageCSV:
-        if p[5] == "Economy":
-            package = Package(p[1],p[2],p[3],p[4],p[0],p[5],p[6])
-            packages.append(package)
-        else:
-            package = Package(p[1],p[2],p[3],p[4],p[0],p[5])
-            packages.append(package)
+
+    packages.extend(packageObjects(loadPackages("package.csv")))
     return packages
 
 def getULD(ulds):
@@ -42,12 +33,8 @@ def getULD(ulds):
         [4] - Fourth attribute for ULD
     Raises:
         FileNotFoundError: If the "ULD.csv" file is not found.
-        IndexError: If the rows in the CSV file do not have the expected number of columns.
+        ValueError: If the rows in the CSV file do not have the expected columns.
     """
 
-    f = open("ULD.csv", mode="r")
-    uldCSV = csv.reader(f)
-    for u in uldCSV:
-        uld = ULD(u[1],u[2],u[3],u[4],u[0])
-        ulds.append(uld)
+    ulds.extend(uldObjects(loadULDs("ULD.csv")))
     return ulds
@@ -0,0 +1,201 @@
+import csv
+import os
+from itertools import islice
+import numpy as np
+from utils.structs import ULD, Package
+
+#COLUMNAR MANIFESTS: package.csv AND ULD.csv ARE PARSED ONCE INTO NUMPY RECORD ARRAYS SHARED BY ALL THEIR READERS
+
+#Rows of package.csv: id, three dimensions, weight, Priority or Economy, cost (- for priority packages)
+PACKAGE_DTYPE = np.dtype([("id", "U32"), ("dimensions", "i4", 3), ("weight", "i4"), ("priority", "?"), ("cost", "f8")])
+#Rows of ULD.csv: id, length, width, height, weight limit
+ULD_DTYPE = np.dtype([("id", "U32"), ("dimensions", "i4", 3), ("weight", "i4")])
+
+#Rows parsed at a time when streaming a manifest
+CHUNK_SIZE = 65536
+
+#path -> (modification time, size, records) of the manifests loaded
+cache = {}
+
+
+#Parse an integer field of a manifest, which must be positive
+def positive(value, line, name):
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError("line {0}: {1} {2!r} is not an integer".format(line, name, value))
+    if number <= 0: raise ValueError("line {0}: {1} must be positive, got {2}".format(line, name, number))
+    return number
+
+
+#Check the id of a row fits in the id column
+def checkId(value, line, dtype):
+    if not value: raise ValueError("line {0}: empty id".format(line))
+    if len(value) > dtype["id"].itemsize // 4: raise ValueError("line {0}: id {1!r} is too long".format(line, value))
+    return value
+
+
+#Validate a row of package.csv, as a record of PACKAGE_DTYPE. Used to find the bad row of a chunk
+def packageRecord(row, line):
+    if len(row) < 6: raise ValueError("line {0}: expected at least 6 columns, got {1}".format(line, len(row)))
+    if row[5] not in ("Priority", "Economy"):
+        raise ValueError("line {0}: package type must be Priority or Economy, got {1!r}".format(line, row[5]))
+    priority = row[5] == "Priority"
+    if len(row) < 7 or row[6] == '-':
+        if not priority: raise ValueError("line {0}: economy package without a cost".format(line))
+        cost = np.nan
+    else:
+        try:
+            cost = float(row[6])
+        except ValueError:
+            raise ValueError("line {0}: cost {1!r} is not a number".format(line, row[6]))
+        if not np.isfinite(cost) or cost < 0: raise ValueError("line {0}: cost must be a non-negative number, got {1}".format(line, row[6]))
+    dimensions = tuple(positive(value, line, "dimension") for value in row[1:4])
+    return (checkId(row[0], line, PACKAGE_DTYPE), dimensions, positive(row[4], line, "weight"), priority, cost)
+
+
+#Validate a row of ULD.csv, as a record of ULD_DTYPE. Used to find the bad row of a chunk
+def uldRecord(row, line):
+    if len(row) < 5: raise ValueError("line {0}: expected 5 columns, got {1}".format(line, len(row)))
+    dimensions = tuple(positive(value, line, "dimension") for value in row[1:4])
+    return (checkId(row[0], line, ULD_DTYPE), dimensions, positive(row[4], line, "weight limit"))
+
+
+#Ids of rows as a column, all of them non-empty and fitting in the id column
+def idColumn(rows, dtype):
+    ids = [row[0] for row in rows]
+    width = dtype["id"].itemsize // 4
+    if not all(0 < len(id) <= width for id in ids): raise ValueError("bad id")
+    return ids
+
+
+#Integer columns of rows, all of them positive
+def positiveColumns(rows, start, stop):
+    width = stop - start
+    values = np.fromiter(map(int, (value for row in rows for value in row[start:stop])), dtype=np.int32,
+                         count=width*len(rows)).reshape(len(rows), width)
+    if (values <= 0).any(): raise ValueError("not positive")
+    return values
+
+
+#Record array of the rows of package.csv, converted a column at a time
+def packageChunk(rows):
+    if any(len(row) < 6 for row in rows): raise ValueError("short row")
+    records = np.empty(len(rows), dtype=PACKAGE_DTYPE)
+    records["id"] = idColumn(rows, PACKAGE_DTYPE)
+    records["dimensions"] = positiveColumns(rows, 1, 4)
+    records["weight"] = positiveColumns(rows, 4, 5)[:, 0]
+    kinds = np.array([row[5] for row in rows])
+    priority = kinds == "Priority"
+    if not (priority | (kinds == "Economy")).all(): raise ValueError("bad type")
+    costs = [row[6] if len(row) > 6 else '-' for row in rows]
+    records["cost"] = np.fromiter((np.nan if cost == '-' else float(cost) for cost in costs), dtype=np.float64, count=len(rows))
+    if (np.isnan(records["cost"]) & ~priority).any() or (records["cost"] < 0).any() or np.isinf(records["cost"]).any():
+        raise ValueError("bad cost")
+    records["priority"] = priority
+    return records
+
+
+#Record array of the rows of ULD.csv, converted a column at a time
+def uldChunk(rows):
+    if any(len(row) < 5 for row in rows): raise ValueError("short row")
+    records = np.empty(len(rows), dtype=ULD_DTYPE)
+    records["id"] = idColumn(rows, ULD_DTYPE)
+    records["dimensions"] = positiveColumns(rows, 1, 4)
+    records["weight"] = positiveColumns(rows, 4, 5)[:, 0]
+    return records
+
+
+#Parse a manifest chunkSize rows at a time, yielding every chunk as a record array. Blank lines are skipped.
+#Chunks are converted a column at a time, and a chunk failing validation is checked again row by row to report
+#the first bad line
+def stream(path, chunk, record, chunkSize = CHUNK_SIZE):
+    with open(path, mode="r", newline="") as f:
+        lines = enumerate(csv.reader(f), start=1)
+        while True:
+            rows = [(line, row) for line, row in islice(lines, chunkSize)]
+            if not rows: break
+            rows = [(line, row) for line, row in rows if row]
+            if not rows: continue
+            try:
+                yield chunk([row for _, row in rows])
+            except ValueError:
+                for line, row in rows: record(row, line)
+                raise
+
+
+#Stream package.csv as record arrays of at most chunkSize packages, for manifests too large to load at once
+def streamPackages(path = "package.csv", chunkSize = CHUNK_SIZE):
+    return stream(path, packageChunk, packageRecord, chunkSize)
+
+
+#Stream ULD.csv as record arrays of at most chunkSize ULDs
+def streamULDs(path = "ULD.csv", chunkSize = CHUNK_SIZE):
+    return stream(path, uldChunk, uldRecord, chunkSize)
+
+
+#Records of a whole manifest, parsed on the first call and again only once the file changes. The records are
+#read-only, as they are shared by all the callers
+def load(path, chunk, record, dtype):
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size: return cached[2]
+    records = np.concatenate([np.empty(0, dtype=dtype)] + list(stream(path, chunk, record)))
+    records.flags.writeable = False
+    cache[key] = (stat.st_mtime_ns, stat.st_size, records)
+    return records
+
+
+def loadPackages(path = "package.csv"):
+    return load(path, packageChunk, packageRecord, PACKAGE_DTYPE)
+
+
+def loadULDs(path = "ULD.csv"):
+    return load(path, uldChunk, uldRecord, ULD_DTYPE)
+
+
+#Rows of a manifest with the given ids (or the one id given), in the order of the manifest
+def select(records, ids):
+    ids = [ids] if isinstance(ids, str) else list(ids)
+    return records[np.isin(records["id"], ids)]
+
+
+#Package objects of package records, in the order of the records
+def packageObjects(records):
+    packages = []
+    for id, (length, width, height), weight, priority, cost in zip(records["id"].tolist(), records["dimensions"].tolist(),
+                                                                   records["weight"].tolist(), records["priority"].tolist(),
+                                                                   records["cost"].tolist()):
+        if priority: packages.append(Package(length, width, height, weight, id, "Priority"))
+        else: packages.append(Package(length, width, height, weight, id, "Economy", cost))
+    return packages
+
+
+#ULD objects of ULD records
+def uldObjects(records):
+    return [ULD(length, width, height, weight, id) for id, (length, width, height), weight
+            in zip(records["id"].tolist(), records["dimensions"].tolist(), records["weight"].tolist())]
+
+
+#Carton dictionaries of the MIP models of package records, dimensions smallest first, sorted by id. Priority
+#packages cost 1e6
+def cartonDicts(records):
+    sizes = np.sort(records["dimensions"], axis=1).astype(float).tolist()
+    costs = np.where(np.isnan(records["cost"]), 1e6, records["cost"]).tolist()
+    cartons = [{"id": id, "length": length, "width": width, "height": height, "weight": weight,
+                "priority": 1 if priority else 0, "cost": cost}
+               for id, (length, width, height), weight, priority, cost in zip(records["id"].tolist(), sizes,
+                                                                             records["weight"].astype(float).tolist(),
+                                                                             records["priority"].tolist(), costs)]
+    cartons.sort(key=lambda x: x['id'])
+    return cartons
+
+
+#Container dictionaries of the MIP models of ULD records, sorted by id
+def containerDicts(records):
+    containers = [{"id": id, "length": length, "width": width, "height": height, "weight": weight}
+                  for id, (length, width, height), weight in zip(records["id"].tolist(), records["dimensions"].astype(float).tolist(),
+                                                                 records["weight"].astype(float).tolist())]
+    containers.sort(key=lambda x: x['id'])
+    return containers
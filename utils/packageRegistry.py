@@ -0,0 +1,51 @@
+#PACKAGES INDEXED BY ID, WITH THE PACKAGES ASSIGNED TO EVERY ULD, SO SOLUTIONS CAN BE MERGED WITHOUT PAIRWISE SCANS
+
+
+class PackageRegistry:
+
+    #Initialisation Function for the Registry. Packages are kept in the order they are added, and for a repeated id
+    #the first package is the one found by get, like a scan of the list would
+    def __init__(self, packages = ()):
+        self.packages = {}      #id -> package
+        self.members = {}       #ULD id -> packages assigned to it, as an insertion ordered dict
+        self.assigned = {}      #package -> ULD id it is registered under
+        for package in packages:
+            self.add(package)
+
+    def __len__(self):
+        return len(self.packages)
+
+    def __contains__(self, id):
+        return id in self.packages
+
+    def __iter__(self):
+        return iter(self.packages.values())
+
+    #Get the Package with an id, or default if there is none
+    def get(self, id, default = None):
+        return self.packages.get(id, default)
+
+    #Add a Package to the Registry, under the ULD it is assigned to
+    def add(self, package):
+        if package.id not in self.packages: self.packages[package.id] = package
+        self.assign(package)
+
+    #Register a Package under the ULD it is now assigned to, after its ULD changed
+    def assign(self, package):
+        old = self.assigned.pop(package, None)
+        if old is not None: del self.members[old][package]
+        if str(package.ULD) == '-1': return
+        self.members.setdefault(package.ULD, {})[package] = None
+        self.assigned[package] = package.ULD
+
+    #Get the packages assigned to a ULD, in the order they were registered
+    def getMembers(self, uld):
+        return list(self.members.get(uld, ()))
+
+    #Get the packages not assigned to any ULD, in the order they were added
+    def unassigned(self):
+        return [package for package in self.packages.values() if package not in self.assigned]
+
+    #Get the ids of the ULDs holding at least one package
+    def uldIds(self):
+        return [uld for uld, members in self.members.items() if members]
@@ -0,0 +1,71 @@
+from bisect import bisect_right
+
+#CANDIDATES FOR SPACE DEFRAGMENTATION: WHICH PACKED PACKAGES AN UNPACKED PACKAGE MAY REPLACE, AND IN WHAT ORDER TO TRY THEM
+
+
+#Chooses the packed packages worth trying to replace with an unpacked one. Only packages passing the checks at the top
+#of inflate_and_replace are ever tried.
+#With order "list" they are tried in the order of the ULD's package list, giving the same results as the scans of the
+#list the defragmentation loops used to do. A failed try used to swap the list being scanned for a copy, after taking
+#the package out of it, so the package right after the first failed try in a ULD was never tried. That is kept.
+#With order "gain" packed packages are bucketed by priority class and sorted by cost, and tried cheapest first
+#(largest cost reduction), then largest first
+class ReplacementPlanner:
+
+    #Initialisation Function for the Planner. lpp is passed on to inflate_and_replace, and skips the volume check
+    def __init__(self, lpp = False, order = "list"):
+        if order not in ("gain", "list"):
+            raise ValueError("Invalid order!")
+        self.lpp = lpp
+        self.order = order
+        self.buckets = {}       #ULD -> (version, priority -> (costs, packages sorted by cost))
+
+    #Check if a packed package passes the checks inflate_and_replace makes before trying the replacement
+    def canReplace(self, pck, rep):
+        if pck.priority != rep.priority: return False
+        if pck.cost < rep.cost: return False
+        if (not self.lpp) and pck.getVolume() < rep.getVolume(): return False
+        return True
+
+    #Get the packages of a ULD bucketed by priority class, rebuilt when the ULD changed since the last call
+    def getBuckets(self, uld):
+        cached = self.buckets.get(uld)
+        if cached is not None and cached[0] == uld.version: return cached[1]
+        buckets = {}
+        for package in uld.packages:
+            buckets.setdefault(package.priority, []).append(package)
+        for priority, packages in buckets.items():
+            packages.sort(key=lambda x: (x.cost, -x.getVolume(), str(x.id)))
+            buckets[priority] = ([package.cost for package in packages], packages)
+        self.buckets[uld] = (uld.version, buckets)
+        return buckets
+
+    #Get the packages of a ULD an unpacked package may replace, in the order to try them
+    def candidates(self, uld, pck):
+        if self.order == "list":
+            return [rep for rep in uld.packages if self.canReplace(pck, rep)]
+        bucket = self.getBuckets(uld).get(pck.priority)
+        if bucket is None: return []
+        costs, packages = bucket
+        packages = packages[:bisect_right(costs, pck.cost)]
+        if self.lpp: return packages
+        volume = pck.getVolume()
+        return [rep for rep in packages if rep.getVolume() <= volume]
+
+    #Try to put an unpacked package in place of a packed one, in the first of the ULDs where it works.
+    #Returns the ULD used and the package replaced, or None if no replacement worked
+    def replace(self, ulds, pck):
+        for uld in ulds:
+            if self.order == "list":
+                candidates = [(i, rep) for i, rep in enumerate(uld.packages) if self.canReplace(pck, rep)]
+            else:
+                candidates = list(enumerate(self.candidates(uld, pck)))
+            if not candidates: continue
+            uld.calculatePushLimit()
+            skip = None
+            for i, rep in candidates:
+                if i == skip: continue
+                if uld.inflate_and_replace(pck, rep, self.lpp):
+                    return uld, rep
+                if skip is None and self.order == "list": skip = i + 1
+        return None
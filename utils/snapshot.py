@@ -0,0 +1,121 @@
+import csv
+import os
+import numpy as np
+from utils.structs import CartonPackage
+from utils.generateOutput import outputCost, writeCSV
+
+#SOLUTION SNAPSHOTS: THE PLACEMENT OF EVERY PACKAGE SAVED AS NUMPY ARRAYS IN A VERSIONED .npz FILE
+
+#Version of the snapshot layout, saved in every snapshot. Snapshots of other versions are refused
+SNAPSHOT_VERSION = 1
+
+#Arrays of a snapshot, one row per package in the order of output.csv:
+#   ids, ulds       package ids and ULD ids, "-1" for unassigned packages
+#   positions       (n, 3) lower corners, -1 for unassigned packages
+#   dimensions      (n, 3) sizes along the axes
+#   weights, costs  weights and costs, NaN when not known (snapshots of an output.csv without package.csv)
+#   rotations       rotations of the packages, -1 when set by a MIP solver or not known
+#   summary         cost, number of packages placed and number of priority ULDs, the first row of output.csv
+ARRAYS = ("ids", "ulds", "positions", "dimensions", "weights", "costs", "rotations", "summary")
+
+
+#Snapshot of packages, as a dictionary of the arrays. The rows are sorted as generateOutput sorts the packages,
+#without sorting the list given
+def takeSnapshot(packages, k = 5000):
+    packages = sorted(packages, key=lambda x: (str(x.ULD), list(x.position)))
+    cost, priority_containers = outputCost(packages, k)
+    rotations = [package.rotation for package in packages]
+    return {
+        "ids": np.array([str(package.id) for package in packages], dtype=str),
+        "ulds": np.array([str(package.ULD) for package in packages], dtype=str),
+        "positions": np.array([list(package.position) for package in packages], dtype=np.float64).reshape(-1, 3),
+        "dimensions": np.array([list(package.getDimensions()) for package in packages], dtype=np.float64).reshape(-1, 3),
+        "weights": np.array([package.weight for package in packages], dtype=np.float64),
+        "costs": np.array([package.cost for package in packages], dtype=np.float64),
+        "rotations": np.array([rotation if isinstance(rotation, int) else -1 for rotation in rotations], dtype=np.int8),
+        "summary": np.array([int(cost), sum(1 for package in packages if str(package.ULD) != "-1"), len(priority_containers)],
+                            dtype=np.int64),
+    }
+
+
+#Save a snapshot of packages (or a snapshot taken already) to a .npz file. It is written next to the file first and
+#then renamed, so a snapshot being saved never replaces the last one with a partial file
+def saveSnapshot(path, packages = None, snapshot = None, k = 5000):
+    if snapshot is None: snapshot = takeSnapshot(packages, k)
+    temporary = path + ".tmp.npz"
+    np.savez(temporary, version=np.array(SNAPSHOT_VERSION), **snapshot)
+    os.replace(temporary, path)
+    return snapshot
+
+
+#Load a snapshot saved by saveSnapshot, as a dictionary of its arrays
+def loadSnapshot(path):
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data["version"]) if "version" in data else None
+        if version != SNAPSHOT_VERSION:
+            raise ValueError("{0}: snapshot version {1}, expected {2}".format(path, version, SNAPSHOT_VERSION))
+        missing = [name for name in ARRAYS if name not in data]
+        if missing: raise ValueError("{0}: snapshot without {1}".format(path, ", ".join(missing)))
+        return {name: data[name] for name in ARRAYS}
+
+
+#Packages of a snapshot as the CartonPackage objects of the MIP stages, as sol_to_package makes them
+def snapshotPackages(snapshot):
+    packages = []
+    for id, uld, position, dimensions, weight, cost, rotation in zip(
+            snapshot["ids"].tolist(), snapshot["ulds"].tolist(), snapshot["positions"].tolist(),
+            snapshot["dimensions"].tolist(), snapshot["weights"].tolist(), snapshot["costs"].tolist(),
+            snapshot["rotations"].tolist()):
+        packages.append(CartonPackage(id, uld, position, dimensions, weight, cost, rotation))
+    return packages
+
+
+#Snapshot of an output.csv. Sizes of unassigned packages, weights and costs aren't in output.csv, and are taken from
+#the package manifest if given
+def readOutput(path = "output.csv", manifest = "package.csv"):
+    with open(path, mode="r", newline="") as f:
+        rows = [row for row in csv.reader(f) if row]
+    if not rows: raise ValueError("{0}: empty output".format(path))
+    summary = [int(value) for value in rows[0]]
+    rows = rows[1:]
+    corners = np.array([[int(value) for value in row[2:8]] for row in rows], dtype=np.float64).reshape(-1, 6)
+    ids = [row[0] for row in rows]
+    ulds = ["-1" if row[1] == "NONE" else row[1] for row in rows]
+    placed = np.array([uld != "-1" for uld in ulds], dtype=bool)
+    dimensions = np.where(placed[:, None], corners[:, 3:] - corners[:, :3], np.nan)
+    weights = np.full(len(rows), np.nan)
+    costs = np.full(len(rows), np.nan)
+    if manifest is not None and os.path.exists(manifest):
+        from utils.manifest import loadPackages
+        records = loadPackages(manifest)
+        index = {id: n for n, id in enumerate(records["id"].tolist())}
+        for n, id in enumerate(ids):
+            if id not in index: continue
+            record = records[index[id]]
+            weights[n] = record["weight"]
+            costs[n] = 10000000 if record["priority"] else record["cost"]
+            if not placed[n]: dimensions[n] = record["dimensions"]
+    return {
+        "ids": np.array(ids, dtype=str),
+        "ulds": np.array(ulds, dtype=str),
+        "positions": corners[:, :3],
+        "dimensions": dimensions,
+        "weights": weights,
+        "costs": costs,
+        "rotations": np.full(len(rows), -1, dtype=np.int8),
+        "summary": np.array(summary, dtype=np.int64),
+    }
+
+
+#Write a snapshot as output.csv, as generateOutput writes the packages it was taken from
+def writeOutput(snapshot, path = "output.csv"):
+    rows = [snapshot["summary"].tolist()]
+    for id, uld, position, dimensions in zip(snapshot["ids"].tolist(), snapshot["ulds"].tolist(),
+                                             snapshot["positions"].tolist(), snapshot["dimensions"].tolist()):
+        if uld == "-1":
+            rows.append([id, 'NONE', -1, -1, -1, -1, -1, -1])
+            continue
+        corner = [int(x) for x in position]
+        othercorner = [int(position[a] + dimensions[a]) for a in range(3)]
+        rows.append([id, uld] + corner + othercorner)
+    writeCSV(rows, path)
@@ -0,0 +1,84 @@
+import math
+
+#UNIFORM 3D GRID OVER THE PACKAGES OF A ULD, SO GEOMETRIC QUERIES ONLY LOOK AT PACKAGES NEAR A REGION
+
+
+class SpatialIndex:
+
+    #Initialisation Function for the Grid. Every cell is a cube of side cellSize
+    def __init__(self, cellSize = 32):
+        self.cellSize = cellSize
+        self.cells = {}     #cell -> set of packages touching the cell
+        self.boxes = {}     #package -> cells the package is registered in
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, package):
+        return package in self.boxes
+
+    #Get the cells covered by a package, from its current position and dimensions
+    def getCells(self, package):
+        c = self.cellSize
+        position = package.position
+        dimensions = package.getDimensions()
+        ranges = [range(math.floor(position[i]/c), math.ceil((position[i]+dimensions[i])/c)) for i in range(3)]
+        return [(i, j, k) for i in ranges[0] for j in ranges[1] for k in ranges[2]]
+
+    #Register a Package in the Grid
+    def insert(self, package):
+        keys = self.getCells(package)
+        for key in keys:
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = set()
+            cell.add(package)
+        self.boxes[package] = keys
+
+    #Remove a Package from the Grid, using the cells it was registered in
+    def remove(self, package):
+        keys = self.boxes.pop(package, None)
+        if keys is None: return
+        for key in keys:
+            cell = self.cells[key]
+            cell.discard(package)
+            if not cell: del self.cells[key]
+
+    #Re-register a Package after its position or rotation changed
+    def update(self, package):
+        keys = self.boxes.get(package)
+        if keys is not None and keys == self.getCells(package): return
+        self.remove(package)
+        self.insert(package)
+
+    #Remove every Package from the Grid
+    def clear(self):
+        self.cells = {}
+        self.boxes = {}
+
+    #Rebuild the Grid from a list of packages
+    def rebuild(self, packages):
+        self.clear()
+        for package in packages:
+            self.insert(package)
+
+    #Get all packages registered in cells touching the closed region [lo, hi]. This is a superset of the packages
+    #intersecting the region, so callers still run their exact check on the returned candidates
+    def query(self, lo, hi):
+        c = self.cellSize
+        found = set()
+        if not self.boxes: return found
+        ranges = []
+        for i in range(3):
+            if hi[i] < lo[i]: return found
+            ranges.append(range(max(0, math.floor(lo[i]/c)), math.floor(hi[i]/c) + 1))
+        # Scanning more cells than there are packages is slower than returning every package
+        if len(ranges[0])*len(ranges[1])*len(ranges[2]) > len(self.boxes):
+            return set(self.boxes)
+        cells = self.cells
+        for i in ranges[0]:
+            for j in ranges[1]:
+                for k in ranges[2]:
+                    cell = cells.get((i, j, k))
+                    if cell: found |= cell
+        return found
@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from utils.spatialIndex import SpatialIndex
 
 #CONTAIN CLASSES FOR PACKAGES AND ULDs ALONG WITH UTILITY CLASSES (ROTATION, AXIS) AND FUNCTIONS
 
@@ -56,6 +57,9 @@ class Rotation:
 
     ALL = [LWH,LHW,WLH,WHL,HLW,HWL]
 
+    #Which of the sorted (length, width, height) of a package lies along each axis of the ULD, for every rotation
+    AXES = ((0,1,2), (0,2,1), (1,0,2), (1,2,0), (2,0,1), (2,1,0))
+
  
 #Class for Axis of a package
 class Axis:
@@ -69,6 +73,9 @@ class Axis:
 #Package Class
 class Package:
 
+    __slots__ = ("position", "ULD", "length", "width", "height", "weight", "id", "priority", "cost",
+                 "_rotation", "pqPriority", "stable", "pushLim", "_dimensions")
+
     #Initialisation Function for a Package
     def __init__(self, length, width, height, weight,id,priority,cost = 10000000):
         self.position = [-1,-1,-1] #default if not placed
@@ -81,11 +88,11 @@ class Package:
         self.id = id
         self.priority = priority
         self.cost = int(cost)
+        self._dimensions = None
         self.rotation = Rotation.LWH
         self.pqPriority = 0
         self.stable = True
         self.pushLim = [-1,-1,-1]
-        self.dimensions = [self.length,self.width,self.height]
 
     #Get the Base Area of the Package
     def getMaxBase(self):
@@ -101,20 +108,32 @@ class Package:
         d2 = other.getDimensions()
         return (isIntersecting(self,other,d1,d2,0) and isIntersecting(self,other,d1,d2,1) and isIntersecting(self,other,d1,d2,2))
 
+    #Rotation of the Package. Setting it computes the dimensions once, a rotation of -1 keeps the dimensions that were
+    #set directly (by the MIP solvers)
+    @property
+    def rotation(self):
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, rotation):
+        self._rotation = rotation
+        if rotation == -1: return
+        sides = (self.length, self.width, self.height)
+        a, b, c = Rotation.AXES[rotation]
+        self._dimensions = (sides[a], sides[b], sides[c])
+
     #Get Dimensions Based on Rotation
     def getDimensions(self):
-        dim = []
-        if self.rotation == -1: return self.dimensions
-        if self.rotation == Rotation.LWH: dim = [self.length,self.width,self.height]
-        if self.rotation == Rotation.WLH: dim = [self.width,self.length,self.height]
-        if self.rotation == Rotation.HLW: dim = [self.height,self.length,self.width]
-        if self.rotation == Rotation.HWL: dim = [self.height,self.width,self.length]
-        if self.rotation == Rotation.LHW: dim = [self.length,self.height,self.width]
-        if self.rotation == Rotation.WHL: dim = [self.width,self.height,self.length]
-
-        self.dimensions = dim
-
-        return dim
+        return self._dimensions
+
+    #Dimensions of the Package along the axes of the ULD
+    @property
+    def dimensions(self):
+        return self._dimensions
+
+    @dimensions.setter
+    def dimensions(self, dimensions):
+        self._dimensions = dimensions
     
     #Get the Center of Mass of the Package
     def getCenterOfMass(self):
@@ -124,6 +143,9 @@ class Package:
 #ULD CLASS   
 class ULD:
 
+    __slots__ = ("length", "width", "height", "weight_limit", "id", "_isPriority", "packages", "index", "weightUsed", "ledger",
+                 "version", "pushLimVersion")
+
     #Initialisation Function for a ULD
     def __init__(self,length,width,height,weight_limit,id):
         self.length = int(length)
@@ -131,14 +153,27 @@ class ULD:
         self.height = int(height)
         self.weight_limit = int(weight_limit)
         self.id = id
-        self.isPriority = False
+        self.ledger = None #CostLedger told about every package added or removed
+        self._isPriority = False
         self.packages = []
+        self.index = SpatialIndex()
+        self.weightUsed = 0 #running total of the weight of the packages in the ULD
+        self.version = 0 #bumped on every change to the packages in the ULD or their positions
+        self.pushLimVersion = -1 #version the push limits of the packages were calculated for
+
+    #Whether the ULD holds a Priority Package
+    @property
+    def isPriority(self):
+        return self._isPriority
+
+    @isPriority.setter
+    def isPriority(self, isPriority):
+        if isPriority != self._isPriority and self.ledger is not None: self.ledger.priorityChanged(self, isPriority)
+        self._isPriority = isPriority
     
     #Get the Weight Left in the ULD before exceeding Weight Limit
     def weightLeft(self):
-        curr = self.weight_limit
-        for package in self.packages: curr-=package.weight
-        return curr
+        return self.weight_limit - self.weightUsed
     
     #Get the Volume of the ULD
     def getVolume(self):
@@ -153,9 +188,47 @@ class ULD:
         for package in self.packages:
             package.ULD = -1
             package.position = [-1,-1,-1]
+        if self.ledger is not None: self.ledger.reset(self, [])
         self.packages = []
+        self.version += 1
+        self.index.clear()
+        self.weightUsed = 0
         self.isPriority = False
 
+    #Replace the list of Packages in the ULD and rebuild the spatial index and weight total from it
+    def setPackages(self, packages):
+        self.packages = packages
+        self.version += 1
+        self.index.rebuild(packages)
+        self.weightUsed = sum(package.weight for package in packages)
+        if self.ledger is not None: self.ledger.reset(self, packages)
+
+    #Add a placed Package to the ULD
+    def addPackage(self, package):
+        self.packages.append(package)
+        self.version += 1
+        self.index.insert(package)
+        self.weightUsed += package.weight
+        if self.ledger is not None: self.ledger.added(self, package)
+
+    #Take a Package out of the ULD
+    def removePackage(self, package):
+        self.packages.remove(package)
+        self.version += 1
+        self.index.remove(package)
+        self.weightUsed -= package.weight
+        if self.ledger is not None: self.ledger.removed(self, package)
+
+    #Move a Package along an axis, keeping the spatial index up to date
+    def movePackage(self, package, axis, position):
+        package.position[axis] = position
+        self.version += 1
+        self.index.update(package)
+
+    #Get the packages near the closed region [lo, hi] from the spatial index
+    def nearbyPackages(self, lo, hi):
+        return self.index.query(lo, hi)
+
     #Plot the ULD packages in 3D
     def plotULD(self):
         fig = plt.figure()
@@ -203,8 +276,9 @@ class ULD:
             ):
                 continue
 
-	        # Check for intersections
-            if any(package.isIntersecting(currPackage) for package in self.packages):
+            # Check for intersections with nearby packages
+            end = [pivot[0] + dimensions[0], pivot[1] + dimensions[1], pivot[2] + dimensions[2]]
+            if any(package.isIntersecting(currPackage) for package in self.nearbyPackages(pivot, end)):
                 continue
         
             for axis in Axis.ALL:
@@ -214,7 +288,7 @@ class ULD:
 
             
             currPackage.ULD = self.id
-            self.packages.append(currPackage)
+            self.addPackage(currPackage)
             if(currPackage.priority == "Priority"): self.isPriority = True
             return True
         
@@ -223,51 +297,55 @@ class ULD:
     
     
     
+    #Get the furthest face behind a point along the fixed axis, among packages containing the point on the variable axes
+    def projectAlongAxis(self, fixed_axis, variable_axis1, variable_axis2, x1, y1, z1):
+
+        if fixed_axis == "x":
+            fd = 0
+            fixed = x1
+            var1, var2 = y1, z1
+        elif fixed_axis == "y":
+            fd = 1
+            fixed = y1
+            var1, var2 = x1, z1
+        elif fixed_axis == "z":
+            fd = 2
+            fixed = z1
+            var1, var2 = x1, y1
+        else:
+            raise ValueError("Invalid axis!")
+
+        max_extent =  0
+
+        # Only packages behind the point along the fixed axis, containing (var1, var2) on the variable axes, can be projected on
+        axes = {"x": 0, "y": 1, "z": 2}
+        lo = [0, 0, 0]
+        lo[axes[variable_axis1]] = var1
+        lo[axes[variable_axis2]] = var2
+        hi = list(lo)
+        hi[fd] = fixed
+        for pkg in self.nearbyPackages(lo, hi):
+
+            px, py, pz = pkg.position
+            pdx,pdy,pdz = pkg.getDimensions()
+
+            pkg_min = {"x": px, "y": py, "z": pz}
+            pkg_max = {"x": px + pdx, "y": py + pdy, "z": pz + pdz}
+
+            if pkg_min[variable_axis1] <= var1 < pkg_max[variable_axis1] and \
+            pkg_min[variable_axis2] <= var2 < pkg_max[variable_axis2]:
+                if pkg_max[fixed_axis] <= fixed:
+                    max_extent = max(max_extent, pkg_max[fixed_axis])
+        return max_extent
+
     #Get the New Extreme Points of the ULD after adding a Package, by projecting 3 corners of the package along the 3 axes
     def getNewCorners(self,package):
         extreme_points = set()
 
         [x, y, z] = package.position
         [dx, dy, dz] = package.getDimensions()
-        L = self.length
-        W = self.width
-        H = self.height
-
-        def project_along_axis(fixed_axis, variable_axis1, variable_axis2,x1,y1,z1):
-            
-            if fixed_axis == "x":
-                fd = 0
-                fixed, dim, limit = x1, dx, L
-                var1, var2 = y1, z1
-            elif fixed_axis == "y":
-                fd = 1
-                fixed, dim, limit = y1, dy, W
-                var1, var2 = x1, z1
-            elif fixed_axis == "z":
-                fd = 2
-                fixed, dim, limit = z1, dz, H
-                var1, var2 = x1, y1
-            else:
-                raise ValueError("Invalid axis!")
-
-           
-            max_extent =  0
-
-            for pkg in self.packages:
-                
-                px, py, pz = pkg.position
-                pdx,pdy,pdz = pkg.getDimensions()
-
-                pkg_min = {"x": px, "y": py, "z": pz}
-                pkg_max = {"x": px + pdx, "y": py + pdy, "z": pz + pdz}
+        project_along_axis = self.projectAlongAxis
 
-                if pkg_min[variable_axis1] <= var1 < pkg_max[variable_axis1] and \
-                pkg_min[variable_axis2] <= var2 < pkg_max[variable_axis2]:
-                    if pkg_max[fixed_axis] <= fixed:
-                        max_extent = max(max_extent, pkg_max[fixed_axis])
-            return max_extent
-
-        
         ex1 = project_along_axis("x", "y", "z", x,y+dy,z)  
         extreme_points.add((ex1, y+dy, z))
 
@@ -295,21 +373,28 @@ class ULD:
 
     #STABILITY CHECKS
 
-    #Check if a Package is Stable in the ULD by checking overlap of its base with other packages
-    def checkStabilityPackage(self, package, minOverlapReq = 0.5):
+    #Get the area of the base of a Package resting on the tops of other packages
+    def getSupportArea(self, package):
         packageDimensions = package.getDimensions()
         packageRectangle = [package.position[0],package.position[1],package.position[0]+packageDimensions[0],package.position[1]+packageDimensions[1]]
         packageBase = package.position[2]
-        packageBaseArea = packageDimensions[0]*packageDimensions[1]
         maxOverlap = 0
-        for otherPackage in self.packages:
+        # Only packages whose top touches the base of the package can support it
+        lo = [package.position[0], package.position[1], packageBase - 1]
+        hi = [packageRectangle[2], packageRectangle[3], packageBase]
+        for otherPackage in self.nearbyPackages(lo, hi):
             if package == otherPackage: continue
             otherPackageDimensions = otherPackage.getDimensions()
             if packageBase != otherPackage.position[2] + otherPackageDimensions[2]: continue
             otherPackageRectangle = [otherPackage.position[0],otherPackage.position[1],otherPackage.position[0]+otherPackageDimensions[0],otherPackage.position[1]+otherPackageDimensions[1]]
             maxOverlap += getOverlap(packageRectangle,otherPackageRectangle)
-        
-        maxOverlap = maxOverlap/packageBaseArea
+        return maxOverlap
+
+    #Check if a Package is Stable in the ULD by checking overlap of its base with other packages
+    def checkStabilityPackage(self, package, minOverlapReq = 0.5):
+        packageDimensions = package.getDimensions()
+        packageBaseArea = packageDimensions[0]*packageDimensions[1]
+        maxOverlap = self.getSupportArea(package)/packageBaseArea
         if package.position[2] == 0:
             package.stable = True
             return True
@@ -369,13 +454,22 @@ class ULD:
     
     #PROJECT ALONG ORIGIN TO INCREASE STABILITY
 
+    #Get the region between the origin and a package along an axis, where the packages it can be projected on lie
+    def projectionRegion(self, package, axis):
+        dimensions = package.getDimensions()
+        lo = list(package.position)
+        hi = [package.position[i] + dimensions[i] for i in range(3)]
+        lo[axis] = 0
+        hi[axis] = package.position[axis]
+        return lo, hi
+
     def project(self, package, axis = Axis.HEIGHT):
         maxxx = -1
         axis1 = (axis+1)%3
         axis2 = (axis+2)%3
         packageDimensions = package.getDimensions()
         packageRectangle = [package.position[axis1],package.position[axis2],package.position[axis1]+packageDimensions[axis1],package.position[axis2]+packageDimensions[axis2]]
-        for otherPackage in self.packages:
+        for otherPackage in self.nearbyPackages(*self.projectionRegion(package, axis)):
             otherPackageDimensions = otherPackage.getDimensions()
             otherPackageRectangle = [otherPackage.position[axis1],otherPackage.position[axis2],otherPackage.position[axis1]+otherPackageDimensions[axis1],otherPackage.position[axis2]+otherPackageDimensions[axis2]]
             if (package.position[axis] >= otherPackage.position[axis]+ otherPackageDimensions[axis]):
@@ -389,7 +483,7 @@ class ULD:
         axis2 = (axis+2)%3
         packageDimensions = package.getDimensions()
         packageRectangle = [package.position[axis1],package.position[axis2],package.position[axis1]+packageDimensions[axis1],package.position[axis2]+packageDimensions[axis2]]
-        for otherPackage in self.packages:
+        for otherPackage in self.nearbyPackages(*self.projectionRegion(package, axis)):
             otherPackageDimensions = otherPackage.getDimensions()
             otherPackageRectangle = [otherPackage.position[axis1],otherPackage.position[axis2],otherPackage.position[axis1]+otherPackageDimensions[axis1],otherPackage.position[axis2]+otherPackageDimensions[axis2]]
             if (package.position[axis] >= otherPackage.position[axis]+ otherPackageDimensions[axis]):
@@ -401,7 +495,10 @@ class ULD:
     #SPACE DEFRAGMENTATION FUNCTIONS
 
     # Calculate the amount a package can be pushed in each direction without ever intersecting with any other package
+    # The limits only depend on the positions of the packages, so they are kept until the ULD changes
     def calculatePushLimit(self):
+        if self.pushLimVersion == self.version: return
+        self.pushLimVersion = self.version
         for i in range(3):
             sortedPos = []
             for j in self.packages:
@@ -425,6 +522,7 @@ class ULD:
     
     #Push out the packages beyond x,y,z in the ULD to make space for a new package according to their PushLim
     def pushOut(self,x,y,z):
+        self.version += 1
         for i in self.packages:
             if(i.position[0]>=x):
                 i.position[0]+= i.pushLim[0]
@@ -432,10 +530,11 @@ class ULD:
                 i.position[1]+= i.pushLim[1]
             if(i.position[2]>=z):
                 i.position[2]+= i.pushLim[2]
+            self.index.update(i)
     
     #Normalize the ULD back after PushOut when finished inerting a package
     def normalize(self):
-        packages = self.packages
+        packages = list(self.packages)
         moved = True
 
         while moved:
@@ -444,20 +543,35 @@ class ULD:
             for axis in range(3):
         
                 packages.sort(key=lambda package: package.position[axis])
+                rank = {package: i for i, package in enumerate(packages)}
+                a1 = (axis+1)%3
+                a2 = (axis+2)%3
+                limits = [self.length, self.width, self.height]
 
                 for i, package in enumerate(packages):
                     # Find the minimum position the packet can move to along the current axis
                     min_position = 0
-
-                    for j in range(i):
-                        op = packages[j].position
-                        pp = package.position
-                        od = packages[j].getDimensions()
-                        pd = package.getDimensions()
+                    pp = package.position
+                    pd = package.getDimensions()
+
+                    # Earlier packages can only block this one if they overlap it along one of the other two axes
+                    lo1 = [0, 0, 0]
+                    hi1 = list(limits)
+                    hi1[axis] = pp[axis]
+                    lo2 = list(lo1)
+                    hi2 = list(hi1)
+                    lo1[a1] = pp[a1]
+                    hi1[a1] = pp[a1] + pd[a1]
+                    lo2[a2] = pp[a2]
+                    hi2[a2] = pp[a2] + pd[a2]
+                    nearby = self.nearbyPackages(lo1, hi1) | self.nearbyPackages(lo2, hi2)
+
+                    for other in nearby:
+                        if rank[other] >= i: continue
+                        op = other.position
+                        od = other.getDimensions()
 
                         # Ensure no overlap: check the other two axes
-                        a1 = (axis+1)%3
-                        a2 = (axis+2)%3
                         if(((pp[a1]+pd[a1]<=op[a1]) or (op[a1]+od[a1]<=pp[a1])) and ((pp[a2]+pd[a2]<=op[a2]) or (op[a2]+od[a2]<=pp[a2]))):
                             continue
                             # No overlap, update minimum position if needed
@@ -465,15 +579,17 @@ class ULD:
 
                     # Move the packet if possible
                     if package.position[axis] > min_position:
-                        package.position[axis] = min_position
+                        self.movePackage(package, axis, min_position)
                         moved = True
 
     #Recalculate the Extreme Points of the ULD after Normalising
     def recalculate_corners(self):
-        corners = []
-        corners.append((0,0,0))
+        from utils.extremePoints import ExtremePointSet
+        corners = ExtremePointSet([(0,0,0)])
         for i in self.packages:
             corners.extend(self.getNewCorners(i))
+        for i in self.packages:
+            corners.evictCovered(i)
 
         return corners
             
@@ -487,24 +603,30 @@ class ULD:
         if((not lpp)and(pck.getVolume() < rep.getVolume())):
             return False
         
-        currpack = self.packages.copy()
+        #rep's place in the list, where pck goes if the replacement works. normalize leaves the order of the list alone,
+        #so it is the same list without rep when pushAddBox returns
+        i = self.packages.index(rep)
 
-        self.packages.remove(rep)
+        #The ledger only hears about rep leaving once the replacement succeeded. If it fails, the ULD is left as it was
+        version = self.version
+        ledger, self.ledger = self.ledger, None
+        self.removePackage(rep)
+        self.ledger = ledger
 
         if(self.pushAddBox(pck,rep.position)):
+            if ledger is not None: ledger.removed(self, rep)
             rep.ULD = -1
-            rep.pos = [-1,-1,-1]
+            rep.position = [-1,-1,-1]
             rep.pushLim = [-1,-1,-1]
-            self.packages.remove(pck)
-            for i,p in enumerate(currpack):
-                if(p == rep):
-                    currpack[i] = pck
-                    break
-            self.packages = currpack
+            self.packages.pop()
+            self.packages.insert(i, pck)
             # print("YAYY")
             return True
         
-        self.packages = currpack
+        self.packages.insert(i, rep)
+        self.index.insert(rep)
+        self.weightUsed += rep.weight
+        self.version = version
         return False
     
 
@@ -527,7 +649,9 @@ class ULD:
            
             valid = True
 
-            for pck in self.packages:
+            # Pushing only moves packages away from the origin, so packages starting beyond the new package can never reach it
+            end = [pivot[0] + dimensions[0], pivot[1] + dimensions[1], pivot[2] + dimensions[2]]
+            for pck in self.nearbyPackages([0, 0, 0], end):
                 
                 pos = pck.position.copy()
                 if(pck.position[0]>=pivot[0]):
@@ -546,7 +670,7 @@ class ULD:
             if valid:
                 self.pushOut(pivot[0],pivot[1],pivot[2])
                 currPackage.ULD = self.id
-                self.packages.append(currPackage)
+                self.addPackage(currPackage)
                 self.normalize()
 
                 if(currPackage.priority == "Priority"): self.isPriority = True
@@ -559,6 +683,8 @@ class ULD:
 
 # Package Class for MIPSolver
 class CartonPackage:
+
+    __slots__ = ("id", "ULD", "position", "dimensions", "weight", "cost", "rotation", "priority")
     
     def __init__(self, id, uldid, position, dimensions, weight, cost, rotation):
         self.id = id
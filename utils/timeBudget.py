@@ -0,0 +1,71 @@
+import time
+
+#WALL-CLOCK TIME BUDGET OF run_all, SHARED BETWEEN ITS STAGES BY THE COST THEY REMOVE PER SECOND
+
+
+#Time left until a deadline, handed out to the stages of run_all (binary search, swaps on one ULD) one slice at a time.
+#Every stage run is recorded with the cost it removed and the time it took, and the next slice goes to the stage that
+#removed the most cost per second on its last run. Stages not run yet come first, in the order given. A stage whose
+#last patience runs removed nothing is not run again until its inputs (given as a state) change. Randomized stages
+#(a large neighbourhood search) can do better on the same inputs, so they are always run again
+class TimeBudget:
+
+    #Initialisation Function for the Budget. reserve seconds before the deadline are kept for writing the final output.
+    #Slices shorter than minimum seconds are not worth running: the stage gets all the time left instead
+    def __init__(self, timeout, reserve = 1, start = None, patience = 3, randomized = (), minimum = 2):
+        self.start = time.time() if start is None else start
+        self.deadline = self.start + timeout
+        self.reserve = reserve
+        self.patience = patience
+        self.randomized = set(randomized)
+        self.minimum = minimum
+        self.rates = {}         #stage -> cost removed per second on its last run
+        self.misses = {}        #stage -> (state of its inputs, runs in a row at that state that removed nothing)
+        self.overhead = {}      #stage -> seconds its last run took beyond the time limit given to it
+        self.runs = []          #(stage, seconds, cost removed)
+
+    #Seconds left for the stages
+    def remaining(self):
+        return max(0, self.deadline - self.reserve - time.time())
+
+    #Stages worth running, given as stage -> current state of its inputs
+    def live(self, states):
+        return [stage for stage, state in states.items() if stage in self.randomized or stage not in self.misses
+                or self.misses[stage][0] != state or self.misses[stage][1] < self.patience]
+
+    #Stages worth running, the one to run next first
+    def ranked(self, states):
+        return sorted(self.live(states), key=lambda stage: -self.rates.get(stage, float("inf")))
+
+    #Stage to run next, None if no stage is worth running
+    def choose(self, states):
+        ranked = self.ranked(states)
+        return ranked[0] if ranked else None
+
+    #Time limit of the next run of a stage: an equal share of the time left between the stages worth running, less
+    #the time the stage took beyond its time limit last time (building models, updating the packages), or the longest
+    #one of any stage if not run yet. With parallel stages run at the same time, each of them gets parallel shares.
+    #A slice too short to be worth running is made twice the minimum, or all the time left if shorter, so the stages
+    #use the time up one after another
+    def slice(self, stage, states, parallel = 1):
+        overhead = self.overhead.get(stage, max(self.overhead.values(), default=0))
+        share = self.remaining() * parallel / max(parallel, len(self.live(states))) - overhead
+        if share <= self.minimum: share = min(2 * self.minimum, self.remaining() - overhead)
+        return max(0, share)
+
+    #Record a run of a stage, given the state of its inputs after it, the time limit it had, the seconds it took and the
+    #cost it removed
+    def record(self, stage, state, limit, seconds, gain):
+        self.runs.append((stage, seconds, gain))
+        self.rates[stage] = gain / max(seconds, 1e-6)
+        self.overhead[stage] = max(0, seconds - limit)
+        if gain <= 0:
+            misses = self.misses.get(stage, (None, 0))
+            self.misses[stage] = (state, misses[1] + 1 if misses[0] == state else 1)
+        else: self.misses.pop(stage, None)
+
+    #Print the runs of the stages with their cost removed per second
+    def report(self):
+        print("Time budget: {0:.2f}s used, {1:.2f}s left".format(time.time() - self.start, self.deadline - time.time()))
+        for stage, seconds, gain in self.runs:
+            print("    {0}: {1:.2f}s, cost removed {2}, {3:.2f} per second".format(stage, seconds, gain, gain / max(seconds, 1e-6)))
@@ -1,6 +1,37 @@
 from utils.structs import Axis
+from utils.packageRegistry import PackageRegistry
+from utils.replacementPlanner import ReplacementPlanner
 
-def updatePackages(packages,newPackages,ulds):
+#Copy the ULD, position and dimensions of the new packages to the packages with the same id and rebuild the ULD lists.
+#Packages are matched through a PackageRegistry, so the merge is linear in the number of packages
+def mergePackages(packages,newPackages,ulds):
+    finalpackages = PackageRegistry(newPackages)
+    uldById = {}
+    for uld in ulds:
+        uldById.setdefault(uld.id, uld)
+    members = {}
+    for package in packages:
+        finalpackage = finalpackages.get(package.id)
+        if finalpackage is None: continue
+        package.ULD = finalpackage.ULD
+        if str(package.ULD) != '-1':
+            uld = uldById.get(package.ULD)
+            if uld is not None:
+                inULD = members.get(uld)
+                if inULD is None: inULD = members[uld] = set(uld.packages)
+                if package not in inULD:
+                    uld.packages.append(package)
+                    inULD.add(package)
+        package.position = finalpackage.position
+        package.dimensions = finalpackage.dimensions
+        package.rotation = -1
+
+    for uld in ulds:
+        newpackages = [package for package in uld.packages if package.ULD == uld.id]
+        uld.setPackages(newpackages)
+
+
+def updatePackages(packages,newPackages,ulds,replaceOrder = "list"):
     def updatePackages(packages, newPackages, ulds):
         """
         Update the list of packages with new package information and adjust their positions within ULDs (Unit Load Devices).
@@ -8,6 +39,7 @@ def updatePackages(packages,newPackages,ulds):
             packages (list): A list of current package objects.
             newPackages (list): A list of new package objects with updated information.
             ulds (list): A list of ULD objects.
+            replaceOrder (str, optional): Order packed packages are tried in for replacement, "list" or "gain". Defaults to "list".
         The function performs the following steps:
         1. Updates the attributes of packages in the `packages` list with the corresponding attributes from `newPackages`.
         2. Adds packages to the appropriate ULD's package list if they are not already present.
@@ -16,36 +48,12 @@ def updatePackages(packages,newPackages,ulds):
         5. Sorts the packages within each ULD based on their position along each axis and adjusts their positions using the `projectFinal` method.
         """
 
-    for package in packages:
-        for finalpackage in newPackages:
-            if package.id == finalpackage.id:
-                package.ULD = finalpackage.ULD
-                if str(package.ULD) != '-1':
-                    for uld in ulds:
-                        if uld.id == package.ULD and package not in uld.packages:
-                            uld.packages.append(package)
-                package.position = finalpackage.position
-                package.dimensions = finalpackage.dimensions
-                package.rotation = -1
-                break
-
-
-    for uld in ulds:
-        newpackages = [package for package in uld.packages if package.ULD == uld.id]
-        uld.packages = newpackages
+    mergePackages(packages,newPackages,ulds)
 
+    planner = ReplacementPlanner(lpp=True, order=replaceOrder)
     for unpacked_package in packages:
         if str(unpacked_package.ULD) == '-1':
-            done = False
-            for jj in range(len(ulds)):
-                ulds[jj].calculatePushLimit()
-                for poss_replace in ulds[jj].packages:
-                    if(ulds[jj].inflate_and_replace(unpacked_package,poss_replace,lpp=True)):
-                       
-                        done = True
-                        break
-                if done:
-                    break   
+            planner.replace(ulds, unpacked_package)
 
 
     for uld in ulds:
@@ -53,4 +61,4 @@ def updatePackages(packages,newPackages,ulds):
             uld.packages.sort(key=lambda x: x.position[axis])
             for package in uld.packages:
                 if uld.projectFinal(package,axis) != -1:
-                    package.position[axis] = uld.projectFinal(package,axis)
\ No newline at end of file
+                    uld.movePackage(package, axis, uld.projectFinal(package,axis))
\ No newline at end of file